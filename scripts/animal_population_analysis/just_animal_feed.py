@@ -26,6 +26,7 @@ data = {
 }
 
 feed_dairy_meat_results, feed = cao.calculate_feed_and_animals(data)
+feed_dairy_meat_results = feed_dairy_meat_results.to_dataframe()
 
 
 # plotly to plot species slaughter
@@ -89,6 +89,7 @@ for country in df_fao_slaughter.index:
     }
 
     feed_dairy_meat_results, feed = cao.calculate_feed_and_animals(data)
+    feed_dairy_meat_results = feed_dairy_meat_results.to_dataframe()
 
     try:
         # find month when poultry pop is less than 10
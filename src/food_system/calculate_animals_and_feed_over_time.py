@@ -3,47 +3,321 @@ This is a function used to quickly estimate the feed usage and resulting meat wh
 breeding is changed and slaughter is increased somewhat (or whatever reasonable result
 is to be expected in the scenario in question).
 """
+from collections import OrderedDict
 from pathlib import Path
+import copy
+import hashlib
+import itertools
+import pickle
 import pandas as pd
 import numpy as np
-import git
 from src.food_system.food import Food
 
 
-"""
-Start main function
-"""
+class AnimalFeedData:
+    """
+    Registry of the animal data tables used to calculate the animal populations and
+    feed. Tables are read the first time they are used rather than when this module is
+    imported, so runs which don't use them never read the files. Tables are read as
+    attributes, for example animal_feed_data.df_fao_animals.
+    """
 
-# Create dataframes (available for the rest of the file upon import of this file)
+    # the tables, as the file each is read from and the column used as the index
+    TABLES = {
+        "df_animals": ("InputDataAndSources.csv", "Variable"),
+        "df_feed_country": ("country_feed_data.csv", "ISO3 Country Code"),
+        "df_fao_animals": ("head_count_csv.csv", "iso3"),
+        "df_fao_slaughter": ("FAO_stat_slaughter_counts_processed.csv", "iso3"),
+    }
 
-# TODO: reconcile the way this data is imported with how the rest of all the other
-# data is imported in the other parts of the model...
+    # the data directory of this repository
+    DEFAULT_DATA_DIR = (
+        Path(__file__).parents[2] / "data" / "no_food_trade" / "animal_feed_data"
+    )
 
-repo_root = git.Repo(".", search_parent_directories=True).working_dir
+    def __init__(self, data_dir=None):
+        """
+        data_dir is the directory the tables are read from, defaulting to the animal
+        feed data in this repository
+        """
+        self.data_dir = Path(data_dir) if data_dir is not None else None
+        self.tables = {}
+        # values calculated from the tables, such as the feed per head of each country
+        self.derived = {}
+        # changes every time the data changes, so results calculated from the old
+        # data are not reused
+        self.version = 0
+
+    def set_data_dir(self, data_dir):
+        """
+        Reads the tables from data_dir from now on. None uses the default directory.
+        """
+        self.data_dir = Path(data_dir) if data_dir is not None else None
+        self.tables = {}
+        self.derived = {}
+        self.version += 1
 
-animal_feed_data_dir = Path(repo_root) / "data" / "no_food_trade" / "animal_feed_data"
-InputDataAndSources_location = Path.joinpath(
-    Path(animal_feed_data_dir), "InputDataAndSources.csv"
-)
-country_feed_data_location = Path.joinpath(
-    Path(animal_feed_data_dir), "country_feed_data.csv"
-)
-FAO_stat_slaughter_counts_processed_location = Path.joinpath(
-    Path(animal_feed_data_dir), "FAO_stat_slaughter_counts_processed.csv"
-)
-head_count_csv_location = Path.joinpath(
-    Path(animal_feed_data_dir), "head_count_csv.csv"
-)
+    def set_table(self, name, df):
+        """
+        Replaces one of the tables with df, for example to run with other data
+        """
+        assert name in self.TABLES, "unknown animal feed data table: " + name
+        self.tables[name] = df
+        self.derived = {}
+        self.version += 1
 
-df_animals = pd.read_csv(InputDataAndSources_location, index_col="Variable")
-df_feed_country = pd.read_csv(country_feed_data_location, index_col="ISO3 Country Code")
-df_fao_animals = pd.read_csv(head_count_csv_location, index_col="iso3")
-df_fao_slaughter = pd.read_csv(
-    FAO_stat_slaughter_counts_processed_location, index_col="iso3"
-)
+    def get_data_dir(self):
+        """
+        Returns the directory the tables are read from
+        """
+        if self.data_dir is None:
+            return self.DEFAULT_DATA_DIR
+        return self.data_dir
 
-animal_inputs = df_animals
-slaughter_inputs = df_fao_slaughter
+    def __getattr__(self, name):
+        """
+        Returns the table called name, reading it if it hasn't been read yet. Only
+        called for names which aren't normal attributes.
+        """
+        if name not in self.TABLES:
+            raise AttributeError(name)
+
+        if name not in self.tables:
+            filename, index_col = self.TABLES[name]
+            self.tables[name] = pd.read_csv(
+                self.get_data_dir() / filename, index_col=index_col
+            )
+
+        return self.tables[name]
+
+
+# the animal feed data shared by the whole model
+animal_feed_data = AnimalFeedData()
+
+
+def __getattr__(name):
+    """
+    The tables used to be read when this module was imported, so they can still be
+    imported from it by name. They are now read on first use.
+    """
+    if name in AnimalFeedData.TABLES:
+        return getattr(animal_feed_data, name)
+    raise AttributeError("module " + repr(__name__) + " has no attribute " + name)
+
+
+class AnimalPopulations:
+    """
+    The animal populations of one or more countries over time, stored as a struct of
+    arrays rather than as a table.
+
+    The simulation writes its values for every month into a single preallocated
+    array. Fields derived from these values (such as the slaughter hours) are only
+    calculated when they are read. Fields are read by name, like the columns of a
+    DataFrame, and return arrays of shape (n_countries, months), or (months,) for
+    the populations of a single country.
+    """
+
+    # the values simulated for each species, in the order of the last axis of
+    # simulated (each for every species, in the order of the species table)
+    SIMULATED_VALUES = ["Pop", "Born", "Slaughtered", "Other Death"]
+
+    def __init__(
+        self,
+        country_codes,
+        simulated,
+        species,
+        slaughter_hours,
+        total_slaughter_cap_hours,
+    ):
+        """
+        country_codes: the countries simulated
+        simulated: array of shape (n_countries, months, len(simulated_fields)), or
+            (months, len(simulated_fields)) for a single country
+        species: the species table (see CalculateAnimalOutputs.SPECIES)
+        slaughter_hours: hours to slaughter one animal of each species, by name
+        total_slaughter_cap_hours: slaughter capacity in hours of each country
+        """
+        self.country_codes = country_codes
+        self.simulated = simulated
+        self.species = species
+        self.slaughter_hours = slaughter_hours
+        self.total_slaughter_cap_hours = np.asarray(total_slaughter_cap_hours)
+        self.months = simulated.shape[-2]
+
+        # the fields written by the simulation, in the order of the last axis of
+        # simulated, and all the fields (with the derived ones) in the order of
+        # to_dataframe
+        self.simulated_fields = [
+            self.get_field_name(animal, value)
+            for value in self.SIMULATED_VALUES
+            for animal in species
+        ]
+        self.simulated_field_index = {
+            field: i for i, field in enumerate(self.simulated_fields)
+        }
+        self.fields = []
+        # the species each derived field is calculated from
+        self.derived_field_species = {}
+        for animal in species:
+            self.fields.append(self.get_field_name(animal, "Pop"))
+            derived_values = ["Slaughtered Hours", "Slaughtered Hours %"]
+            if animal.get("start_milking_age") is not None:
+                self.fields += [
+                    animal["name"] + " Cow Pop",
+                    animal["name"] + " Milk Ready Pop",
+                ]
+                derived_values += ["Cow Pop", "Milk Ready Pop"]
+            self.fields += [
+                animal["name"] + " Born",
+                animal["name"] + " Slaughtered",
+                animal["name"] + " Slaughtered Hours",
+                animal["name"] + " Slaughtered Hours %",
+                animal["name"] + " Other Death",
+            ]
+            for value in derived_values:
+                self.derived_field_species[animal["name"] + " " + value] = animal
+        self.fields.append("Month")
+
+        # derived fields which have been calculated
+        self.derived = {}
+        # values set after the simulation, which replace the simulated values
+        self.columns = {}
+
+    def get_field_name(self, animal, value):
+        """
+        Returns the name of a simulated value of a species, such as "Beef Born". The
+        population uses the population name, such as "Pigs Pop".
+        """
+        if value == "Pop":
+            return animal.get("population_name", animal["name"]) + " Pop"
+        return animal["name"] + " " + value
+
+    def get_read_only_view(self):
+        """
+        Returns populations which share the values of these, made read only so they
+        can't be changed through the view. Fields set on the view only replace the
+        view's own values, and foods set on these populations are returned as read
+        only views (see Food.get_view), which are copied if changed in place.
+        """
+        self.simulated.flags.writeable = False
+        view = copy.copy(self)
+        view.derived = {}
+        view.columns = {}
+        for field, values in self.columns.items():
+            if isinstance(values, Food):
+                values = values.get_view(slice(None))
+            elif isinstance(values, np.ndarray):
+                values.flags.writeable = False
+            view.columns[field] = values
+        return view
+
+    def for_country(self, country_code):
+        """
+        Returns the populations of one of the countries, without copying them
+        """
+        assert self.simulated.ndim == 3, "populations are already for one country"
+        i = self.country_codes.index(country_code)
+
+        return AnimalPopulations(
+            [country_code],
+            self.simulated[i],
+            self.species,
+            self.slaughter_hours,
+            self.total_slaughter_cap_hours[i],
+        )
+
+    def get_simulated(self, field):
+        """
+        Returns the values the simulation wrote for field
+        """
+        return self.simulated[..., self.simulated_field_index[field]]
+
+    def calculate_derived(self, field):
+        """
+        Calculates a field from the simulated values
+        """
+        if field == "Month":
+            return np.broadcast_to(np.arange(self.months), self.simulated.shape[:-1])
+
+        if field not in self.derived_field_species:
+            raise KeyError(field)
+
+        animal = self.derived_field_species[field]
+        name = animal["name"]
+        population = self.get_simulated(self.get_field_name(animal, "Pop"))
+
+        if field == name + " Cow Pop":
+            return population
+
+        if field == name + " Milk Ready Pop":
+            life_expectancy = animal["life_expectancy"]
+            milk_ready_percent = (
+                life_expectancy - animal["start_milking_age"]
+            ) / life_expectancy
+            return population * milk_ready_percent
+
+        slaughtered = self.get_simulated(name + " Slaughtered")
+        if field == name + " Slaughtered Hours":
+            return slaughtered * self.slaughter_hours[name]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                slaughtered
+                * self.slaughter_hours[name]
+                / self.total_slaughter_cap_hours[..., np.newaxis]
+            )
+
+    def __getitem__(self, field):
+        """
+        Returns the values of field for every month
+        """
+        if field in self.columns:
+            return self.columns[field]
+        if field in self.simulated_field_index:
+            return self.get_simulated(field)
+        if field not in self.derived:
+            self.derived[field] = self.calculate_derived(field)
+        return self.derived[field]
+
+    def __setitem__(self, field, values):
+        """
+        Sets the values of field, such as the feed used by each species. The
+        simulated values are not changed.
+        """
+        self.columns[field] = values
+
+    def __contains__(self, field):
+        return field in self.fields or field in self.columns
+
+    def keys(self):
+        """
+        Returns the names of all the fields
+        """
+        return self.fields + [f for f in self.columns if f not in self.fields]
+
+    def to_dataframe(self):
+        """
+        Returns the populations as a DataFrame with a column for each field, for
+        looking at in notebooks. Populations of several countries are indexed by
+        country and month. Values set which are not arrays (such as Food) are left
+        out.
+        """
+        if self.simulated.ndim == 3:
+            return pd.concat(
+                {
+                    country_code: self.for_country(country_code).to_dataframe()
+                    for country_code in self.country_codes
+                },
+                names=["country", None],
+            )
+
+        return pd.DataFrame(
+            {
+                field: self[field]
+                for field in self.keys()
+                if isinstance(self[field], np.ndarray)
+            }
+        )
 
 
 class CalculateAnimalOutputs:
@@ -51,51 +325,185 @@ class CalculateAnimalOutputs:
     import relevant data as dataframes and assign as properties of this class
     """
 
-    #
+    # results of calculate_feed_and_animals for each set of inputs, so scenarios with
+    # the same animal inputs don't simulate them again. The least recently used
+    # results are dropped once there are more than FEED_AND_ANIMALS_CACHE_SIZE.
+    feed_and_animals_cache = OrderedDict()
+    FEED_AND_ANIMALS_CACHE_SIZE = 256
+
+    # The slaughterhouses. slaughter_column is the column of the FAO slaughter counts,
+    # and slaughter_hours the resources/hours of single person hours to slaughter one
+    # animal (currently hardcoded !!). Spare slaughter capacity is passed on to the
+    # slaughterhouse named by spare_capacity_to, which must come later in the list
+    # (currently only poultry -> pig -> cow)
+    SLAUGHTER_POOLS = [
+        {
+            "name": "poultry",
+            "slaughter_column": "small_animal_slaughter",
+            "slaughter_hours": 0.08,
+            "spare_capacity_to": "pig",
+        },
+        {
+            "name": "pig",
+            "slaughter_column": "medium_animal_slaughter",
+            "slaughter_hours": 4,
+            "spare_capacity_to": "cow",
+        },
+        {
+            "name": "cow",
+            "slaughter_column": "large_animal_slaughter",
+            "slaughter_hours": 4,
+        },
+    ]
+
+    # The species simulated. Strings are the names of variables in
+    # InputDataAndSources.csv, numbers are used as they are.
+    # head_count_column: column of the FAO head counts
+    # slaughter_pool: the slaughterhouse the species is slaughtered in. Each
+    #     slaughterhouse has one species slaughtered by capacity, and at most one
+    #     species with a life_expectancy, which is slaughtered at the end of its life
+    # gestation: months until a reduction in breeding reduces the births
+    # offspring_per_mother: if set, births come from the pregnant mothers, which are
+    #     slaughtered as well. Otherwise births stay at their steady state rate.
+    # other_death: percent dying of other causes each year
+    # breeding_reduction: key of the reduction in breeding in the inputs
+    # life_expectancy: years until slaughter, for animals slaughtered at the end of
+    #     their life
+    # start_milking_age: years until milking starts, for dairy animals
+    # feed_pm_per_animal: feed requirements per animal each month, used to split the
+    #     feed of a country between the species
+    # uses_grass_and_residues: if set, the species isn't fed when
+    #     use_grass_and_residues_for_dairy is set
+    # culled_meat_size: size of the animal ("small", "medium" or "large") in
+    #     MeatAndDairy, for species whose slaughter is counted as culled meat
+    SPECIES = [
+        {
+            "name": "Poultry",
+            "head_count_column": "small_animals",
+            "slaughter_pool": "poultry",
+            "gestation": "Chicken Gestation",
+            "other_death": "Other poultry death",
+            "breeding_reduction": "reduction_in_poultry_breeding",
+            "feed_pm_per_animal": 1.824,
+            "culled_meat_size": "small",
+        },
+        {
+            "name": "Pig",
+            "population_name": "Pigs",
+            "head_count_column": "medium_animals",
+            "slaughter_pool": "pig",
+            "gestation": "pigGestation",
+            "offspring_per_mother": "PigsPerLitter",
+            "other_death": "Other pig death",
+            "breeding_reduction": "reduction_in_pig_breeding",
+            "feed_pm_per_animal": 68.4,
+            "culled_meat_size": "medium",
+        },
+        {
+            "name": "Beef",
+            "head_count_column": "large_animals",
+            "slaughter_pool": "cow",
+            "gestation": "cowGestation",
+            "offspring_per_mother": 1,
+            "other_death": "Other cow death",
+            "breeding_reduction": "reduction_in_beef_calves",
+            "feed_pm_per_animal": 296.4,
+            "culled_meat_size": "large",
+        },
+        {
+            "name": "Dairy",
+            "head_count_column": "dairy_cows",
+            "slaughter_pool": "cow",
+            "gestation": "cowGestation",
+            "other_death": "Other cow death",
+            "breeding_reduction": "reduction_in_dairy_calves",
+            # https://www.frontiersin.org/articles/10.3389/fvets.2021.646672/full
+            "life_expectancy": 5.87,
+            "start_milking_age": 2,
+            "feed_pm_per_animal": 475,
+            "uses_grass_and_residues": True,
+        },
+    ]
+
+    # if set to a directory, the results are also saved there and kept between runs.
+    # The saved results include a hash of the input data, but not of the code, so
+    # the directory should be emptied when the simulation changes.
+    CACHE_DIRECTORY = None
+
+    def __init__(self, species=None, slaughter_pools=None):
+        """
+        species and slaughter_pools replace the default SPECIES and SLAUGHTER_POOLS
+        tables if given, for example to add other species
+        """
+        self.species = self.SPECIES if species is None else species
+        self.slaughter_pools = (
+            self.SLAUGHTER_POOLS if slaughter_pools is None else slaughter_pools
+        )
 
-    def __init__(self):
-        pass
+        pool_names = [pool["name"] for pool in self.slaughter_pools]
+        for pool_name in pool_names:
+            in_pool = [a for a in self.species if a["slaughter_pool"] == pool_name]
+            slaughtered_by_capacity = [
+                a for a in in_pool if a.get("life_expectancy") is None
+            ]
+            assert (
+                len(slaughtered_by_capacity) == 1 and len(in_pool) <= 2
+            ), """each slaughter pool needs one species slaughtered by capacity, and at
+                most one slaughtered at the end of its life"""
+        for animal in self.species:
+            assert animal["slaughter_pool"] in pool_names, (
+                "unknown slaughter pool: " + animal["slaughter_pool"]
+            )
+        for p, pool in enumerate(self.slaughter_pools):
+            if pool.get("spare_capacity_to") is not None:
+                assert (
+                    pool["spare_capacity_to"] in pool_names[p + 1 :]
+                ), "spare capacity can only be passed to a later slaughter pool"
 
-    def calculate_country_specific_per_species_feed_consumption(
-        self, country_code, feed_ratio
-    ):
+        # the species the feed is split between, as named in the head count data
+        self.feed_species = [animal["head_count_column"] for animal in self.species]
+
+        # the species tables as part of the keys of cached results
+        self.species_key = repr((self.species, self.slaughter_pools))
+
+    def get_species_parameter(self, value):
         """
-        This function is used to calculate the total feed usage for a country
+        Returns a parameter from the species table, looking it up in
+        InputDataAndSources.csv if it is the name of a variable
+        """
+        if isinstance(value, str):
+            return animal_feed_data.df_animals.at[value, "Qty"]
+        return value
 
-        feed_ratio is a fraction from 0 to 1 which scales the default input feed per
-        month to a lower value. This is used to account for scenarios where the feed
-        is more than could possibly be supplied in the scenario.
+    def calculate_feed_per_head_table(self):
         """
+        Calculates the feed used per head each month by each species, for every
+        country at once, without reducing the feed (a feed_ratio of 1).
 
-        # Per country stuff from FAO (head)
-        small_animals = df_fao_animals.at[country_code, "small_animals"]
-        medium_animals = df_fao_animals.at[country_code, "medium_animals"]
-        large_animals = df_fao_animals.at[country_code, "large_animals"]
-        dairy_cows = df_fao_animals.at[country_code, "dairy_cows"]
+        Returns a dict of the row of each country code, and an array of shape
+        (n_countries, len(feed_species), 3) with the kcals (million dry caloric tons),
+        fat and protein (million tons) per head.
+        """
+        df_fao_animals = animal_feed_data.df_fao_animals
+        df_feed_country = animal_feed_data.df_feed_country
 
-        # Per country stuff from mike's data (million tonnes)
-        country_feed_caloric_annual = df_feed_country.at[
-            country_code,
-            "Animal feed caloric consumption in 2020 (million dry caloric tons)",
-        ]
-        country_feed_fat_annual = df_feed_country.at[
-            country_code, "Animal feed fat consumption in 2020 (million tonnes)"
-        ]
-        country_feed_protein_annual = df_feed_country.at[
-            country_code, "Animal feed protein consumption in 2020 (million tonnes)"
-        ]
+        country_codes = df_fao_animals.index.intersection(df_feed_country.index)
 
-        # convert to billion kcals from million dry caloric tons
-        country_total_feed_annual = Food(
-            kcals=country_feed_caloric_annual,
-            fat=country_feed_fat_annual,
-            protein=country_feed_protein_annual,
-            kcals_units="million dry caloric tons",
-            fat_units="million tons",
-            protein_units="million tons",
+        # Per country stuff from FAO (head), shape (n_countries, n_species)
+        head_counts = df_fao_animals.loc[country_codes, self.feed_species].to_numpy(
+            dtype=float
         )
 
-        country_total_feed_monthly = country_total_feed_annual * feed_ratio / 12
+        # Per country stuff from mike's data (million tonnes), shape (n_countries, 3)
+        country_feed_annual = df_feed_country.loc[
+            country_codes,
+            [
+                "Animal feed caloric consumption in 2020 (million dry caloric tons)",
+                "Animal feed fat consumption in 2020 (million tonnes)",
+                "Animal feed protein consumption in 2020 (million tonnes)",
+            ],
+        ].to_numpy(dtype=float)
+        country_feed_monthly = country_feed_annual / 12
 
         # Feed per animal per month calculated from bottom up assortment of papers in
         # roam
@@ -103,111 +511,158 @@ class CalculateAnimalOutputs:
         # requirements could be met from other means such as foraging/grazing non-feed
         # food sources)
         # Could also use LSUs from FAO, per country basis. Infact, we probably should.
-        small_animals_feed_pm_per_animal = 1.824
-        medium_animal_feed_pm_per_animal = 68.4
-        large_animal_feed_pm_per_animal = 296.4
-        dairy_feed_pm_per_cow = 475
-
-        # ratio of how much more do animals eat compared to a small animal
+        feed_pm_per_animal = np.array(
+            [animal["feed_pm_per_animal"] for animal in self.species]
+        )
 
         # weighted feed per animal per month
-        weighted_small_animal_feed = small_animals_feed_pm_per_animal * small_animals
-        weighted_medium_animal_feed = medium_animal_feed_pm_per_animal * medium_animals
-        weighted_large_animal_feed = large_animal_feed_pm_per_animal * large_animals
-        weighted_dairy_feed = dairy_feed_pm_per_cow * dairy_cows
-        weighted_total_feed = (
-            weighted_small_animal_feed
-            + weighted_medium_animal_feed
-            + weighted_large_animal_feed
-            + weighted_dairy_feed
-        )
+        weighted_feed = feed_pm_per_animal * head_counts
+        weighted_total_feed = weighted_feed.sum(axis=1, keepdims=True)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # species feed as a fraction of total feed per animal. Sum of these
+            # should be 1
+            fractional_feed = weighted_feed / weighted_total_feed
+
+            # feed per animal per month country specific. This is technically the
+            # same value as the feed per animal per month calculated from the bottom
+            # up, but it instead uses those ratios to calaculate the feed, and then
+            # uses the country-specific animal feed usage to estimate the actual feed
+            # used.
+            feed_per_head = (
+                country_feed_monthly[:, np.newaxis, :]
+                * fractional_feed[:, :, np.newaxis]
+                / head_counts[:, :, np.newaxis]
+            )
 
-        # species feed as a fraction of total feed per animal. Sum of these should be 1
-        fractional_small_animal_feed = weighted_small_animal_feed / weighted_total_feed
-        fractional_medium_animal_feed = (
-            weighted_medium_animal_feed / weighted_total_feed
-        )
-        fractional_large_animal_feed = weighted_large_animal_feed / weighted_total_feed
-        fractional_dairy_feed = weighted_dairy_feed / weighted_total_feed
+        # species with no animals use no feed
+        feed_per_head = np.where(head_counts[:, :, np.newaxis] == 0, 0, feed_per_head)
 
-        # feed per species per month country specific
-        monthly_feed_consumption_small_animals = (
-            country_total_feed_monthly * fractional_small_animal_feed
-        )
-        monthly_feed_consumption_medium_animals = (
-            country_total_feed_monthly * fractional_medium_animal_feed
-        )
-        monthly_feed_consumption_large_animals = (
-            country_total_feed_monthly * fractional_large_animal_feed
-        )
-        monthly_feed_consumption_dairy_cows = (
-            country_total_feed_monthly * fractional_dairy_feed
-        )
+        country_index = {code: i for i, code in enumerate(country_codes)}
 
-        # feed per animal per month country specific. This is technically the same
-        # value as the feed per animal per month calculated from the bottom up,
-        # but it instead uses those ratios to calaculate the feed, and then uses the
-        # country-specific animal feed usage to estimate the actual feed used.
-        country_specific_feed_per_small_animal_head_pm = (
-            Food(
-                kcals=0,
-                fat=0,
-                protein=0,
-                kcals_units=monthly_feed_consumption_small_animals.kcals_units,
-                fat_units=monthly_feed_consumption_small_animals.fat_units,
-                protein_units=monthly_feed_consumption_small_animals.protein_units,
-            )
-            if small_animals == 0
-            else (monthly_feed_consumption_small_animals / small_animals)
-        )
-        country_specific_feed_per_medium_animal_head_pm = (
-            Food(
-                kcals=0,
-                fat=0,
-                protein=0,
-                kcals_units=monthly_feed_consumption_medium_animals.kcals_units,
-                fat_units=monthly_feed_consumption_medium_animals.fat_units,
-                protein_units=monthly_feed_consumption_medium_animals.protein_units,
-            )
-            if medium_animals == 0
-            else (monthly_feed_consumption_medium_animals / medium_animals)
-        )
-        country_specific_feed_per_large_animal_head_pm = (
-            Food(
-                kcals=0,
-                fat=0,
-                protein=0,
-                kcals_units=monthly_feed_consumption_large_animals.kcals_units,
-                fat_units=monthly_feed_consumption_large_animals.fat_units,
-                protein_units=monthly_feed_consumption_large_animals.protein_units,
-            )
-            if large_animals == 0
-            else (monthly_feed_consumption_large_animals / large_animals)
-        )
+        return country_index, feed_per_head
 
-        country_specific_feed_per_dairy_cow_head_pm = (
-            Food(
-                kcals=0,
-                fat=0,
-                protein=0,
-                kcals_units=monthly_feed_consumption_dairy_cows.kcals_units,
-                fat_units=monthly_feed_consumption_dairy_cows.fat_units,
-                protein_units=monthly_feed_consumption_dairy_cows.protein_units,
-            )
-            if dairy_cows == 0
-            else (monthly_feed_consumption_dairy_cows / dairy_cows)
+    def get_feed_per_head_table(self):
+        """
+        Returns the feed per head table (see calculate_feed_per_head_table), which is
+        only calculated once for the animal feed data and species
+        """
+        key = (
+            "feed_per_head",
+            tuple(
+                (animal["head_count_column"], animal["feed_pm_per_animal"])
+                for animal in self.species
+            ),
         )
+        if key not in animal_feed_data.derived:
+            animal_feed_data.derived[key] = self.calculate_feed_per_head_table()
 
-        # create dict from the above
-        country_specific_feed_per_animal_head_pm = {
-            "small_animals": country_specific_feed_per_small_animal_head_pm,
-            "medium_animals": country_specific_feed_per_medium_animal_head_pm,
-            "large_animals": country_specific_feed_per_large_animal_head_pm,
-            "dairy_cows": country_specific_feed_per_dairy_cow_head_pm,
-        }
+        return animal_feed_data.derived[key]
+
+    def calculate_country_specific_per_species_feed_consumption(
+        self, country_code, feed_ratio
+    ):
+        """
+        This function is used to calculate the total feed usage for a country
+
+        feed_ratio is a fraction from 0 to 1 which scales the default input feed per
+        month to a lower value. This is used to account for scenarios where the feed
+        is more than could possibly be supplied in the scenario.
+
+        Returns a dict of the feed per head each month of each species, by head count
+        column (such as "small_animals"), read from the feed per head table.
+        """
+        country_index, feed_per_head = self.get_feed_per_head_table()
+        country_feed_per_head = feed_per_head[country_index[country_code]] * feed_ratio
+
+        country_specific_feed_per_animal_head_pm = {}
+        for species, (kcals, fat, protein) in zip(
+            self.feed_species, country_feed_per_head
+        ):
+            country_specific_feed_per_animal_head_pm[species] = Food(
+                kcals=kcals,
+                fat=fat,
+                protein=protein,
+                kcals_units="million dry caloric tons",
+                fat_units="million tons",
+                protein_units="million tons",
+            )
         return country_specific_feed_per_animal_head_pm
 
     def calculate_feed_and_animals(self, data):
+        """
+        Returns the feed and animal populations for a given country, from the cache if
+        they have already been calculated for the same inputs (see
+        calculate_feed_and_animals_uncached). Read only views of the cached results
+        are returned rather than copies, so the caller can't change the cached
+        results (see AnimalPopulations.get_read_only_view).
+        """
+        key = (self.species_key,) + tuple(data.items())
+        # results calculated before the animal feed data was changed aren't reused
+        memory_key = (animal_feed_data.version, key)
+
+        cache = self.feed_and_animals_cache
+        if memory_key in cache:
+            cache.move_to_end(memory_key)
+        else:
+            result = self.load_cached_feed_and_animals(key)
+            if result is None:
+                result = self.calculate_feed_and_animals_uncached(data)
+                self.save_cached_feed_and_animals(key, result)
+            cache[memory_key] = result
+            while len(cache) > self.FEED_AND_ANIMALS_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        populations, feed = cache[memory_key]
+        return populations.get_read_only_view(), feed.get_view(slice(None))
+
+    def clear_cache():
+        """
+        Drops all the results of calculate_feed_and_animals kept in memory (the
+        results saved in CACHE_DIRECTORY are kept)
+        """
+        CalculateAnimalOutputs.feed_and_animals_cache.clear()
+
+    def get_cache_path(self, key):
+        """
+        Returns the file the results for key are saved to in CACHE_DIRECTORY. The
+        input data is part of the name, so results are recalculated if it changes.
+        """
+        name_hash = hashlib.sha256(repr(key).encode())
+        for table_name in AnimalFeedData.TABLES:
+            df = getattr(animal_feed_data, table_name)
+            name_hash.update(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+        name = name_hash.hexdigest()
+
+        return Path(self.CACHE_DIRECTORY) / ("feed_and_animals_" + name + ".pkl")
+
+    def load_cached_feed_and_animals(self, key):
+        """
+        Returns the results saved in CACHE_DIRECTORY for key, or None if there are none
+        """
+        if self.CACHE_DIRECTORY is None:
+            return None
+
+        path = self.get_cache_path(key)
+        if not path.exists():
+            return None
+
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def save_cached_feed_and_animals(self, key, result):
+        """
+        Saves the results for key in CACHE_DIRECTORY, if it is set
+        """
+        if self.CACHE_DIRECTORY is None:
+            return
+
+        path = self.get_cache_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(result, f)
+
+    def calculate_feed_and_animals_uncached(self, data):
         """
         This function calculates the feed and animal populations for a given country
         Parameters
@@ -216,9 +671,10 @@ class CalculateAnimalOutputs:
             Dictionary containing the country code and the animal populations
         Returns
         -------
-        df_out : pandas.DataFrame
-            Dataframe containing the animal populations and the feed used for each
-            species
+        populations : AnimalPopulations
+            The animal populations and the feed used for each species
+        feed : Food
+            The total feed used each month
         """
         # Here are the two functions that are called
         # The first one calculates the feed per animal per month for each species
@@ -226,54 +682,177 @@ class CalculateAnimalOutputs:
         feed_dict = self.calculate_country_specific_per_species_feed_consumption(
             data["country_code"], data["feed_ratio"]
         )
-        df_out = self.calculate_animal_populations(data)
+        populations = self.calculate_animal_populations(data)
 
         # if nan population, assume zero
-        df_out["Poultry Pop"] = df_out["Poultry Pop"].replace(np.nan, 0)
-        df_out["Pigs Pop"] = df_out["Pigs Pop"].replace(np.nan, 0)
-        df_out["Beef Pop"] = df_out["Beef Pop"].replace(np.nan, 0)
-        df_out["Dairy Pop"] = df_out["Dairy Pop"].replace(np.nan, 0)
+        population_fields = [
+            populations.get_field_name(animal, "Pop") for animal in self.species
+        ]
+        for field in population_fields:
+            populations[field] = np.where(
+                np.isnan(populations[field]), 0, populations[field]
+            )
 
         # if nan population, assume zero
         # TODO: deal with nan isssue when creating food object in the first place
         # feed_dict["small_animals"] = (
         #     0 if np.isnan(feed_dict["small_animals"]) else feed_dict["small_animals"]
         # )
-        # feed_dict["medium_animals"] = (
-        #     0 if np.isnan(feed_dict["medium_animals"]) else feed_dict["medium_animals"]
-        # )
-        # feed_dict["large_animals"] = (
-        #     0 if np.isnan(feed_dict["large_animals"]) else feed_dict["large_animals"]
-        # )
-        # feed_dict["dairy_cows"] = (
-        #     0 if np.isnan(feed_dict["dairy_cows"]) else feed_dict["dairy_cows"]
-        # )
 
         # combine together
-        poultry_feed = feed_dict["small_animals"] * np.array(
-            df_out["Poultry Pop"].values
-        )
-        pork_feed = feed_dict["medium_animals"] * np.array(df_out["Pigs Pop"].values)
-        beef_feed = feed_dict["large_animals"] * np.array(df_out["Beef Pop"].values)
-
-        if data["use_grass_and_residues_for_dairy"]:
-            dairy_feed = Food(
-                kcals=np.zeros(len(df_out["Poultry Pop"].values)),
-                fat=np.zeros(len(df_out["Poultry Pop"].values)),
-                protein=np.zeros(len(df_out["Poultry Pop"].values)),
-                kcals_units="million dry caloric tons each month",
-                fat_units="million tons each month",
-                protein_units="million tons each month",
+        feed = None
+        for animal, population_field in zip(self.species, population_fields):
+            if data["use_grass_and_residues_for_dairy"] and animal.get(
+                "uses_grass_and_residues"
+            ):
+                species_feed = Food(
+                    kcals=np.zeros(populations.months),
+                    fat=np.zeros(populations.months),
+                    protein=np.zeros(populations.months),
+                    kcals_units="million dry caloric tons each month",
+                    fat_units="million tons each month",
+                    protein_units="million tons each month",
+                )
+            else:
+                species_feed = (
+                    feed_dict[animal["head_count_column"]]
+                    * populations[population_field]
+                )
+
+            populations[animal["name"] + " Feed"] = species_feed
+            feed = species_feed if feed is None else feed + species_feed
+        return populations, feed
+
+    def explore_policy_grid(
+        self,
+        grid,
+        data,
+        culled_meat_per_animal=None,
+        country_codes=None,
+        max_columns=20000,
+    ):
+        """
+        Calculates the animal populations, feed and culled meat of every combination of
+        breeding and slaughter policies for all countries, so the policies can be
+        compared without running each scenario and country separately.
+
+        grid is a dict of lists of values to try for any of the breeding reductions
+        (such as "reduction_in_beef_calves"), "increase_in_slaughter",
+        "discount_rate" and "mother_slaughter". The other inputs (and the values of
+        the policies not in the grid) are taken from data, as in
+        calculate_feed_and_animals. The combinations are simulated together, at most
+        max_columns countries and combinations in each pass.
+
+        culled_meat_per_animal is the meat of each small, medium and large animal
+        slaughtered, as returned by MeatAndDairy.get_culled_meat_per_animal. If it
+        isn't given, the culled meat isn't calculated.
+
+        Returns a dict of
+            scenarios: the policies of each combination, as dicts
+            country_codes: the countries simulated, defaulting to every country with
+                head count, slaughter and feed data
+            species: the names of the species
+            populations, slaughtered: the head counts and the animals slaughtered each
+                month, shape (n_scenarios, n_countries, months, n_species)
+            feed: the feed used each month, shape (n_scenarios, n_countries, months, 3)
+                in million dry caloric tons, million tons fat and million tons protein
+            culled_meat: the meat of the animals slaughtered each month, shape
+                (n_scenarios, n_countries, months, 3) in billion kcals, thousand tons
+                fat and thousand tons protein, or None
+        """
+        policy_keys = [animal["breeding_reduction"] for animal in self.species] + [
+            "increase_in_slaughter",
+            "discount_rate",
+            "mother_slaughter",
+        ]
+        for key in grid:
+            assert key in policy_keys, "can't explore values of " + key
+
+        if country_codes is None:
+            country_codes = (
+                animal_feed_data.df_fao_animals.index.intersection(
+                    animal_feed_data.df_fao_slaughter.index
+                )
+                .intersection(animal_feed_data.df_feed_country.index)
+                .tolist()
             )
-        else:
-            dairy_feed = feed_dict["dairy_cows"] * np.array(df_out["Dairy Pop"].values)
+        country_codes = list(country_codes)
+        n_countries = len(country_codes)
+
+        scenarios = [
+            dict(zip(grid.keys(), values))
+            for values in itertools.product(*grid.values())
+        ]
+        months = data["months"]
+        n_species = len(self.species)
+
+        # simulate the combinations in chunks, each country of each combination is one
+        # column of the simulation
+        scenarios_per_chunk = max(1, max_columns // max(n_countries, 1))
+        simulated_chunks = []
+        for start in range(0, len(scenarios), scenarios_per_chunk):
+            chunk = scenarios[start : start + scenarios_per_chunk]
+            chunk_data = dict(data)
+            for key in grid:
+                chunk_data[key] = np.repeat(
+                    [scenario[key] for scenario in chunk], n_countries
+                )
+            populations = self.calculate_animal_populations_all_countries(
+                chunk_data, country_codes * len(chunk)
+            )
+            simulated_chunks.append(
+                populations.simulated.reshape(len(chunk), n_countries, months, -1)
+            )
+        simulated = np.concatenate(simulated_chunks)
 
-        df_out["Poultry Feed"] = poultry_feed
-        df_out["Pig Feed"] = pork_feed
-        df_out["Beef Feed"] = beef_feed
-        df_out["Dairy Feed"] = dairy_feed
-        feed = poultry_feed + pork_feed + beef_feed + dairy_feed
-        return df_out, feed
+        def get_simulated_value(value):
+            value_index = AnimalPopulations.SIMULATED_VALUES.index(value)
+            return simulated[
+                ..., value_index * n_species : (value_index + 1) * n_species
+            ]
+
+        # if nan population, assume zero
+        head_counts = get_simulated_value("Pop")
+        head_counts = np.where(np.isnan(head_counts), 0, head_counts)
+        slaughtered = get_simulated_value("Slaughtered")
+
+        # feed of each species, added together in the same order as
+        # calculate_feed_and_animals
+        country_index, feed_per_head = self.get_feed_per_head_table()
+        rows = [country_index[code] for code in country_codes]
+        country_feed_per_head = feed_per_head[rows] * data["feed_ratio"]
+        feed = np.zeros((len(scenarios), n_countries, months, 3))
+        for s, animal in enumerate(self.species):
+            if data["use_grass_and_residues_for_dairy"] and animal.get(
+                "uses_grass_and_residues"
+            ):
+                continue
+            feed = feed + (
+                country_feed_per_head[np.newaxis, :, np.newaxis, s, :]
+                * head_counts[..., s, np.newaxis]
+            )
+
+        culled_meat = None
+        if culled_meat_per_animal is not None:
+            size_index = {"small": 0, "medium": 1, "large": 2}
+            culled_meat = np.zeros((len(scenarios), n_countries, months, 3))
+            for s, animal in enumerate(self.species):
+                if animal.get("culled_meat_size") is None:
+                    continue
+                culled_meat = culled_meat + (
+                    slaughtered[..., s, np.newaxis]
+                    * culled_meat_per_animal[size_index[animal["culled_meat_size"]]]
+                )
+
+        return {
+            "scenarios": scenarios,
+            "country_codes": country_codes,
+            "species": [animal["name"] for animal in self.species],
+            "populations": head_counts,
+            "slaughtered": slaughtered,
+            "feed": feed,
+            "culled_meat": culled_meat,
+        }
 
     def calculate_animal_populations(self, data):
         """
@@ -296,314 +875,307 @@ class CalculateAnimalOutputs:
         will be used on pregnant animals.)
         use_grass_and_residues_for_dairy: Whether to Use Residues for Dairy
         """
+        populations = self.calculate_animal_populations_all_countries(
+            data, [data["country_code"]]
+        )
 
-        # unpack input dict
-        (
-            country_code,
-            reduction_in_beef_calves,
-            reduction_in_dairy_calves,
-            increase_in_slaughter,
-            reduction_in_pig_breeding,
-            reduction_in_poultry_breeding,
-            months,
-            discount_rate,
-            mother_slaughter,
-            use_grass_and_residues_for_dairy,
-            keep_dairy,
-            feed_ratio,
-        ) = data.values()
+        return populations.for_country(data["country_code"])
 
-        steady_state_births = 1
+    def calculate_animal_populations_all_countries(self, data, country_codes=None):
+        """
+        Simulates the animal populations of many countries at once. The state of every
+        species in every country is held in arrays of shape (n_species, n_countries),
+        so each month is one vector step for the whole world rather than one python
+        loop per country. The species are described by the species table, so other
+        species can be simulated without changing this function.
+
+        Inputs are the same as calculate_animal_populations, except the country code
+        in data is ignored. country_codes is the list of countries to simulate,
+        defaulting to every country with both head count and slaughter data. A country
+        code can be repeated, and the breeding reductions, increase_in_slaughter,
+        discount_rate and mother_slaughter can be arrays with a value for each country
+        code, to simulate several policies at once.
+
+        Returns the AnimalPopulations of all the countries, with the simulated values
+        in one array of shape (n_countries, months, len(simulated_fields)).
+        """
+        slaughter_inputs = animal_feed_data.df_fao_slaughter
+        df_fao_animals = animal_feed_data.df_fao_animals
 
-        other_cow_death_rate_annual = animal_inputs.at["Other cow death", "Qty"] / 100
-        other_pig_death_rate_annual = animal_inputs.at["Other pig death", "Qty"] / 100
-        other_poultry_death_rate_annual = (
-            animal_inputs.at["Other poultry death", "Qty"] / 100
-        )
+        if country_codes is None:
+            country_codes = list(
+                df_fao_animals.index.intersection(slaughter_inputs.index)
+            )
+        country_codes = list(country_codes)
 
-        other_poultry_death_rate_monthly = other_poultry_death_rate_annual / 12
-        other_pig_death_rate_monthly = other_pig_death_rate_annual / 12
-        other_cow_death_rate_monthly = other_cow_death_rate_annual / 12
+        months = data["months"]
+        # the policy inputs may be arrays with a value for each country code
+        discount_rate = np.asarray(data["discount_rate"])
+        mother_slaughter = np.asarray(data["mother_slaughter"])
+        keep_dairy = data["keep_dairy"]
 
-        # unpack all the dataframe information for ease of use
-        # pigs
-        total_pigs = df_fao_animals.at[country_code, "medium_animals"]
-        pigs_slaughter_pm = (
-            slaughter_inputs.at[country_code, "medium_animal_slaughter"] / 12
-        )
-        pigGestation = animal_inputs.at["pigGestation", "Qty"]
-        piglets_per_litter = animal_inputs.at["PigsPerLitter", "Qty"]
+        steady_state_births = 1
+
+        # unpack the species table into arrays with one value for each species
+        species = self.species
+        pools = self.slaughter_pools
+        pool_index = {pool["name"]: p for p, pool in enumerate(pools)}
+        species_pool = np.array([pool_index[a["slaughter_pool"]] for a in species])
+        # the slaughterhouse each slaughterhouse passes its spare capacity to, or None
+        spare_capacity_to = [
+            pool_index.get(pool.get("spare_capacity_to")) for pool in pools
+        ]
 
-        # poultry
-        total_poultry = df_fao_animals.at[country_code, "small_animals"]
-        poultry_slaughter_pm = (
-            slaughter_inputs.at[country_code, "small_animal_slaughter"] / 12
+        gestation = np.array(
+            [self.get_species_parameter(a["gestation"]) for a in species]
         )
-        poultryGestation = animal_inputs.at["Chicken Gestation", "Qty"]
-        # USDA  # actaully 21 days, let's round to 1 month
-
-        # cows (more complex, as need to split dairy and beef)
-        total_dairy_cows = df_fao_animals.at[country_code, "dairy_cows"]
-        total_beef_cows = df_fao_animals.at[country_code, "large_animals"]
-        cow_slaughter_pm = (
-            slaughter_inputs.at[country_code, "large_animal_slaughter"] / 12
+        has_mothers = np.array(
+            [a.get("offspring_per_mother") is not None for a in species]
         )
-        cowGestation = animal_inputs.loc["cowGestation", "Qty"]
-        calves_per_mother = 1
-
-        # life expetency values
-        dairy_life_expectancy = (
-            5.87  # https://www.frontiersin.org/articles/10.3389/fvets.2021.646672/full
+        offspring_per_mother = np.array(
+            [
+                self.get_species_parameter(a["offspring_per_mother"])
+                if a.get("offspring_per_mother") is not None
+                else 1
+                for a in species
+            ]
         )
-        dairy_start_milking_age = 2
-        dairy_track_milk_ready_percent = (
-            dairy_life_expectancy - dairy_start_milking_age
-        ) / dairy_life_expectancy
-        dairy_cows_end_of_life_annual = (
-            total_dairy_cows / dairy_life_expectancy
-            + total_dairy_cows * other_cow_death_rate_annual
-        )  # first terms are those being slaughtered once milking is done, then
-        # combine this with other death
-
-        # calculate expected death rates, day 0 (normal conditions)
-        poultry_total_death_pm = (
-            poultry_slaughter_pm + total_poultry * other_poultry_death_rate_monthly
+        other_death_rate_annual = np.array(
+            [self.get_species_parameter(a["other_death"]) / 100 for a in species]
         )
-        pig_total_death_pm = (
-            pigs_slaughter_pm + total_pigs * other_pig_death_rate_monthly
-        )  # assume replacement rate
-        dairy_total_death_pm = dairy_cows_end_of_life_annual / 12
-        beef_total_death_pm = (
-            cow_slaughter_pm
-            + total_beef_cows * other_cow_death_rate_monthly
-            - dairy_total_death_pm
+        other_death_rate_monthly = other_death_rate_annual / 12
+        # animals slaughtered at the end of their life, rather than by capacity
+        end_of_life = np.array([a.get("life_expectancy") is not None for a in species])
+        life_expectancy = np.array(
+            [a.get("life_expectancy") or np.nan for a in species]
         )
 
-        # assume steady state popualtion, define birth rates from death rates
-        new_pigs_pm = pig_total_death_pm
-        new_poultry_pm = poultry_total_death_pm
-        new_dairy_calves_pm = dairy_total_death_pm
-        new_beef_calves_pm = beef_total_death_pm
-
         # interventions, scale appropriately for maths (i.e convert sliders from % to
         # decimal)
-        reduction_in_beef_calves *= 0.01
-        reduction_in_dairy_calves *= 0.01
-        reduction_in_pig_breeding *= 0.01
-        reduction_in_poultry_breeding *= 0.01
-        increase_in_slaughter *= 0.01
+        # shape (n_species, 1), or (n_species, n_countries) if the reductions are
+        # different for each country code
+        breeding_reduction = np.stack(
+            np.broadcast_arrays(
+                *[np.asarray(data[a["breeding_reduction"]]) * 0.01 for a in species]
+            )
+        ).reshape(len(species), -1)
+        increase_in_slaughter = np.asarray(data["increase_in_slaughter"]) * 0.01
+
+        # unpack all the dataframe information for every country as arrays, shape
+        # (n_species, n_countries)
+        total_animals = (
+            df_fao_animals.loc[country_codes, [a["head_count_column"] for a in species]]
+            .to_numpy()
+            .T
+        )
+        # slaughter of each slaughterhouse, shape (n_pools, n_countries)
+        pool_slaughter_pm = (
+            slaughter_inputs.loc[
+                country_codes, [pool["slaughter_column"] for pool in pools]
+            ]
+            .to_numpy()
+            .T
+            / 12
+        )
+        pool_slaughter_hours = np.array([pool["slaughter_hours"] for pool in pools])
+
+        # calculate expected death rates, day 0 (normal conditions). Animals
+        # slaughtered at the end of their life (dairy) are slaughtered once they are
+        # done, then combine this with other death. Their deaths use up some of the
+        # slaughter of their slaughterhouse.
+        with np.errstate(invalid="ignore"):
+            end_of_life_total_death_pm = np.where(
+                end_of_life[:, np.newaxis],
+                (
+                    total_animals / life_expectancy[:, np.newaxis]
+                    + total_animals * other_death_rate_annual[:, np.newaxis]
+                )
+                / 12,
+                0,
+            )
+        pool_end_of_life_death_pm = np.zeros(pool_slaughter_pm.shape)
+        np.add.at(pool_end_of_life_death_pm, species_pool, end_of_life_total_death_pm)
+        total_death_pm = np.where(
+            end_of_life[:, np.newaxis],
+            end_of_life_total_death_pm,
+            pool_slaughter_pm[species_pool]
+            + total_animals * other_death_rate_monthly[:, np.newaxis]
+            - pool_end_of_life_death_pm[species_pool],
+        )
+
+        # assume steady state popualtion, define birth rates from death rates
+        new_animals_pm = total_death_pm
 
         # pregnant animals
-        current_pregnant_sows = new_pigs_pm / piglets_per_litter
-        current_pregnant_cows = new_beef_calves_pm / calves_per_mother
-        sow_slaughter_percent = (
-            mother_slaughter / 100
-        )  # of total percent of pig slaughter
-        mother_cow_slaughter_percent = (
-            mother_slaughter / 100  # of total percent of cow slaughter
+        current_pregnant = np.where(
+            has_mothers[:, np.newaxis],
+            new_animals_pm / offspring_per_mother[:, np.newaxis],
+            0,
         )
+        mother_slaughter_percent = (
+            mother_slaughter / 100
+        )  # of total percent of slaughter
 
         # ### Slaughtering ####
-        # ## Slaughtering variables (currently hardcoded !!)
-        # total slaughter capacity
-        cow_slaughter_hours = (
-            4  # resources/hours of single person hours for slaughter of cow
-        )
-        pig_slaughter_hours = (
-            4  # resources/hours of single person hours for slaughter of pig
-        )
-        poultry_slaughter_hours = (
-            0.08  # resources/hours of single person hours for slaughter of poultry
+        total_slaughter_cap_hours = np.sum(
+            pool_slaughter_pm * pool_slaughter_hours[:, np.newaxis], axis=0
         )
-        total_slaughter_cap_hours = (
-            cow_slaughter_pm * cow_slaughter_hours
-            + pigs_slaughter_pm * pig_slaughter_hours
-            + poultry_slaughter_pm * poultry_slaughter_hours
-        )
-        skill_transfer_discount_chickens_to_pigs = (100 - discount_rate) / 100  #
-        skill_transfer_discount_pigs_to_cows = (100 - discount_rate) / 100  #
+        skill_transfer_discount = (100 - discount_rate) / 100
 
         # # Slaughtering Updates, increases from slider
-        total_slaughter_cap_hours *= increase_in_slaughter  # measured in hours
-        current_cow_slaughter = (
-            cow_slaughter_pm * increase_in_slaughter
-        )  # measured in head
-        current_poultry_slaughter = (
-            poultry_slaughter_pm * increase_in_slaughter
-        )  # measured in head
-        current_pig_slaughter = (
-            pigs_slaughter_pm * increase_in_slaughter
+        total_slaughter_cap_hours = (
+            total_slaughter_cap_hours * increase_in_slaughter
+        )  # measured in hours
+        current_pool_slaughter = (
+            pool_slaughter_pm * increase_in_slaughter
         )  # measured in head
-        spare_slaughter_hours = 0
 
-        # # define current totals
-        # current_beef_feed_cattle = cattle_on_feed
-        current_beef_cattle = total_beef_cows
-        current_dairy_cattle = total_dairy_cows
-        current_total_pigs = total_pigs
-        current_total_poultry = total_poultry
+        # the species slaughtered by capacity, and at the end of its life (or -1 if
+        # there isn't one), in each slaughterhouse
+        capacity_species = [
+            int(np.flatnonzero((species_pool == p) & ~end_of_life)[0])
+            for p in range(len(pools))
+        ]
+        end_of_life_species = [
+            int(next(iter(np.flatnonzero((species_pool == p) & end_of_life)), -1))
+            for p in range(len(pools))
+        ]
 
-        d = []  # create empty list to place variables in to in loop
+        # # define current totals
+        current_animals = total_animals
+
+        n_species = len(species)
+        simulated = np.empty(
+            (
+                len(country_codes),
+                months,
+                len(AnimalPopulations.SIMULATED_VALUES) * n_species,
+            )
+        )
 
-        # simulate x months
+        # simulate x months, for all the species and countries at once
         for i in range(months):
             if steady_state_births == 1:
-                new_pigs_pm = current_pregnant_sows * piglets_per_litter
-                new_beef_calves_pm = current_pregnant_cows * calves_per_mother
-
-            # determine birth rates
-            if np.abs(i - cowGestation) <= 0.5:
-                new_beef_calves_pm *= 1 - reduction_in_beef_calves
-                new_dairy_calves_pm *= 1 - reduction_in_dairy_calves
-                current_pregnant_cows *= 1 - reduction_in_beef_calves
-
-            if np.abs(i - pigGestation) <= 0.5:
-                new_pigs_pm *= 1 - reduction_in_pig_breeding
-                current_pregnant_sows *= 1 - reduction_in_pig_breeding
-
-            if np.abs(i - poultryGestation) <= 0.5:
-                new_poultry_pm *= 1 - reduction_in_poultry_breeding
-
-            if new_pigs_pm < 0:
-                new_pigs_pm = 0
-
-            if new_beef_calves_pm < 0:
-                new_beef_calves_pm = 0
-
-            # Transfer excess slaughter capacity to next animal, current coding method
-            # only allows poultry -> pig -> cow, there are some small erros here due to
-            # rounding, and the method is not 100% water tight but errors are within the
-            # noise
-
-            # ### This is where the issue was!
-            # added the new_poultry_pm and new_pigs_pm to the current totals. These
-            # were left out and meant that the populations would grow but the slaughter
-            if current_total_poultry < current_poultry_slaughter:
-                spare_slaughter_hours = (
-                    current_poultry_slaughter - current_total_poultry - new_poultry_pm
-                ) * poultry_slaughter_hours
-                current_poultry_slaughter = current_total_poultry + new_poultry_pm
-                current_pig_slaughter += (
-                    spare_slaughter_hours
-                    * skill_transfer_discount_chickens_to_pigs
-                    / pig_slaughter_hours
-                )
-            if current_total_pigs < current_pig_slaughter:
-                spare_slaughter_hours = (
-                    current_pig_slaughter - current_total_pigs - new_pigs_pm
-                ) * pig_slaughter_hours
-                current_pig_slaughter = current_total_pigs + new_pigs_pm
-                current_cow_slaughter += (
-                    spare_slaughter_hours
-                    * skill_transfer_discount_pigs_to_cows
-                    / cow_slaughter_hours
+                new_animals_pm = np.where(
+                    has_mothers[:, np.newaxis],
+                    current_pregnant * offspring_per_mother[:, np.newaxis],
+                    new_animals_pm,
                 )
 
-            # this set up only kills dairy cows when they are getting to the end of
-            # their life.
-            current_dairy_slaughter = (
-                current_dairy_cattle / (dairy_life_expectancy) / 12
+            # determine birth rates
+            gestation_over = (np.abs(i - gestation) <= 0.5)[:, np.newaxis]
+            new_animals_pm = np.where(
+                gestation_over,
+                new_animals_pm * (1 - breeding_reduction),
+                new_animals_pm,
             )
-            current_beef_slaughter = current_cow_slaughter - current_dairy_slaughter
-            if current_beef_cattle < current_beef_slaughter:
-                # line below required due to the difference between actual slaughter
-                # and 'slaughter capacity' consider a rewrite of the whole method to
-                # distinuguish between these two. For now, this is thr workaround.
-                actual_beef_slaughter = current_beef_cattle
-
-                if keep_dairy == 0:
-                    current_dairy_slaughter = (
-                        current_cow_slaughter - actual_beef_slaughter
-                    )
-
-            else:
-                actual_beef_slaughter = current_beef_slaughter
-
-            other_beef_death = other_cow_death_rate_monthly * current_beef_cattle
-            other_dairy_death = other_cow_death_rate_monthly * current_dairy_cattle
-            other_pig_death = current_total_pigs * other_pig_death_rate_monthly
-            other_poultry_death = (
-                current_total_poultry * other_poultry_death_rate_monthly
+            current_pregnant = np.where(
+                gestation_over & has_mothers[:, np.newaxis],
+                current_pregnant * (1 - breeding_reduction),
+                current_pregnant,
             )
 
-            # ## Generate list (before new totals have been calculated)
-            # magnitude adjust moves the numbers from per thousnad head to per head (or
-            # other)
-            # feed adjust turns lbs in to tons
-            d.append(
-                {
-                    "Beef Pop": current_beef_cattle,
-                    "Beef Born": new_beef_calves_pm,
-                    "Beef Slaughtered": actual_beef_slaughter,
-                    "Beef Slaughtered Hours": actual_beef_slaughter
-                    * cow_slaughter_hours,
-                    "Beef Slaughtered Hours %": actual_beef_slaughter
-                    * cow_slaughter_hours
-                    / total_slaughter_cap_hours,
-                    "Beef Other Death": other_beef_death,
-                    "Dairy Pop": current_dairy_cattle,
-                    "Dairy Cow Pop": current_dairy_cattle,
-                    "Dairy Milk Ready Pop": current_dairy_cattle
-                    * dairy_track_milk_ready_percent,
-                    "Dairy Born": new_dairy_calves_pm,
-                    "Dairy Slaughtered": current_dairy_slaughter,
-                    "Dairy Slaughtered Hours": current_dairy_slaughter
-                    * cow_slaughter_hours,
-                    "Dairy Slaughtered Hours %": current_dairy_slaughter
-                    * cow_slaughter_hours
-                    / total_slaughter_cap_hours,
-                    "Dairy Other Death": other_dairy_death,
-                    "Pigs Pop": current_total_pigs,
-                    "Pig Born": new_pigs_pm,
-                    "Pig Slaughtered": current_pig_slaughter,
-                    "Pig Slaughtered Hours": current_pig_slaughter
-                    * pig_slaughter_hours,
-                    "Pig Slaughtered Hours %": current_pig_slaughter
-                    * pig_slaughter_hours
-                    / total_slaughter_cap_hours,
-                    "Poultry Pop": current_total_poultry,
-                    "Poultry Born": new_poultry_pm,
-                    "Poultry Slaughtered": current_poultry_slaughter,
-                    "Poultry Slaughtered Hours": current_poultry_slaughter
-                    * poultry_slaughter_hours,
-                    "Poultry Slaughtered Hours %": current_poultry_slaughter
-                    * poultry_slaughter_hours
-                    / total_slaughter_cap_hours,
-                    "Month": i,
-                }
+            new_animals_pm = np.where(
+                has_mothers[:, np.newaxis] & (new_animals_pm < 0), 0, new_animals_pm
             )
 
-            # some up new totals
-            current_beef_cattle += (
-                new_beef_calves_pm - current_beef_slaughter - other_beef_death
-            )
-            current_dairy_cattle += (
-                new_dairy_calves_pm - current_dairy_slaughter - other_dairy_death
-            )
-            current_total_poultry += (
-                new_poultry_pm - current_poultry_slaughter - other_poultry_death
-            )
-            current_total_pigs += new_pigs_pm - current_pig_slaughter - other_pig_death
+            # this set up only kills dairy cows when they are getting to the end of
+            # their life.
+            with np.errstate(invalid="ignore"):
+                current_slaughter = np.where(
+                    end_of_life[:, np.newaxis],
+                    current_animals / life_expectancy[:, np.newaxis] / 12,
+                    0,
+                )
+            recorded_slaughter = current_slaughter.copy()
+
+            # Transfer excess slaughter capacity to next animal, as set by
+            # spare_capacity_to, there are some small erros here due to rounding, and
+            # the method is not 100% water tight but errors are within the noise.
+            # Countries with slaughter capacity to spare are masked, so only they pass
+            # their capacity on.
+            for p in range(len(pools)):
+                s = capacity_species[p]
+                e = end_of_life_species[p]
+                end_of_life_slaughter = current_slaughter[e] if e >= 0 else 0
+                species_slaughter = current_pool_slaughter[p] - end_of_life_slaughter
+                p_next = spare_capacity_to[p]
+
+                if p_next is not None:
+                    capacity_spare = current_animals[s] < species_slaughter
+                    spare_slaughter_hours = (
+                        species_slaughter - current_animals[s] - new_animals_pm[s]
+                    ) * pool_slaughter_hours[p]
+                    current_pool_slaughter[p] = np.where(
+                        capacity_spare,
+                        current_animals[s] + new_animals_pm[s] + end_of_life_slaughter,
+                        current_pool_slaughter[p],
+                    )
+                    current_pool_slaughter[p_next] = np.where(
+                        capacity_spare,
+                        current_pool_slaughter[p_next]
+                        + spare_slaughter_hours
+                        * skill_transfer_discount
+                        / pool_slaughter_hours[p_next],
+                        current_pool_slaughter[p_next],
+                    )
+                    current_slaughter[s] = (
+                        current_pool_slaughter[p] - end_of_life_slaughter
+                    )
+                    recorded_slaughter[s] = current_slaughter[s]
+                else:
+                    # the capacity of this slaughterhouse isn't passed on. The line
+                    # below is required due to the difference between actual
+                    # slaughter and 'slaughter capacity' consider a rewrite of the
+                    # whole method to distinuguish between these two. For now, this
+                    # is thr workaround.
+                    current_slaughter[s] = species_slaughter
+                    capacity_spare = current_animals[s] < species_slaughter
+                    recorded_slaughter[s] = np.where(
+                        capacity_spare, current_animals[s], species_slaughter
+                    )
+                    if keep_dairy == 0 and e >= 0:
+                        current_slaughter[e] = np.where(
+                            capacity_spare,
+                            current_pool_slaughter[p] - recorded_slaughter[s],
+                            current_slaughter[e],
+                        )
+                        recorded_slaughter[e] = current_slaughter[e]
+
+            other_death = other_death_rate_monthly[:, np.newaxis] * current_animals
+
+            # ## Record this month (before new totals have been calculated), in the
+            # order of AnimalPopulations.SIMULATED_VALUES
+            for value_index, values in enumerate(
+                [current_animals, new_animals_pm, recorded_slaughter, other_death]
+            ):
+                simulated[
+                    :, i, value_index * n_species : (value_index + 1) * n_species
+                ] = values.T
 
-            current_pregnant_sows -= sow_slaughter_percent * (
-                current_pig_slaughter + other_pig_death
+            # some up new totals
+            current_animals = current_animals + (
+                new_animals_pm - current_slaughter - other_death
             )
-            current_pregnant_cows -= mother_cow_slaughter_percent * (
-                current_beef_slaughter + other_beef_death
+            current_pregnant = np.where(
+                has_mothers[:, np.newaxis],
+                current_pregnant
+                - mother_slaughter_percent * (current_slaughter + other_death),
+                current_pregnant,
             )
 
             # values might be very slightly negative due to overshoot, so set to zero
-            if current_beef_cattle < 0:
-                current_beef_cattle = 0
-            if current_dairy_cattle < 0:
-                current_dairy_cattle = 0
-            if current_total_poultry < 0:
-                current_total_poultry = 0
-            if current_total_pigs < 0:
-                current_total_pigs = 0
-
-        # ## End of loop, start summary
-
-        df_final = pd.DataFrame(d)
-
-        return df_final
+            current_animals = np.where(current_animals < 0, 0, current_animals)
+
+        # ## End of loop
+
+        return AnimalPopulations(
+            country_codes,
+            simulated,
+            species,
+            {
+                animal["name"]: pool_slaughter_hours[pool]
+                for animal, pool in zip(species, species_pool)
+            },
+            total_slaughter_cap_hours,
+        )
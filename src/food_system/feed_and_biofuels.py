@@ -14,6 +14,7 @@ Created on Wed Jul 17
 import numpy as np
 
 from src.food_system.food import Food
+from src.food_system.lazy_food import LazyFood
 
 
 class FeedAndBiofuels:
@@ -109,6 +110,31 @@ class FeedAndBiofuels:
             self.stored_food_feed.in_units_kcals_equivalent()
         )
 
+    def set_allocation(self, biofuel_allocation, feed_allocation):
+        """
+        Keeps the arrays of how the biofuels and feed were allocated to each food
+        source each month (see Parameters.allocate_usage_without_stored_food), as
+        attributes such as feed_outdoor_crops_used_stored, so they are kept with the
+        interpreted results without being recalculated.
+        """
+        for usage, allocation in [
+            ("biofuel", biofuel_allocation),
+            ("feed", feed_allocation),
+        ]:
+            for name, values in allocation.items():
+                setattr(self, usage + "_" + name, values)
+
+    def get_supply_constrained_months(self):
+        """
+        Returns the months in which the biofuels and the feed couldn't be met by the
+        cellulosic sugar, methane scp and outdoor crops (including outdoor crops
+        stored from earlier months), so had to come from stored food.
+        """
+        return {
+            "biofuels": np.flatnonzero(self.biofuel_supply_constrained),
+            "feed": np.flatnonzero(self.feed_supply_constrained),
+        }
+
     def set_nonhuman_consumption_with_cap(
         self,
         constants_for_params,
@@ -297,39 +323,55 @@ class FeedAndBiofuels:
         feed_before_cap,
     ):
         """
-        This function iteratively determines the amount of nonhuman consumption by
-        reducing the amount of biofuels and feed used.
+        This function determines the amount of nonhuman consumption by reducing the
+        amount of biofuels and feed used, finding the largest ratio (in steps of
+        AMOUNT_TO_REDUCE_RATIO_EACH_ITERATION below 1) for which the stored food can
+        make up the demand.
+
+        The max running net demand only increases with the ratio, so the ratios are
+        bisected rather than tried one by one, needing about log2(1 / step)
+        evaluations.
         """
 
-        demand_more_than_supply = True
-
-        # initialized to zero but will be overwritten probably
-        running_supply_minus_demand = Food()
-
+        # the ratios to choose between, in the order they would be tried reducing the
+        # ratio by a step at a time
+        ratios = []
         ratio = 1  # initialize to an unchanged amount
-        while demand_more_than_supply:
-            # if there needs to be more biofuels
+        while True:
             ratio -= self.AMOUNT_TO_REDUCE_RATIO_EACH_ITERATION
             if ratio < 0:
-                # if the ratio is negative, then we've already reduced the
-                # nonhuman consumption enough
-                ratio = 0
                 break
-
-            (
-                max_net_demand,
-                running_supply_minus_demand,
-            ) = self.calculate_max_running_net_demand_postwaste(
+            ratios.append(ratio)
+
+        # find the first ratio where demand is not more than supply. If there isn't
+        # one, then the nonhuman consumption is reduced to nothing
+        low = 0
+        high = len(ratios)
+        while low < high:
+            middle = (low + high) // 2
+            (max_net_demand, _) = self.calculate_max_running_net_demand_postwaste(
                 include_fat_or_protein,
                 net_feed_available_without_stored_food,
-                biofuels_before_cap * ratio,
-                feed_before_cap * ratio,
+                biofuels_before_cap.lazy() * ratios[middle],
+                feed_before_cap.lazy() * ratios[middle],
             )
-            demand_more_than_supply = max_net_demand.any_greater_than(stored_food)
+            if max_net_demand.any_greater_than(stored_food):
+                low = middle + 1
+            else:
+                high = middle
+        ratio = ratios[low] if low < len(ratios) else 0
         assert 1 >= ratio >= 0
 
-        PLOT_RUNNING_TOTAL = True
+        PLOT_RUNNING_TOTAL = False
         if PLOT_RUNNING_TOTAL:
+            (_, running_supply_minus_demand) = (
+                self.calculate_max_running_net_demand_postwaste(
+                    include_fat_or_protein,
+                    net_feed_available_without_stored_food,
+                    biofuels_before_cap.lazy() * ratio,
+                    feed_before_cap.lazy() * ratio,
+                )
+            )
             running_supply_minus_demand.plot("running_net_supply minus demand")
         if ratio <= self.SAFETY_MARGIN:
             return 0
@@ -458,6 +500,11 @@ class FeedAndBiofuels:
 
         nonhuman_consumption_before_cap = biofuels_before_cap + feed_before_cap
 
+        # if biofuels and feed are lazy foods, the scaling and sum are computed here
+        # in one pass
+        if isinstance(nonhuman_consumption_before_cap, LazyFood):
+            nonhuman_consumption_before_cap = nonhuman_consumption_before_cap.evaluate()
+
         assert nonhuman_consumption_before_cap.all_greater_than_or_equal_to_zero()
 
         # TODO: account for fat and protein appropriately here
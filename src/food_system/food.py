@@ -18,7 +18,9 @@ Created on Tue Jul 19
 """
 import numpy as np
 import copy
+import operator
 from src.food_system.unit_conversions import UnitConversions
+from src.food_system.lazy_food import LazyFood
 from src.utilities.plotter import Plotter
 
 
@@ -106,6 +108,14 @@ class Food(UnitConversions):
     # public property used to convert between units
     conversions = UnitConversions()
 
+    # the python operators used by the in place operators when the result can't be
+    # written into the existing arrays
+    IN_PLACE_OPERATORS = {
+        np.add: operator.add,
+        np.subtract: operator.sub,
+        np.multiply: operator.mul,
+    }
+
     @classmethod
     def get_Food_class(cls):
         """
@@ -657,6 +667,140 @@ class Food(UnitConversions):
             kcals, fat, protein, self.kcals_units, self.fat_units, self.protein_units
         )
 
+    def lazy(self):
+        """
+        Returns a LazyFood wrapping this food. Arithmetic on the LazyFood is recorded
+        rather than computed, and the whole expression is computed in one pass when
+        evaluate() is called or the values are read.
+
+        Returns:
+            LazyFood: A lazy version of this food.
+
+        Example:
+            >>> usage = (biofuels.lazy() * ratio + feed.lazy() * ratio).evaluate()
+        """
+        return LazyFood(food=self)
+
+    def __iadd__(self, other):
+        """
+        Adds another food to this food in place, writing the sums into the existing
+        arrays of this food rather than allocating a new Food.
+
+        Args:
+            other (Food): The other food object to add to this one.
+
+        Returns:
+            Food: This food, with the kcals, fat, and protein of other added.
+
+        Raises:
+            AssertionError: If the units of the two foods are not the same.
+
+        Example:
+            >>> food1 = Food(100, 5, 10, "kcal", "g", "g")
+            >>> food2 = Food(200, 10, 20, "kcal", "g", "g")
+            >>> food1 += food2
+            >>> food1.kcals
+            300
+        """
+        assert (
+            self.units == other.units
+        )  # Check that the units of the two foods are the same
+
+        self.apply_in_place(np.add, other.kcals, other.fat, other.protein)
+
+        return self
+
+    def __isub__(self, other):
+        """
+        Subtracts another food from this food in place, writing the differences into
+        the existing arrays of this food rather than allocating a new Food.
+
+        Args:
+            other (Food): The other food object to subtract from this one.
+
+        Returns:
+            Food: This food, with the kcals, fat, and protein of other subtracted.
+
+        Raises:
+            AssertionError: If the units of the two foods are not the same.
+        """
+        assert self.units == other.units  # Check that the units are the same
+
+        self.apply_in_place(np.subtract, other.kcals, other.fat, other.protein)
+
+        return self
+
+    def __imul__(self, other):
+        """
+        Multiplies this food by a number or a ratio food in place, writing the
+        products into the existing arrays of this food.
+
+        The multiplication is only done in place when the units and shape of this food
+        are unchanged, which is when other is a number or a ratio which is not a list.
+        All other cases are handled by __mul__, which returns a new Food.
+
+        Args:
+            other (Union[Food, float, int]): The object to multiply this food by.
+
+        Returns:
+            Food: The multiplied food.
+        """
+        if isinstance(other, Food):
+            if other.is_a_ratio() and not other.is_list_monthly():
+                self.apply_in_place(np.multiply, other.kcals, other.fat, other.protein)
+                return self
+            return self.__mul__(other)
+
+        if isinstance(other, np.ndarray) and not self.is_list_monthly():
+            # this changes a non-list food into a list food
+            return self.__mul__(other)
+
+        self.apply_in_place(np.multiply, other, other, other)
+
+        return self
+
+    def apply_in_place(self, ufunc, other_kcals, other_fat, other_protein):
+        """
+        Applies a numpy ufunc (such as np.add) to each nutrient of this food and the
+        given values, storing the result in this food.
+
+        For list foods, the result is written into the existing arrays wherever the
+        shape and dtype allow it, so accumulating many foods doesn't allocate new
+        arrays each time. Read only views are copied first (see make_sure_writeable).
+
+        Args:
+            ufunc (np.ufunc): The numpy function to apply, for example np.add.
+            other_kcals: The kcals to apply with the kcals of this food.
+            other_fat: The fat to apply with the fat of this food.
+            other_protein: The protein to apply with the protein of this food.
+
+        Returns:
+            None
+        """
+        if self.is_list_monthly():
+            self.make_sure_writeable()
+
+        for nutrient, other_values in [
+            ("kcals", other_kcals),
+            ("fat", other_fat),
+            ("protein", other_protein),
+        ]:
+            values = getattr(self, nutrient)
+            if (
+                isinstance(values, np.ndarray)
+                and np.broadcast_shapes(values.shape, np.shape(other_values))
+                == values.shape
+                and np.can_cast(np.result_type(values, other_values), values.dtype)
+            ):
+                ufunc(values, other_values, out=values)
+            else:
+                # same as the python operator, so numbers stay python numbers
+                setattr(
+                    self, nutrient, self.IN_PLACE_OPERATORS[ufunc](values, other_values)
+                )
+
+        self.validate_if_list()
+
     def __truediv__(self, other):
         """
         Divides a food's macronutrients by a number.
@@ -743,7 +887,7 @@ class Food(UnitConversions):
     def __getitem__(self, key):
         """
         Returns:
-            A new Food object with the macronutrient values at the given index or range of indices.
+            A Food object with the macronutrient values at the given index or range of indices.
 
         Args:
             key (int or slice): The index or range of indices to retrieve.
@@ -755,19 +899,23 @@ class Food(UnitConversions):
         TODO:
             Make sure this cannot happen by checking the length of key and updating units accordingly.
 
-        This method retrieves the macronutrient values at the given index or range of indices and returns a new Food
-        object with those values. It first ensures that the object's macronutrient values are in list form by calling
-        the make_sure_is_a_list() method. It then validates that the list is of the same length for all macronutrients
-        by calling the validate_if_list() method. Finally, it creates a new Food object with the macronutrient values
-        at the given index or range of indices and returns it.
+        This method retrieves the macronutrient values at the given index or range of indices. It first ensures
+        that the object's macronutrient values are in list form by calling the make_sure_is_a_list() method. It then
+        validates that the list is of the same length for all macronutrients by calling the validate_if_list() method.
+
+        If key is a slice, the returned Food is a view which shares its arrays with this food rather than copying
+        them (see get_view).
 
         Returns:
-            A new Food object with the macronutrient values at the given index or range of indices.
+            A Food object with the macronutrient values at the given index or range of indices.
         """
         self.make_sure_is_a_list()
 
         self.validate_if_list()
 
+        if isinstance(key, slice):
+            return self.get_view(key)
+
         return Food(
             kcals=self.kcals[key],
             fat=self.fat[key],
@@ -777,6 +925,69 @@ class Food(UnitConversions):
             protein_units=self.protein_units,
         )
 
+    def get_view(self, key):
+        """
+        Returns a Food object for a range of months which shares the underlying arrays
+        of this food, rather than allocating new arrays for the range.
+
+        The arrays of the view are read only, so that changing the view can't
+        accidentally change this food. Any Food method which changes its values in
+        place first calls make_sure_writeable, which copies the arrays of a view
+        (copy on write).
+
+        Args:
+            key (slice): The range of months to retrieve.
+
+        Returns:
+            Food: A view of the months in the range.
+
+        Example:
+            >>> food = Food(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[1, 2, 3],
+            kcals_units="billion kcals each month", fat_units="thousand tons each month",
+            protein_units="thousand tons each month")
+            >>> view = food.get_view(slice(0, 2))
+            >>> view.kcals
+            array([1, 2])
+        """
+        self.make_sure_is_a_list()
+
+        # a shallow copy keeps the units of this food without running the constructor
+        view = copy.copy(self)
+
+        view.kcals = self.kcals[key]
+        view.fat = self.fat[key]
+        view.protein = self.protein[key]
+
+        for nutrient in [view.kcals, view.fat, view.protein]:
+            nutrient.flags.writeable = False
+
+        view.NMONTHS = len(view.kcals)
+
+        view.validate_if_list()
+
+        return view
+
+    def make_sure_writeable(self):
+        """
+        Copies the arrays of a list food if they are a read only view (see get_view),
+        so that the values can be changed in place without changing the food the view
+        was taken from.
+
+        Args:
+            self (Food): An instance of the Food class.
+
+        Returns:
+            None
+        """
+        self.make_sure_is_a_list()
+
+        if not self.kcals.flags.writeable:
+            self.kcals = self.kcals.copy()
+        if not self.fat.flags.writeable:
+            self.fat = self.fat.copy()
+        if not self.protein.flags.writeable:
+            self.protein = self.protein.copy()
+
     def __mul__(self, other):
         """
         Multiplies a food's macronutrients by a number.
@@ -1760,6 +1971,54 @@ class Food(UnitConversions):
         # Create a numpy array with the kcals, fat, and protein values of the food
         return np.array([self.kcals, self.fat, self.protein])
 
+    @classmethod
+    def from_numpy_array(cls, nutrients, kcals_units, fat_units, protein_units):
+        """
+        Creates a food from an array ordered like the one returned by as_numpy_array,
+        so shape (3,) for a single value of each nutrient, or (3, NMONTHS) for a food
+        list.
+
+        The rows of a food list are used directly rather than copied, so a memory
+        mapped array stays on disk until the values are read. If the array is read
+        only, the food is treated like a view (see make_sure_writeable).
+
+        Args:
+            nutrients (numpy.ndarray): The kcals, fat and protein rows.
+            kcals_units (str): The units for the kilocalories.
+            fat_units (str): The units for the fat.
+            protein_units (str): The units for the protein.
+
+        Returns:
+            Food: The food with the given nutrients and units.
+
+        Example:
+            >>> food = Food.from_numpy_array(np.array([1.0, 2.0, 3.0]), "billion kcals",
+            "thousand tons", "thousand tons")
+            >>> food.fat
+            2.0
+        """
+        assert nutrients.shape[0] == 3
+
+        food = cls(
+            kcals_units=kcals_units,
+            fat_units=fat_units,
+            protein_units=protein_units,
+        )
+
+        if nutrients.ndim == 1:
+            food.kcals = nutrients[0].item()
+            food.fat = nutrients[1].item()
+            food.protein = nutrients[2].item()
+        else:
+            food.kcals = nutrients[0]
+            food.fat = nutrients[1]
+            food.protein = nutrients[2]
+            food.NMONTHS = nutrients.shape[1]
+
+        food.validate_if_list()
+
+        return food
+
     def get_min_nutrient(self):
         """
         Returns the minimum nutrient of the food.
@@ -1929,35 +2188,10 @@ class Food(UnitConversions):
         # Check if the data is in monthly format
         assert self.is_list_monthly()
 
-        # Create a deep copy of the kcals list
-        kcals_copy = copy.deepcopy(self.kcals)
-        running_sum_kcals = 0
-        to_return_kcals = kcals_copy
-
-        # Calculate the running sum of kcals for each month
-        for i in range(self.NMONTHS):
-            running_sum_kcals += kcals_copy[i]
-            to_return_kcals[i] = running_sum_kcals
-
-        # Create a deep copy of the fat list
-        fat_copy = copy.deepcopy(self.fat)
-        running_sum_fat = 0
-        to_return_fat = fat_copy
-
-        # Calculate the running sum of fat for each month
-        for i in range(self.NMONTHS):
-            running_sum_fat += fat_copy[i]
-            to_return_fat[i] = running_sum_fat
-
-        # Create a deep copy of the protein list
-        protein_copy = copy.deepcopy(self.protein)
-        running_sum_protein = 0
-        to_return_protein = protein_copy
-
-        # Calculate the running sum of protein for each month
-        for i in range(self.NMONTHS):
-            running_sum_protein += protein_copy[i]
-            to_return_protein[i] = running_sum_protein
+        # Calculate the running sum of each nutrient for each month
+        to_return_kcals = np.cumsum(self.kcals)
+        to_return_fat = np.cumsum(self.fat)
+        to_return_protein = np.cumsum(self.protein)
 
         # Validate if the data is in list format
         self.validate_if_list()
@@ -2108,19 +2342,20 @@ class Food(UnitConversions):
         # Validate the list
         self.validate_if_list()
 
-        # Create a new Food object with the nutrient values for the specified month
+        # Convert the units from "each" to "per"
+        [kcals_units, fat_units, protein_units] = self.get_units_from_list_to_element()
+
+        # Create a new Food object with the nutrient values for the specified month.
+        # These are single values, so no arrays are copied.
         food_at_month = Food(
             self.kcals[index],
             self.fat[index],
             self.protein[index],
-            self.kcals_units,
-            self.fat_units,
-            self.protein_units,
+            kcals_units,
+            fat_units,
+            protein_units,
         )
 
-        # Convert the units from "each" to "per"
-        food_at_month.set_units_from_list_to_element()
-
         # Return the Food object
         return food_at_month
 
@@ -2367,6 +2602,9 @@ class Food(UnitConversions):
         # Validate if the object is a list
         self.validate_if_list()
 
+        # Copy the values first if this food is a view of another food
+        self.make_sure_writeable()
+
         # Set all values after the given month to zero
         self.kcals[month:] = 0
         self.fat[month:] = 0
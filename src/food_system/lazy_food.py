@@ -0,0 +1,290 @@
+"""
+################################# Lazy Food ###################################
+##                                                                            #
+##       Records arithmetic on foods as an expression graph, and evaluates    #
+##       the whole expression in one pass when the values are needed          #
+##                                                                            #
+###############################################################################
+
+Chains of operations on foods, such as (biofuels * ratio + feed * ratio), normally
+create a new Food (and a new array for each nutrient) for every operation. A LazyFood
+instead records each operation, checking the units as the expression is built, and
+only computes the values when they are read. If numexpr is installed, each nutrient is
+computed by a single numexpr call, otherwise numpy is used, writing into the arrays of
+intermediate results rather than allocating new ones.
+
+    >>> lazy_usage = biofuels.lazy() * ratio + feed.lazy() * ratio
+    >>> usage = lazy_usage.evaluate()  # a normal Food
+"""
+import numpy as np
+
+from src.food_system.unit_conversions import UnitConversions
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+
+class LazyFood:
+    """
+    A node in an expression graph of operations on foods. Leaves hold a Food, numbers
+    are held as constants, and every other node holds an operation and its operands.
+    """
+
+    # numpy functions and numexpr operators for each operation
+    UFUNCS = {
+        "add": np.add,
+        "subtract": np.subtract,
+        "multiply": np.multiply,
+        "divide": np.true_divide,
+    }
+    OPERATORS = {"add": "+", "subtract": "-", "multiply": "*", "divide": "/"}
+
+    def __init__(self, food=None, operation=None, operands=(), units=None):
+        """
+        Creates a leaf holding food if food is given, otherwise a node applying
+        operation to operands (LazyFood objects or numbers) with the given units.
+        """
+        self.food = food
+        self.operation = operation
+        self.operands = operands
+
+        if food is not None:
+            self.units = tuple(food.get_units())
+            self.is_list = food.is_list_monthly()
+            # the food class, so the result can be created without importing it
+            self.food_class = food.get_Food_class()
+        else:
+            self.units = units
+            lazy_operands = [op for op in operands if isinstance(op, LazyFood)]
+            self.is_list = any(op.is_list for op in lazy_operands)
+            self.food_class = lazy_operands[0].food_class
+
+        self.kcals_units, self.fat_units, self.protein_units = self.units
+
+        self.evaluated = None
+
+    @staticmethod
+    def as_lazy(other):
+        """
+        Returns other as a LazyFood if it is a food, otherwise returns it unchanged
+        """
+        if isinstance(other, UnitConversions):
+            return LazyFood(food=other)
+        return other
+
+    def is_a_ratio(self):
+        """
+        Returns if units are all "ratio" type
+        """
+        return all("ratio" in unit for unit in self.units)
+
+    def get_units(self):
+        """
+        returns the units as a 3 element list
+        """
+        return list(self.units)
+
+    # building the expression graph
+
+    def __add__(self, other):
+        """
+        Records adding a food (or lazy food) with the same units to this one
+        """
+        other = self.as_lazy(other)
+        assert isinstance(other, LazyFood), "can only add foods to a lazy food"
+        assert self.units == other.units
+
+        return LazyFood(operation="add", operands=(self, other), units=self.units)
+
+    def __sub__(self, other):
+        """
+        Records subtracting a food (or lazy food) with the same units from this one
+        """
+        other = self.as_lazy(other)
+        assert isinstance(other, LazyFood), "can only subtract foods from a lazy food"
+        assert self.units == other.units
+
+        return LazyFood(operation="subtract", operands=(self, other), units=self.units)
+
+    def __mul__(self, other):
+        """
+        Records multiplying this food by a number or by a ratio.
+
+        The units of this food are kept, so other must be a number, or a food with
+        ratio units which is either not a list or is a list like this food.
+        """
+        other = self.as_lazy(other)
+
+        if isinstance(other, LazyFood):
+            assert other.is_a_ratio(), """lazy foods can only be multiplied by
+                numbers or ratios, consider evaluating the food first"""
+            assert self.is_list or not other.is_list, """lazy foods which are not
+                lists can't be multiplied by lists, consider evaluating the food
+                first"""
+        else:
+            assert np.ndim(other) == 0, "lazy foods can't be multiplied by arrays"
+
+        return LazyFood(operation="multiply", operands=(self, other), units=self.units)
+
+    def __rmul__(self, other):
+        """
+        Records multiplying this food by a number
+        """
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        """
+        Records dividing this food by a number
+        """
+        assert not isinstance(other, (LazyFood, UnitConversions)), """lazy foods can
+            only be divided by numbers, consider evaluating the food first"""
+        assert np.ndim(other) == 0, "lazy foods can't be divided by arrays"
+
+        return LazyFood(operation="divide", operands=(self, other), units=self.units)
+
+    def __neg__(self):
+        """
+        Records negating this food
+        """
+        return self.__mul__(-1)
+
+    # evaluating the expression graph
+
+    def evaluate(self):
+        """
+        Computes the values of the expression and returns them as a Food. The result
+        is stored, so reading the values again doesn't recompute them.
+        """
+        if self.food is not None:
+            return self.food
+
+        if self.evaluated is None:
+            if numexpr is not None and self.is_list:
+                values = [self.evaluate_nutrient_numexpr(i) for i in range(3)]
+            else:
+                values = [self.evaluate_nutrient_numpy(i)[0] for i in range(3)]
+
+            self.evaluated = self.food_class(
+                kcals=values[0],
+                fat=values[1],
+                protein=values[2],
+                kcals_units=self.kcals_units,
+                fat_units=self.fat_units,
+                protein_units=self.protein_units,
+            )
+
+        return self.evaluated
+
+    @property
+    def kcals(self):
+        return self.evaluate().kcals
+
+    @property
+    def fat(self):
+        return self.evaluate().fat
+
+    @property
+    def protein(self):
+        return self.evaluate().protein
+
+    def get_nutrient(self, index):
+        """
+        returns the values of a nutrient of a leaf (0 kcals, 1 fat, 2 protein)
+        """
+        return [self.food.kcals, self.food.fat, self.food.protein][index]
+
+    def evaluate_nutrient_numpy(self, index):
+        """
+        Computes the values of one nutrient (0 kcals, 1 fat, 2 protein) with numpy.
+
+        Returns the values, and whether they are a new array which may be written
+        over by the operation using them, so only one new array is needed for each
+        branch of the expression rather than one for each operation.
+        """
+        if self.food is not None:
+            return self.get_nutrient(index), False
+
+        if self.evaluated is not None:
+            return [self.evaluated.kcals, self.evaluated.fat, self.evaluated.protein][
+                index
+            ], False
+
+        values = []
+        can_write = []
+        for operand in self.operands:
+            if isinstance(operand, LazyFood):
+                operand_values, operand_can_write = operand.evaluate_nutrient_numpy(
+                    index
+                )
+            else:
+                operand_values, operand_can_write = operand, False
+            values.append(operand_values)
+            can_write.append(operand_can_write)
+
+        ufunc = self.UFUNCS[self.operation]
+        result_dtype = np.result_type(*values)
+        if self.operation == "divide":
+            # dividing integers gives floats
+            result_dtype = np.result_type(result_dtype, 1.0)
+        result_shape = np.broadcast_shapes(*[np.shape(v) for v in values])
+
+        for operand_values, operand_can_write in zip(values, can_write):
+            if (
+                operand_can_write
+                and operand_values.dtype == result_dtype
+                and operand_values.shape == result_shape
+            ):
+                ufunc(values[0], values[1], out=operand_values)
+                return operand_values, True
+
+        result = ufunc(values[0], values[1])
+        return result, isinstance(result, np.ndarray)
+
+    def evaluate_nutrient_numexpr(self, index):
+        """
+        Computes the values of one nutrient (0 kcals, 1 fat, 2 protein) with a single
+        numexpr call for the whole expression
+        """
+        variables = {}
+        expression = self.get_numexpr_expression(index, variables)
+
+        return numexpr.evaluate(expression, local_dict=variables)
+
+    def get_numexpr_expression(self, index, variables):
+        """
+        Returns the expression for one nutrient as a numexpr string, adding the
+        arrays and numbers it uses to variables
+        """
+        if self.food is not None or self.evaluated is not None:
+            if self.food is not None:
+                nutrient = self.get_nutrient(index)
+            else:
+                nutrient = [
+                    self.evaluated.kcals,
+                    self.evaluated.fat,
+                    self.evaluated.protein,
+                ][index]
+            name = "v" + str(len(variables))
+            variables[name] = nutrient
+            return name
+
+        expressions = []
+        for operand in self.operands:
+            if isinstance(operand, LazyFood):
+                expressions.append(operand.get_numexpr_expression(index, variables))
+            else:
+                name = "v" + str(len(variables))
+                variables[name] = operand
+                expressions.append(name)
+
+        return (
+            "("
+            + expressions[0]
+            + " "
+            + self.OPERATORS[self.operation]
+            + " "
+            + expressions[1]
+            + ")"
+        )
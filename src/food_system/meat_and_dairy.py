@@ -730,12 +730,12 @@ class MeatAndDairy:
             calories_max_monthly.append(max(calories, 0))
         return calories_max_monthly
 
-    def calculate_culled_meat(
-        self,
-        init_small_animals_culled,
-        init_medium_animals_culled,
-        init_large_animals_culled,
-    ):
+    def get_culled_meat_per_animal(self):
+        """
+        Returns the billion kcals, thousand tons fat and thousand tons protein of meat
+        from each small, medium and large animal culled, as arrays of shape (3, 3)
+        with a row for each animal size
+        """
         KG_TO_1000_TONS = self.KG_TO_1000_TONS
 
         KCALS_PER_SMALL_ANIMAL = (
@@ -770,6 +770,24 @@ class MeatAndDairy:
             self.LARGE_ANIMAL_PROTEIN_RATIO * self.KG_PER_LARGE_ANIMAL * KG_TO_1000_TONS
         )
 
+        small = [KCALS_PER_SMALL_ANIMAL, FAT_PER_SMALL_ANIMAL, PROTEIN_PER_SMALL_ANIMAL]
+        medium = [KCALS_PER_MEDIUM_ANIMAL, FAT_PER_MEDIUM_ANIMAL, PROTEIN_MEDIUM_ANIMAL]
+        large = [KCALS_PER_LARGE_ANIMAL, FAT_PER_LARGE_ANIMAL, PROTEIN_PER_LARGE_ANIMAL]
+
+        return np.array([small, medium, large])
+
+    def calculate_culled_meat(
+        self,
+        init_small_animals_culled,
+        init_medium_animals_culled,
+        init_large_animals_culled,
+    ):
+        (
+            (KCALS_PER_SMALL_ANIMAL, FAT_PER_SMALL_ANIMAL, PROTEIN_PER_SMALL_ANIMAL),
+            (KCALS_PER_MEDIUM_ANIMAL, FAT_PER_MEDIUM_ANIMAL, PROTEIN_MEDIUM_ANIMAL),
+            (KCALS_PER_LARGE_ANIMAL, FAT_PER_LARGE_ANIMAL, PROTEIN_PER_LARGE_ANIMAL),
+        ) = self.get_culled_meat_per_animal()
+
         # billion kcals
         init_culled_meat_prewaste_kcals = (
             init_small_animals_culled * KCALS_PER_SMALL_ANIMAL
@@ -17,6 +17,8 @@ Created on Tue Jul 19
 import os
 import sys
 
+import numpy as np
+
 module_path = os.path.abspath(os.path.join("../.."))
 if module_path not in sys.path:
     sys.path.append(module_path)
@@ -27,6 +29,37 @@ class UnitConversions:
     This class is used to convert units of nutrients
     """
 
+    # the units of kcals, fat and protein in each of the unit systems which can be
+    # converted between, not including the " each month" or " per month" part
+    UNIT_SYSTEMS = {
+        "billion_kcals": ("billion kcals", "thousand tons", "thousand tons"),
+        "million_dry_caloric_tons": (
+            "million dry caloric tons",
+            "million tons",
+            "million tons",
+        ),
+        "billion_people_fed": (
+            "billion people fed",
+            "billion people fed",
+            "billion people fed",
+        ),
+        "percent_people_fed": (
+            "percent people fed",
+            "percent people fed",
+            "percent people fed",
+        ),
+        "kcals_equivalent": (
+            "kcals per capita per day",
+            "effective kcals per capita per day",
+            "effective kcals per capita per day",
+        ),
+        "kcals_grams_grams_per_capita": (
+            "kcals per person per day",
+            "grams per person per day",
+            "grams per person per day",
+        ),
+    }
+
     def __init__(self):
         self.NUTRITION_PROPERTIES_ASSIGNED = False
 
@@ -87,8 +120,98 @@ class UnitConversions:
 
         self.population = population
 
+        self.set_conversion_table()
+
         self.NUTRITION_PROPERTIES_ASSIGNED = True
 
+    def set_conversion_table(self):
+        """
+        Precomputes the factors which convert kcals, fat and protein from each unit
+        system to each other unit system, so that converting a food is a single
+        multiply. Conversions which are not known are left as nan.
+
+        conversion_table[from, to] is a 3 element array of kcals, fat and protein
+        factors, where from and to are indices from unit_system_index.
+        """
+        self.unit_system_index = {
+            name: index for index, name in enumerate(self.UNIT_SYSTEMS.keys())
+        }
+        n_systems = len(self.UNIT_SYSTEMS)
+        self.conversion_table = np.full((n_systems, n_systems, 3), np.nan)
+
+        # million dry caloric tons to billion calories
+        million_tons_to_billion_kcals_conversion = 1e6 * 1000 * 4000 / 1e9
+
+        self.set_conversion_factors(
+            "million_dry_caloric_tons",
+            "billion_kcals",
+            [million_tons_to_billion_kcals_conversion, 1000, 1000],
+        )
+        self.set_conversion_factors(
+            "percent_people_fed",
+            "billion_kcals",
+            [
+                self.kcals_monthly * self.population / 1e9 / 100,
+                self.fat_monthly * self.population / 100,
+                self.protein_monthly * self.population / 100,
+            ],
+        )
+        self.set_conversion_factors(
+            "billion_kcals",
+            "billion_people_fed",
+            [
+                1 / self.kcals_monthly,
+                1 / self.fat_monthly / 1e9,
+                1 / self.protein_monthly / 1e9,
+            ],
+        )
+        self.set_conversion_factors(
+            "percent_people_fed",
+            "billion_people_fed",
+            [self.population / 1e9 / 100] * 3,
+        )
+        self.set_conversion_factors(
+            "billion_kcals",
+            "percent_people_fed",
+            [
+                100 / self.billion_kcals_needed,
+                100 / self.thou_tons_fat_needed,
+                100 / self.thou_tons_protein_needed,
+            ],
+        )
+        self.set_conversion_factors(
+            "billion_people_fed",
+            "percent_people_fed",
+            [100 / self.population * 1e9] * 3,
+        )
+        self.set_conversion_factors(
+            "billion_people_fed",
+            "kcals_equivalent",
+            [1e9 / self.population * self.kcals_daily] * 3,
+        )
+        self.set_conversion_factors(
+            "percent_people_fed",
+            "kcals_equivalent",
+            [self.kcals_daily / 100] * 3,
+        )
+        self.set_conversion_factors(
+            "percent_people_fed",
+            "kcals_grams_grams_per_capita",
+            [
+                self.kcals_daily / 100,
+                self.fat_daily / 100,
+                self.protein_daily / 100,
+            ],
+        )
+
+    def set_conversion_factors(self, from_system, to_system, factors):
+        """
+        sets the kcals, fat and protein factors to convert from_system to to_system
+        """
+        self.conversion_table[
+            self.unit_system_index[from_system], self.unit_system_index[to_system]
+        ] = factors
+
     def get_units_from_list_to_total(self):
         """
         gets the units so that they reflect that of a single month
@@ -256,81 +379,89 @@ class UnitConversions:
 
     # CONVERSIONS BETWEEN UNITS
 
-    def in_units_billions_fed(self):
+    def get_unit_system_and_suffix(self):
         """
-        If the existing units are understood by this function, it tries to convert the
-        values and units to billions of people fed.
+        Finds which of the unit systems in the conversion table the units of this food
+        belong to, as well as the " each month" or " per month" suffix of the units.
+
+        returns the name of the unit system and the suffix, or None for the name of
+        the unit system if the units are not in the table
+        """
+        for suffix in [" each month", " per month", ""]:
+            if not (
+                self.kcals_units.endswith(suffix)
+                and self.fat_units.endswith(suffix)
+                and self.protein_units.endswith(suffix)
+            ):
+                continue
+
+            units = (
+                self.kcals_units[: len(self.kcals_units) - len(suffix)],
+                self.fat_units[: len(self.fat_units) - len(suffix)],
+                self.protein_units[: len(self.protein_units) - len(suffix)],
+            )
+            for name, system_units in self.UNIT_SYSTEMS.items():
+                if units == system_units:
+                    return name, suffix
+
+        return None, None
+
+    def in_unit_system(self, to_system, suffixes):
+        """
+        Converts the values and units of the food to the to_system unit system, using
+        the table of conversion factors precomputed when the nutrition requirements
+        were set.
+
+        arguments:
+            to_system (str): name of the unit system in UNIT_SYSTEMS to convert to
+            suffixes (dict): maps each of the allowed suffixes of the existing units
+                (" each month", " per month" or "") to the suffix of the new units
+
+        returns the converted food, or None if the conversion is not known
         """
-        # @Morgan: Is there a reason this is done as if,if,if and not as if,elif,else?
 
         # getting this instance of the UnitConversions from the child class
         conversions = self.get_conversions()
 
+        from_system, suffix = self.get_unit_system_and_suffix()
+        if from_system is None or suffix not in suffixes:
+            return None
+
+        factors = conversions.conversion_table[
+            conversions.unit_system_index[from_system],
+            conversions.unit_system_index[to_system],
+        ]
+        if np.isnan(factors).any():
+            return None
+        factors = factors.tolist()
+
         # okay, okay, maybe the way I did this child/parent thing is not ideal...
         # get the child class so can initialize the Food class
         Food = self.get_Food_class()
-        billion_kcal_conversion = 1 / conversions.kcals_monthly
-        thou_tons_fat_conversion = 1 / conversions.fat_monthly / 1e9
-        thou_tons_protein_conversion = 1 / conversions.protein_monthly / 1e9
 
-        if (
-            self.kcals_units == "billion kcals each month"
-            and self.fat_units == "thousand tons each month"
-            and self.protein_units == "thousand tons each month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_kcal_conversion,
-                fat=self.fat * thou_tons_fat_conversion,
-                protein=self.protein * thou_tons_protein_conversion,
-                kcals_units="billion people fed each month",
-                fat_units="billion people fed each month",
-                protein_units="billion people fed each month",
-            )
-
-        if (
-            self.kcals_units == "billion kcals per month"
-            and self.fat_units == "thousand tons per month"
-            and self.protein_units == "thousand tons per month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_kcal_conversion,
-                fat=self.fat * thou_tons_fat_conversion,
-                protein=self.protein * thou_tons_protein_conversion,
-                kcals_units="billion people fed per month",
-                fat_units="billion people fed per month",
-                protein_units="billion people fed per month",
-            )
+        [kcals_units, fat_units, protein_units] = self.UNIT_SYSTEMS[to_system]
+        new_suffix = suffixes[suffix]
 
-        percent_people_kcal_conversion = conversions.population / 1e9 / 100
-        percent_people_fat_conversion = conversions.population / 1e9 / 100
-        percent_people_protein_conversion = conversions.population / 1e9 / 100
+        return Food(
+            kcals=self.kcals * factors[0],
+            fat=self.fat * factors[1],
+            protein=self.protein * factors[2],
+            kcals_units=kcals_units + new_suffix,
+            fat_units=fat_units + new_suffix,
+            protein_units=protein_units + new_suffix,
+        )
 
-        if (
-            self.kcals_units == "percent people fed per month"
-            and self.fat_units == "percent people fed per month"
-            and self.protein_units == "percent people fed per month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_people_kcal_conversion,
-                fat=self.fat * percent_people_fat_conversion,
-                protein=self.protein * percent_people_protein_conversion,
-                kcals_units="billion people fed per month",
-                fat_units="billion people fed per month",
-                protein_units="billion people fed per month",
-            )
-        if (
-            self.kcals_units == "percent people fed per month"
-            and self.fat_units == "percent people fed per month"
-            and self.protein_units == "percent people fed per month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_people_kcal_conversion,
-                fat=self.fat * percent_people_fat_conversion,
-                protein=self.protein * percent_people_protein_conversion,
-                kcals_units="billion people fed per month",
-                fat_units="billion people fed per month",
-                protein_units="billion people fed per month",
-            )
+    def in_units_billions_fed(self):
+        """
+        If the existing units are understood by this function, it tries to convert the
+        values and units to billions of people fed.
+        """
+        converted = self.in_unit_system(
+            "billion_people_fed",
+            {" each month": " each month", " per month": " per month"},
+        )
+        if converted is not None:
+            return converted
         else:
             print("Error: conversion from these units not known")
             print("From units:")
@@ -347,76 +478,12 @@ class UnitConversions:
         If the existing units are understood by this function, it tries to convert the
         values and units to percent of people fed.
         """
-
-        # getting this instance of the UnitConversions from the child class
-        conversions = self.get_conversions()
-
-        # okay, okay, maybe the way I did this child/parent thing is not ideal...
-        # get the child class so can initialize the Food class
-        Food = self.get_Food_class()
-
-        billion_people_kcal_conversion = 100 / conversions.population * 1e9
-        billion_people_fat_conversion = 100 / conversions.population * 1e9
-        billion_people_protein_conversion = 100 / conversions.population * 1e9
-
-        if (
-            self.kcals_units == "billion people fed each month"
-            and self.fat_units == "billion people fed each month"
-            and self.protein_units == "billion people fed each month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_people_kcal_conversion,
-                fat=self.fat * billion_people_fat_conversion,
-                protein=self.protein * billion_people_protein_conversion,
-                kcals_units="percent people fed each month",
-                fat_units="percent people fed each month",
-                protein_units="percent people fed each month",
-            )
-        if (
-            self.kcals_units == "billion people fed per month"
-            and self.fat_units == "billion people fed per month"
-            and self.protein_units == "billion people fed per month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_people_kcal_conversion,
-                fat=self.fat * billion_people_fat_conversion,
-                protein=self.protein * billion_people_protein_conversion,
-                kcals_units="percent people fed per month",
-                fat_units="percent people fed per month",
-                protein_units="percent people fed per month",
-            )
-
-        billion_kcal_conversion = 100 / conversions.billion_kcals_needed
-        thou_tons_fat_conversion = 100 / conversions.thou_tons_fat_needed
-        thou_tons_protein_conversion = 100 / conversions.thou_tons_protein_needed
-
-        if (
-            self.kcals_units == "billion kcals each month"
-            and self.fat_units == "thousand tons each month"
-            and self.protein_units == "thousand tons each month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_kcal_conversion,
-                fat=self.fat * thou_tons_fat_conversion,
-                protein=self.protein * thou_tons_protein_conversion,
-                kcals_units="percent people fed each month",
-                fat_units="percent people fed each month",
-                protein_units="percent people fed each month",
-            )
-
-        if (
-            self.kcals_units == "billion kcals per month"
-            and self.fat_units == "thousand tons per month"
-            and self.protein_units == "thousand tons per month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_kcal_conversion,
-                fat=self.fat * thou_tons_fat_conversion,
-                protein=self.protein * thou_tons_protein_conversion,
-                kcals_units="percent people fed per month",
-                fat_units="percent people fed per month",
-                protein_units="percent people fed per month",
-            )
+        converted = self.in_unit_system(
+            "percent_people_fed",
+            {" each month": " each month", " per month": " per month"},
+        )
+        if converted is not None:
+            return converted
         else:
             print("Error: conversion from these units not known")
             print("From units:")
@@ -431,80 +498,14 @@ class UnitConversions:
     def in_units_bil_kcals_thou_tons_thou_tons_per_month(self):
         """
         If the existing units are understood by this function, it tries to convert the
-        values and units to percent of people fed.
+        values and units to billion kcals, thousand tons fat and thousand tons protein.
         """
-
-        # getting this instance of the UnitConversions from the child class
-        conversions = self.get_conversions()
-
-        # okay, okay, maybe the way I did this child/parent thing is not ideal...
-        # get the child class so can initialize the Food class
-        Food = self.get_Food_class()
-
-        # million dry caloric tons to billion calories
-        million_tons_to_billion_kcals_conversion = 1e6 * 1000 * 4000 / 1e9
-
-        percent_kcal_conversion = (
-            conversions.kcals_monthly * conversions.population / 1e9 / 100
-        )
-        percent_fat_conversion = conversions.fat_monthly * conversions.population / 100
-        percent_protein_conversion = (
-            conversions.protein_monthly * conversions.population / 100
+        converted = self.in_unit_system(
+            "billion_kcals",
+            {" each month": " each month", " per month": " per month", "": ""},
         )
-
-        if (
-            self.kcals_units == "percent people fed each month"
-            and self.fat_units == "percent people fed each month"
-            and self.protein_units == "percent people fed each month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_kcal_conversion,
-                fat=self.fat * percent_fat_conversion,
-                protein=self.protein * percent_protein_conversion,
-                kcals_units="billion kcals each month",
-                fat_units="thousand tons each month",
-                protein_units="thousand tons each month",
-            )
-
-        if (
-            self.kcals_units == "percent people fed per month"
-            and self.fat_units == "percent people fed per month"
-            and self.protein_units == "percent people fed per month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_kcal_conversion,
-                fat=self.fat * percent_fat_conversion,
-                protein=self.protein * percent_protein_conversion,
-                kcals_units="billion kcals per month",
-                fat_units="thousand tons per month",
-                protein_units="thousand tons per month",
-            )
-        if (
-            self.kcals_units == "million dry caloric tons each month"
-            and self.fat_units == "million tons each month"
-            and self.protein_units == "million tons each month"
-        ):
-            return Food(
-                kcals=self.kcals * million_tons_to_billion_kcals_conversion,
-                fat=self.fat * 1000,
-                protein=self.protein * 1000,
-                kcals_units="billion kcals each month",
-                fat_units="thousand tons each month",
-                protein_units="thousand tons each month",
-            )
-        if (
-            self.kcals_units == "million dry caloric tons"
-            and self.fat_units == "million tons"
-            and self.protein_units == "million tons"
-        ):
-            return Food(
-                kcals=self.kcals * million_tons_to_billion_kcals_conversion,
-                fat=self.fat * 1000,
-                protein=self.protein * 1000,
-                kcals_units="billion kcals",
-                fat_units="thousand tons",
-                protein_units="thousand tons",
-            )
+        if converted is not None:
+            return converted
         else:
             print("Error: conversion from these units not known")
             print("From units:")
@@ -521,81 +522,12 @@ class UnitConversions:
         If the existing units are understood by this function, it tries to convert the
         values and units to effective kcals per capita per day for each nutrient.
         """
-
-        # getting this instance of the UnitConversions from the child class
-        conversions = self.get_conversions()
-
-        # okay, okay, maybe the way I did this child/parent thing is not ideal...
-        # get the child class so can initialize the Food class
-        Food = self.get_Food_class()
-
-        billion_people_kcal_conversion = (
-            1e9 / conversions.population * conversions.kcals_daily
-        )
-        billion_people_fat_conversion = (
-            1e9 / conversions.population * conversions.kcals_daily
+        converted = self.in_unit_system(
+            "kcals_equivalent",
+            {" each month": " each month", " per month": " per month"},
         )
-        billion_people_protein_conversion = (
-            1e9 / conversions.population * conversions.kcals_daily
-        )
-
-        if (
-            self.kcals_units == "billion people fed each month"
-            and self.fat_units == "billion people fed each month"
-            and self.protein_units == "billion people fed each month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_people_kcal_conversion,
-                fat=self.fat * billion_people_fat_conversion,
-                protein=self.protein * billion_people_protein_conversion,
-                kcals_units="kcals per capita per day each month",
-                fat_units="effective kcals per capita per day each month",
-                protein_units="effective kcals per capita per day each month",
-            )
-        if (
-            self.kcals_units == "billion people fed per month"
-            and self.fat_units == "billion people fed per month"
-            and self.protein_units == "billion people fed per month"
-        ):
-            return Food(
-                kcals=self.kcals * billion_people_kcal_conversion,
-                fat=self.fat * billion_people_fat_conversion,
-                protein=self.protein * billion_people_protein_conversion,
-                kcals_units="kcals per capita per day per month",
-                fat_units="effective kcals per capita per day per month",
-                protein_units="effective kcals per capita per day per month",
-            )
-
-        percent_kcal_conversion = conversions.kcals_daily / 100
-        percent_fat_conversion = conversions.kcals_daily / 100
-        percent_protein_conversion = conversions.kcals_daily / 100
-
-        if (
-            self.kcals_units == "percent people fed each month"
-            and self.fat_units == "percent people fed each month"
-            and self.protein_units == "percent people fed each month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_kcal_conversion,
-                fat=self.fat * percent_fat_conversion,
-                protein=self.protein * percent_protein_conversion,
-                kcals_units="kcals per capita per day each month",
-                fat_units="effective kcals per capita per day each month",
-                protein_units="effective kcals per capita per day each month",
-            )
-        if (
-            self.kcals_units == "percent people fed per month"
-            and self.fat_units == "percent people fed per month"
-            and self.protein_units == "percent people fed per month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_kcal_conversion,
-                fat=self.fat * percent_fat_conversion,
-                protein=self.protein * percent_protein_conversion,
-                kcals_units="kcals per capita per day per month",
-                fat_units="effective kcals per capita per day per month",
-                protein_units="effective kcals per capita per day per month",
-            )
+        if converted is not None:
+            return converted
         else:
             print("Error: conversion from these units not known")
             print("From units:")
@@ -681,48 +613,12 @@ class UnitConversions:
         values and units to kcals per person per day, grams per pseron per day, kcals
         per person per day.
         """
-
-        # getting this instance of the UnitConversions from the child class
-        # allows us to get some previously set values like kcals monthly and days in
-        # month
-        conversions = self.get_conversions()
-
-        # okay, okay, maybe the way I did this child/parent thing is not ideal...
-        # get the child class so can initialize the Food class
-        Food = self.get_Food_class()
-
-        percent_kcal_conversion = 1 / 100 * conversions.kcals_daily
-        percent_fat_conversion = 1 / 100 * conversions.fat_daily
-        percent_protein_conversion = 1 / 100 * conversions.protein_daily
-
-        if (
-            self.kcals_units == "percent people fed each month"
-            and self.fat_units == "percent people fed each month"
-            and self.protein_units == "percent people fed each month"
-        ):
-            return Food(
-                kcals=self.kcals * percent_kcal_conversion,
-                fat=self.fat * percent_fat_conversion,
-                protein=self.protein * percent_protein_conversion,
-                kcals_units="kcals per person per day each month",
-                fat_units="grams per person per day each month",
-                protein_units="grams per person per day each month",
-            )
-        if (
-            self.kcals_units == "percent people fed per month"
-            and self.fat_units == "percent people fed per month"
-            and self.protein_units == "percent people fed per month"
-        ):
-            Food = self.get_Food_class()
-            return Food(
-                kcals=self.kcals * percent_kcal_conversion,
-                fat=self.fat * percent_fat_conversion,
-                protein=self.protein * percent_protein_conversion,
-                kcals_units="kcals per person per day",
-                fat_units="grams per person per day",
-                protein_units="grams per person per day",
-            )
-
+        converted = self.in_unit_system(
+            "kcals_grams_grams_per_capita",
+            {" each month": " each month", " per month": ""},
+        )
+        if converted is not None:
+            return converted
         else:
             print("Error: conversion from these units not known")
             print("From units:")
@@ -7,68 +7,159 @@ Created on Tue Jul 22
 """
 import numpy as np
 from src.food_system.food import Food
+from src.optimizer.solution import Solution
+
+
+class SummaryResults:
+    """
+    The minimal results of a scenario, read from the optimizer's solution rather
+    than interpreted from each food (see Extractor.extract_summary)
+    """
+
+    def __init__(
+        self,
+        percent_people_fed,
+        constraining_nutrient,
+        constants,
+        sensitivity_report=None,
+    ):
+        self.percent_people_fed = percent_people_fed
+        self.constraining_nutrient = constraining_nutrient
+        self.constants = constants
+        self.sensitivity_report = sensitivity_report
 
 
 class Extractor:
+    # the ADD_* option which adds each extracted food. When the option is off, the
+    # food is zero every month, so it isn't extracted (see get_zero_food).
+    COMPONENT_OPTIONS = {
+        "stored_food": "ADD_STORED_FOOD",
+        "seaweed": "ADD_SEAWEED",
+        "cell_sugar": "ADD_CELLULOSIC_SUGAR",
+        "scp": "ADD_METHANE_SCP",
+        "fish": "ADD_FISH",
+        "greenhouse": "ADD_GREENHOUSES",
+        "grazing_milk": "ADD_MILK",
+        "grain_fed_milk": "ADD_MILK",
+    }
+
+    # read only zeros of shape (3, NMONTHS) for each number of months, shared by the
+    # foods of all the components which weren't added
+    ZERO_NUTRIENTS = {}
+
     def __init__(self, constants):
         self.constants = constants
 
-    def extract_results(self, model, variables, time_consts):
-        # extract the results from the model
+    def get_active_components(self):
+        """
+        Returns the set of foods in COMPONENT_OPTIONS which were added to the scenario
+        """
+        return {
+            food
+            for food, option in self.COMPONENT_OPTIONS.items()
+            if self.constants[option]
+        }
 
-        self.get_objective_optimization_results(model)
+    def get_zero_food(self):
+        """
+        Returns a food which is zero billion people fed each month, for a component
+        which wasn't added to the scenario. Its nutrients are a read only view of
+        zeros shared by all such foods, so they are copied before being changed in
+        place (see Food.make_sure_writeable).
+        """
+        n_months = self.constants["NMONTHS"]
+        if n_months not in Extractor.ZERO_NUTRIENTS:
+            zeros = np.zeros((3, n_months))
+            zeros.setflags(write=False)
+            Extractor.ZERO_NUTRIENTS[n_months] = zeros
 
-        # if no stored food, plot shows zero
-        self.extract_stored_food_results(variables["stored_food_eaten"])
+        return Food.from_numpy_array(
+            Extractor.ZERO_NUTRIENTS[n_months],
+            "billion people fed each month",
+            "billion people fed each month",
+            "billion people fed each month",
+        )
 
-        # extract numeric seaweed results in terms of people fed and raw
-        # tons wet
+    def extract_results(self, model, variables, time_consts, solution=None):
+        """
+        Extracts the results from the model. solution holds the values of the
+        variables (see Solution), and is read from the variables if it isn't given.
+        """
+        if solution is None:
+            solution = Solution(variables)
 
-        # if seaweed not added to model, plot shows zero
-        self.extract_seaweed_results(
-            variables["seaweed_wet_on_farm"],
-            variables["used_area"],
-            time_consts["built_area"],
-            variables["seaweed_food_produced"],
-        )
+        self.active_components = self.get_active_components()
 
-        # if no cellulosic sugar, plot shows zero
-        self.extract_cell_sugar_results(
-            time_consts["cellulosic_sugar"].for_humans.kcals,
-        )
+        self.get_objective_optimization_results(solution)
 
-        # if no scp, plot shows zero
-        self.extract_SCP_results(
-            time_consts["methane_scp"].for_humans.kcals,
-            time_consts["methane_scp"].for_humans.fat,
-            time_consts["methane_scp"].for_humans.protein,
-        )
+        # the foods of the components which weren't added are zero, so aren't
+        # extracted
+        if "stored_food" in self.active_components:
+            self.extract_stored_food_results(
+                solution.get_monthly_values("stored_food_eaten")
+            )
+        else:
+            self.stored_food = self.get_zero_food()
 
-        # if no fish, plot shows zero
-        self.extract_fish_results(
-            time_consts["production_kcals_fish_per_month"],
-            time_consts["production_fat_fish_per_month"],
-            time_consts["production_protein_fish_per_month"],
-        )
+        # extract numeric seaweed results in terms of people fed and raw
+        # tons wet
+        if "seaweed" in self.active_components:
+            self.extract_seaweed_results(
+                solution.get_monthly_values("seaweed_wet_on_farm"),
+                solution.get_monthly_values("used_area"),
+                time_consts["built_area"],
+                solution.get_monthly_values("seaweed_food_produced"),
+            )
+        else:
+            self.seaweed = self.get_zero_food()
 
-        # if no greenhouses, plot shows zero
-        self.extract_greenhouse_results(
-            time_consts["greenhouse_kcals_per_ha"],
-            time_consts["greenhouse_fat_per_ha"],
-            time_consts["greenhouse_protein_per_ha"],
-            time_consts["greenhouse_area"],
-        )
+        if "cell_sugar" in self.active_components:
+            self.extract_cell_sugar_results(
+                time_consts["cellulosic_sugar"].for_humans.kcals,
+            )
+        else:
+            self.cell_sugar = self.get_zero_food()
+
+        if "scp" in self.active_components:
+            self.extract_SCP_results(
+                time_consts["methane_scp"].for_humans.kcals,
+                time_consts["methane_scp"].for_humans.fat,
+                time_consts["methane_scp"].for_humans.protein,
+            )
+        else:
+            self.scp = self.get_zero_food()
+
+        if "fish" in self.active_components:
+            self.extract_fish_results(
+                time_consts["production_kcals_fish_per_month"],
+                time_consts["production_fat_fish_per_month"],
+                time_consts["production_protein_fish_per_month"],
+            )
+        else:
+            self.fish = self.get_zero_food()
+
+        if "greenhouse" in self.active_components:
+            self.extract_greenhouse_results(
+                time_consts["greenhouse_kcals_per_ha"],
+                time_consts["greenhouse_fat_per_ha"],
+                time_consts["greenhouse_protein_per_ha"],
+                time_consts["greenhouse_area"],
+            )
+        else:
+            self.greenhouse = self.get_zero_food()
 
         # if no outdoor food, plot shows zero
         self.extract_outdoor_crops_results(
-            variables["crops_food_eaten_no_relocation"],
-            variables["crops_food_eaten_relocated"],
+            solution.get_monthly_values("crops_food_eaten_no_relocation"),
+            solution.get_monthly_values("crops_food_eaten_relocated"),
             time_consts["outdoor_crops"].for_humans,
+            solution.is_modeled("crops_food_eaten_no_relocation"),
+            solution.is_modeled("crops_food_eaten_relocated"),
         )
 
         # if nonegg nonmilk meat isn't included, these results plot shows zero
         self.extract_meat_milk_results(
-            variables["culled_meat_eaten"],
+            solution.get_monthly_values("culled_meat_eaten"),
             time_consts["grazing_milk_kcals"],
             time_consts["grazing_milk_fat"],
             time_consts["grazing_milk_protein"],
@@ -87,33 +178,16 @@ class Extractor:
 
         return self
 
-    # order the variables that occur mid-month into a list of numeric values
-    def to_monthly_list(self, variables, conversion):
-        variable_output = []
-        # if the variable was not modeled
-        if isinstance((variables[0]), int):
-            return np.array([0] * len(variables))  # return initial value
-
-        SHOW_OUTPUT = False
-        if SHOW_OUTPUT:
-            print("Monthly Output for " + str(variables[0]))
-
-        for month in range(0, self.constants["NMONTHS"]):
-            val = variables[month]
-
-            # if something went wrong and the variable was not added for a certain month
-            assert not isinstance(type(val), int)
-            variable_output.append(val.varValue * conversion)
-            if SHOW_OUTPUT:
-                print("    Month " + str(month) + ": " + str(variable_output[month]))
-        return np.array(variable_output)
-
-    # order the variables that occur mid-month into a list of numeric values
+    def to_monthly_list(self, values, conversion):
+        """
+        Returns the values of a variable each month (see Solution.get_monthly_values)
+        multiplied by conversion
+        """
+        return np.asarray(values) * conversion
 
     def to_monthly_list_outdoor_crops_kcals(
         self,
-        crops_food_eaten_no_relocation,
-        crops_food_eaten_relocated,
+        crops_food_eaten,
         crops_kcals_produced,
         conversion,
     ):
@@ -139,56 +213,13 @@ class Extractor:
               same as the total amount eaten.
 
         """
+        crops_food_eaten = np.asarray(crops_food_eaten)
+        crops_kcals_produced = np.asarray(crops_kcals_produced)
 
-        immediately_eaten_output = []
-        new_stored_eaten_output = []
-        cf_eaten_output = []
-        cf_produced_output = []
-
-        # if the variable was not modeled
-        if isinstance(crops_food_eaten_no_relocation[0], int):
-            return [
-                [0] * len(crops_food_eaten_no_relocation),
-                [0] * len(crops_food_eaten_no_relocation),
-            ]  # return initial value
+        immediately_eaten = np.minimum(crops_kcals_produced, crops_food_eaten)
+        new_stored_crops_eaten = np.maximum(crops_food_eaten - crops_kcals_produced, 0)
 
-        for month in range(0, self.constants["NMONTHS"]):
-            cf_produced = crops_kcals_produced[month]
-            cf_produced_output.append(cf_produced)
-
-            # if the improved relocation was not used
-            if isinstance(crops_food_eaten_relocated[0], int):
-                cf_eaten = crops_food_eaten_no_relocation[month].varValue
-            else:
-                cf_eaten = (
-                    crops_food_eaten_no_relocation[month].varValue
-                    + crops_food_eaten_relocated[month].varValue
-                    * self.constants["OG_ROTATION_FRACTION_KCALS"]
-                )
-
-            cf_eaten_output.append(cf_eaten)
-
-            if cf_produced <= cf_eaten:
-                immediately_eaten = cf_produced
-                new_stored_crops_eaten = cf_eaten - cf_produced
-            else:  # crops_food_eaten < crops_kcals_produced
-                immediately_eaten = cf_eaten
-                new_stored_crops_eaten = 0
-
-            immediately_eaten_output.append(immediately_eaten * conversion)
-            new_stored_eaten_output.append(new_stored_crops_eaten * conversion)
-            SHOW_OUTPUT = False
-            if SHOW_OUTPUT:
-                print(
-                    "    Month "
-                    + str(month)
-                    + ": imm eaten: "
-                    + str(immediately_eaten_output[month])
-                    + " new stored eaten: "
-                    + str(new_stored_eaten_output[month])
-                )
-
-        return [immediately_eaten_output, new_stored_eaten_output]
+        return [immediately_eaten * conversion, new_stored_crops_eaten * conversion]
 
     # if greenhouses aren't included, these results will be zero
 
@@ -265,7 +296,14 @@ class Extractor:
         crops_food_eaten_no_relocation,
         crops_food_eaten_relocated,
         outdoor_crops,
+        outdoor_crops_modeled=True,
+        relocation_modeled=True,
     ):
+        """
+        Extracts the outdoor crops eaten from the crops eaten each month with and
+        without relocation, splitting them into the crops eaten in the month they
+        were produced and the crops which were stored first
+        """
         self.set_crop_produced_monthly(outdoor_crops)
 
         no_relocation = self.to_monthly_list(crops_food_eaten_no_relocation, 1)
@@ -274,15 +312,31 @@ class Extractor:
             self.constants["OG_ROTATION_FRACTION_KCALS"],
         )
 
-        [
-            billions_fed_immediate_outdoor_crops_kcals,
-            billions_fed_new_stored_outdoor_crops_kcals,
-        ] = self.to_monthly_list_outdoor_crops_kcals(
-            crops_food_eaten_no_relocation,
-            crops_food_eaten_relocated,
-            self.combined_produced_kcals,
-            1 / self.constants["KCALS_MONTHLY"],
-        )
+        if not outdoor_crops_modeled:
+            billions_fed_immediate_outdoor_crops_kcals = np.zeros(
+                len(crops_food_eaten_no_relocation)
+            )
+            billions_fed_new_stored_outdoor_crops_kcals = np.zeros(
+                len(crops_food_eaten_no_relocation)
+            )
+        else:
+            # if the improved relocation was not used
+            if not relocation_modeled:
+                crops_food_eaten = crops_food_eaten_no_relocation
+            else:
+                crops_food_eaten = (
+                    crops_food_eaten_no_relocation
+                    + crops_food_eaten_relocated
+                    * self.constants["OG_ROTATION_FRACTION_KCALS"]
+                )
+            [
+                billions_fed_immediate_outdoor_crops_kcals,
+                billions_fed_new_stored_outdoor_crops_kcals,
+            ] = self.to_monthly_list_outdoor_crops_kcals(
+                crops_food_eaten,
+                self.combined_produced_kcals,
+                1 / self.constants["KCALS_MONTHLY"],
+            )
 
         billions_fed_no_relocation = no_relocation / self.constants["KCALS_MONTHLY"]
         billions_fed_relocated = relocation / self.constants["KCALS_MONTHLY"]
@@ -674,26 +728,29 @@ class Extractor:
             protein_units="billion people fed each month",
         )
 
-        billions_fed_grazing_milk_kcals = (
-            np.array(grazing_milk_kcals) / self.constants["KCALS_MONTHLY"]
-        )
+        if "grazing_milk" in self.active_components:
+            billions_fed_grazing_milk_kcals = (
+                np.array(grazing_milk_kcals) / self.constants["KCALS_MONTHLY"]
+            )
 
-        billions_fed_grazing_milk_fat = (
-            np.array(grazing_milk_fat) / self.constants["FAT_MONTHLY"] / 1e9
-        )
+            billions_fed_grazing_milk_fat = (
+                np.array(grazing_milk_fat) / self.constants["FAT_MONTHLY"] / 1e9
+            )
 
-        billions_fed_grazing_milk_protein = (
-            np.array(grazing_milk_protein) / self.constants["PROTEIN_MONTHLY"] / 1e9
-        )
+            billions_fed_grazing_milk_protein = (
+                np.array(grazing_milk_protein) / self.constants["PROTEIN_MONTHLY"] / 1e9
+            )
 
-        self.grazing_milk = Food(
-            kcals=billions_fed_grazing_milk_kcals,
-            fat=billions_fed_grazing_milk_fat,
-            protein=billions_fed_grazing_milk_protein,
-            kcals_units="billion people fed each month",
-            fat_units="billion people fed each month",
-            protein_units="billion people fed each month",
-        )
+            self.grazing_milk = Food(
+                kcals=billions_fed_grazing_milk_kcals,
+                fat=billions_fed_grazing_milk_fat,
+                protein=billions_fed_grazing_milk_protein,
+                kcals_units="billion people fed each month",
+                fat_units="billion people fed each month",
+                protein_units="billion people fed each month",
+            )
+        else:
+            self.grazing_milk = self.get_zero_food()
 
         billions_fed_grain_fed_meat_kcals = (
             grain_fed_meat_kcals / self.constants["KCALS_MONTHLY"]
@@ -716,26 +773,29 @@ class Extractor:
             protein_units="billion people fed each month",
         )
 
-        billions_fed_grain_fed_milk_kcals = (
-            grain_fed_milk_kcals / self.constants["KCALS_MONTHLY"]
-        )
+        if "grain_fed_milk" in self.active_components:
+            billions_fed_grain_fed_milk_kcals = (
+                grain_fed_milk_kcals / self.constants["KCALS_MONTHLY"]
+            )
 
-        billions_fed_grain_fed_milk_fat = (
-            grain_fed_milk_fat / self.constants["FAT_MONTHLY"] / 1e9
-        )
+            billions_fed_grain_fed_milk_fat = (
+                grain_fed_milk_fat / self.constants["FAT_MONTHLY"] / 1e9
+            )
 
-        billions_fed_grain_fed_milk_protein = (
-            grain_fed_milk_protein / self.constants["PROTEIN_MONTHLY"] / 1e9
-        )
+            billions_fed_grain_fed_milk_protein = (
+                grain_fed_milk_protein / self.constants["PROTEIN_MONTHLY"] / 1e9
+            )
 
-        self.grain_fed_milk = Food(
-            kcals=billions_fed_grain_fed_milk_kcals,
-            fat=billions_fed_grain_fed_milk_fat,
-            protein=billions_fed_grain_fed_milk_protein,
-            kcals_units="billion people fed each month",
-            fat_units="billion people fed each month",
-            protein_units="billion people fed each month",
-        )
+            self.grain_fed_milk = Food(
+                kcals=billions_fed_grain_fed_milk_kcals,
+                fat=billions_fed_grain_fed_milk_fat,
+                protein=billions_fed_grain_fed_milk_protein,
+                kcals_units="billion people fed each month",
+                fat_units="billion people fed each month",
+                protein_units="billion people fed each month",
+            )
+        else:
+            self.grain_fed_milk = self.get_zero_food()
 
     # if stored food isn't included, these results will be zero
     def extract_stored_food_results(self, stored_food_eaten):
@@ -817,49 +877,56 @@ class Extractor:
     # are not exhausted, and the model will not be able to solve if the usage from
     # biofuels and feed are more than the available stored food and outdoor crop production.
 
-    def get_objective_optimization_results(self, model):
-        # I spent like five hours trying to figure out why the answer was wrong
-        # until I finally found an issue with string ordering, fixed it below
-
-        humans_fed_kcals = []
-        humans_fed_fat = []
-        humans_fed_protein = []
-        order_kcals = []
-        order_fat = []
-        order_protein = []
-        for var in model.variables():
-            if "Humans_Fed_Kcals_" in var.name:
-                humans_fed_kcals.append(var.value() / 100 * self.constants["POP"] / 1e9)
-
-                order_kcals.append(
-                    int(var.name[len("Humans_Fed_Kcals_") :].split("_")[0])
-                )
-
-            if "Humans_Fed_Fat_" in var.name:
-                order_fat.append(int(var.name[len("Humans_Fed_Fat_") :].split("_")[0]))
-
-                humans_fed_fat.append(var.value() / 100 * self.constants["POP"] / 1e9)
-
-            if "Humans_Fed_Protein_" in var.name:
-                order_protein.append(
-                    int(var.name[len("Humans_Fed_Protein_") :].split("_")[0])
-                )
+    def extract_summary(self, solution):
+        """
+        Returns the percent people fed as a SummaryResults, without extracting each
+        food. It is the least people fed by any included nutrient in any month, as
+        solved by the optimizer.
 
-                humans_fed_protein.append(
-                    var.value() / 100 * self.constants["POP"] / 1e9
-                )
+        This matches the interpreted percent people fed to about 1e-6 (relative), as
+        the second optimization (which smooths the food eaten over time) lets the
+        least people fed drop by up to that much.
+        """
+        humans_fed = {"kcals": solution.get_monthly_values("humans_fed_kcals")}
+        if self.constants["inputs"]["INCLUDE_FAT"]:
+            humans_fed["fat"] = solution.get_monthly_values("humans_fed_fat")
+        if self.constants["inputs"]["INCLUDE_PROTEIN"]:
+            humans_fed["protein"] = solution.get_monthly_values("humans_fed_protein")
 
-        zipped_lists = zip(order_kcals, humans_fed_kcals)
-        sorted_zipped_lists = sorted(zipped_lists)
-        humans_fed_kcals_optimizer = [element for _, element in sorted_zipped_lists]
+        least_fed = {nutrient: values.min() for nutrient, values in humans_fed.items()}
+        # the first nutrient with the least fed, like Food.get_min_nutrient
+        constraining_nutrient = min(least_fed, key=least_fed.get)
 
-        zipped_lists = zip(order_fat, humans_fed_fat)
-        sorted_zipped_lists = sorted(zipped_lists)
-        humans_fed_fat_optimizer = [element for _, element in sorted_zipped_lists]
+        return SummaryResults(
+            float(least_fed[constraining_nutrient]),
+            constraining_nutrient,
+            self.constants,
+            solution.sensitivity_report,
+        )
 
-        zipped_lists = zip(order_protein, humans_fed_protein)
-        sorted_zipped_lists = sorted(zipped_lists)
-        humans_fed_protein_optimizer = [element for _, element in sorted_zipped_lists]
+    def get_objective_optimization_results(self, solution):
+        """
+        Returns the billions of people fed by kcals, fat and protein each month, as
+        reported by the optimizer
+        """
+        humans_fed_kcals_optimizer = list(
+            solution.get_monthly_values("humans_fed_kcals")
+            / 100
+            * self.constants["POP"]
+            / 1e9
+        )
+        humans_fed_fat_optimizer = list(
+            solution.get_monthly_values("humans_fed_fat")
+            / 100
+            * self.constants["POP"]
+            / 1e9
+        )
+        humans_fed_protein_optimizer = list(
+            solution.get_monthly_values("humans_fed_protein")
+            / 100
+            * self.constants["POP"]
+            / 1e9
+        )
 
         return (
             humans_fed_kcals_optimizer,
@@ -10,20 +10,167 @@ Created on Tue Jul 19
 
 @author: morgan
 """
+import functools
+
 import numpy as np
 from src.food_system.food import Food
-import pandas as pd
+from src.food_system.unit_conversions import UnitConversions
+from src.food_system.feed_and_biofuels import FeedAndBiofuels
+import json
+import zipfile
+from pathlib import Path
+
+
+def food_view(nutrients, index, units):
+    """
+    Returns a cached property which is the food in row index of the nutrients
+    attribute (an array of shape (foods, 3, NMONTHS)), so the food is only created
+    the first time it is read. Like any other attribute, it can also be set directly.
+    """
+
+    def get_food(self):
+        return Food.from_numpy_array(
+            getattr(self, nutrients)[index], units, units, units
+        )
+
+    return functools.cached_property(get_food)
+
+
+def kcals_equivalent_view(index):
+    """
+    Returns a cached property which is the food in row index of the kcals
+    equivalent nutrients, which are computed the first time any of them are read
+    """
 
-import datetime
-from datetime import date
+    def get_food(self):
+        return Food.from_numpy_array(
+            self.kcals_equivalent_nutrients[index],
+            *Interpreter.KCALS_EQUIVALENT_UNITS,
+        )
+
+    return functools.cached_property(get_food)
 
 
 class Interpreter:
     """
     This class is used to convert between optimization results data and other useful
     ways of interpreting the results, as a diet, or as a total food supply.
+
+    The extracted foods are stacked into one array of shape (foods, 3, NMONTHS)
+    (in the order of EXTRACTED_FOODS), which is converted to percent people fed and
+    rounded all at once. The foods themselves (such as interpreter.fish, or
+    interpreter.fish_kcals_equivalent) are views of these arrays, created the first
+    time they are read.
     """
 
+    # the extracted foods which are interpreted, in the order of the rows of the
+    # nutrients arrays. The first 11 are the foods fed to humans.
+    EXTRACTED_FOODS = [
+        "stored_food",
+        "outdoor_crops",
+        "seaweed",
+        "cell_sugar",
+        "scp",
+        "greenhouse",
+        "fish",
+        "culled_meat_plus_grazing_cattle_maintained",
+        "grazing_milk",
+        "grain_fed_meat",
+        "grain_fed_milk",
+        "immediate_outdoor_crops",
+        "new_stored_outdoor_crops",
+    ]
+    N_FOODS_TO_HUMANS = 11
+
+    # the foods which the optimizer actually outputs, which are rounded to 0.001
+    # percent people fed (the row of each in EXTRACTED_FOODS)
+    ROUNDED_FOODS = [0, 1, 11, 12, 2]
+
+    # the kcals equivalent of these foods is converted from the percent people fed,
+    # and of the others directly from the extracted units
+    KCALS_EQUIVALENT_FROM_PERCENT_FED = [0, 1, 11, 12]
+
+    PERCENT_FED_UNITS = "percent people fed each month"
+    KCALS_EQUIVALENT_UNITS = [
+        "kcals per capita per day each month",
+        "effective kcals per capita per day each month",
+        "effective kcals per capita per day each month",
+    ]
+
+    # the foods summed by sum_many_results_together, in the order they are added
+    # up: rows of percent_fed_nutrients followed by rows of rounded_nutrients
+    SUMMED_FOODS = [
+        "fish",
+        "cell_sugar",
+        "scp",
+        "greenhouse",
+        "seaweed",
+        "grazing_milk",
+        "grain_fed_milk",
+        "culled_meat_plus_grazing_cattle_maintained",
+        "grain_fed_meat",
+        "immediate_outdoor_crops",
+        "new_stored_outdoor_crops",
+        "stored_food",
+    ]
+    SUMMED_FROM_PERCENT_FED = [6, 3, 4, 5, 2, 8, 10, 7, 9]
+    SUMMED_FROM_ROUNDED = [2, 3, 0]
+
+    # the options which must be the same for all the results summed together
+    SUMMED_FLAGS = [
+        "ADD_FISH",
+        "ADD_CELLULOSIC_SUGAR",
+        "ADD_METHANE_SCP",
+        "ADD_GREENHOUSES",
+        "ADD_SEAWEED",
+        "ADD_MILK",
+        "ADD_CULLED_MEAT",
+        "ADD_MAINTAINED_MEAT",
+        "ADD_OUTDOOR_GROWING",
+        "ADD_STORED_FOOD",
+    ]
+
+    # the nutrition requirements of the summed results: kcals, grams of fat and
+    # grams of protein per person per day
+    WORLD_KCALS_DAILY = 2100
+    WORLD_FAT_DAILY = 47
+    WORLD_PROTEIN_DAILY = 51
+
+    # percent people fed, rounded where the optimizer output them
+    stored_food = food_view("rounded_nutrients", 0, PERCENT_FED_UNITS)
+    outdoor_crops = food_view("rounded_nutrients", 1, PERCENT_FED_UNITS)
+    immediate_outdoor_crops = food_view("rounded_nutrients", 2, PERCENT_FED_UNITS)
+    new_stored_outdoor_crops = food_view("rounded_nutrients", 3, PERCENT_FED_UNITS)
+    seaweed_rounded = food_view("rounded_nutrients", 4, PERCENT_FED_UNITS)
+    seaweed = food_view("percent_fed_nutrients", 2, PERCENT_FED_UNITS)
+    cell_sugar = food_view("percent_fed_nutrients", 3, PERCENT_FED_UNITS)
+    scp = food_view("percent_fed_nutrients", 4, PERCENT_FED_UNITS)
+    greenhouse = food_view("percent_fed_nutrients", 5, PERCENT_FED_UNITS)
+    fish = food_view("percent_fed_nutrients", 6, PERCENT_FED_UNITS)
+    culled_meat_plus_grazing_cattle_maintained = food_view(
+        "percent_fed_nutrients", 7, PERCENT_FED_UNITS
+    )
+    grazing_milk = food_view("percent_fed_nutrients", 8, PERCENT_FED_UNITS)
+    grain_fed_meat = food_view("percent_fed_nutrients", 9, PERCENT_FED_UNITS)
+    grain_fed_milk = food_view("percent_fed_nutrients", 10, PERCENT_FED_UNITS)
+
+    # kcals equivalent, from the percent people fed before rounding
+    stored_food_kcals_equivalent = kcals_equivalent_view(0)
+    outdoor_crops_kcals_equivalent = kcals_equivalent_view(1)
+    seaweed_kcals_equivalent = kcals_equivalent_view(2)
+    cell_sugar_kcals_equivalent = kcals_equivalent_view(3)
+    scp_kcals_equivalent = kcals_equivalent_view(4)
+    greenhouse_kcals_equivalent = kcals_equivalent_view(5)
+    fish_kcals_equivalent = kcals_equivalent_view(6)
+    culled_meat_plus_grazing_cattle_maintained_kcals_equivalent = (
+        kcals_equivalent_view(7)
+    )
+    grazing_milk_kcals_equivalent = kcals_equivalent_view(8)
+    grain_fed_meat_kcals_equivalent = kcals_equivalent_view(9)
+    grain_fed_milk_kcals_equivalent = kcals_equivalent_view(10)
+    immediate_outdoor_crops_kcals_equivalent = kcals_equivalent_view(11)
+    new_stored_outdoor_crops_kcals_equivalent = kcals_equivalent_view(12)
+
     def __init__(self):
         self.show_feed_biofuels = (
             False  # until set to true, this will not show the feed or biofuels
@@ -45,150 +192,106 @@ class Interpreter:
 
         """
 
-        self.assign_percent_fed_from_extractor(extracted_results)
-        self.assign_kcals_equivalent_from_extractor(extracted_results)
+        self.include_fat = Food.conversions.include_fat
+        self.include_protein = Food.conversions.include_protein
 
-        # now the same, but in units effective kcals per day
-        # all these are just used for plotting only
+        self.assign_nutrients_from_extractor(extracted_results)
 
         self.constants = extracted_results.constants
         self.assign_time_months_middle(self.constants["NMONTHS"])
 
         self.assign_interpreted_properties(extracted_results)
 
-        self.include_fat = Food.conversions.include_fat
-        self.include_protein = Food.conversions.include_protein
-
-        CREATE_CSV_OUTPUT = True
-        if CREATE_CSV_OUTPUT:
-            dict = {
-                "fish": np.array(self.fish_kcals_equivalent.kcals),
-                "cell_sugar": np.array(self.cell_sugar_kcals_equivalent.kcals),
-                "scp": np.array(self.scp_kcals_equivalent.kcals),
-                "greenhouse": np.array(self.greenhouse_kcals_equivalent.kcals),
-                "seaweed": np.array(self.seaweed_kcals_equivalent.kcals),
-                "milk": np.array(self.grazing_milk_kcals_equivalent.kcals)
-                + np.array(self.grain_fed_milk_kcals_equivalent.kcals),
-                "meat": np.array(
-                    self.culled_meat_plus_grazing_cattle_maintained_kcals_equivalent.kcals
-                )
-                + np.array(self.grain_fed_meat_kcals_equivalent.kcals),
-                "immediate_outdoor_crops": np.array(
-                    self.immediate_outdoor_crops_kcals_equivalent.kcals
-                ),
-                "new_stored_outdoor_crops": np.array(
-                    self.new_stored_outdoor_crops_kcals_equivalent.kcals
-                ),
-                "stored_food": np.array(self.stored_food_kcals_equivalent.kcals),
-            }
-
-            df = pd.DataFrame(dict)
-
-            # saving the dataframe
-            # df.to_csv("ykcals" + self.constants["scenario_name"] + ".csv")
-            year = str(date.today().year)
-            month = str(date.today().month)
-            day = str(date.today().day)
-            hour = str(datetime.datetime.now().hour)
-            minute = str(datetime.datetime.now().minute)
-            second = str(datetime.datetime.now().second)
-            df.to_csv(
-                "ykcals"
-                + "."
-                + year
-                + "."
-                + month
-                + "."
-                + day
-                + "."
-                + hour
-                + "."
-                + minute
-                + "."
-                + second
-                + ".csv"
-            )
-
         return self
 
-    def assign_percent_fed_from_extractor(self, extracted_results):
-        self.stored_food = extracted_results.stored_food.in_units_percent_fed()
-
-        self.outdoor_crops = extracted_results.outdoor_crops.in_units_percent_fed()
-
-        self.seaweed = extracted_results.seaweed.in_units_percent_fed()
-
-        self.cell_sugar = extracted_results.cell_sugar.in_units_percent_fed()
-
-        self.scp = extracted_results.scp.in_units_percent_fed()
-
-        self.greenhouse = extracted_results.greenhouse.in_units_percent_fed()
-
-        self.fish = extracted_results.fish.in_units_percent_fed()
-
-        self.culled_meat_plus_grazing_cattle_maintained = (
-            extracted_results.culled_meat_plus_grazing_cattle_maintained.in_units_percent_fed()
-        )
-
-        self.grazing_milk = extracted_results.grazing_milk.in_units_percent_fed()
-
-        self.grain_fed_meat = extracted_results.grain_fed_meat.in_units_percent_fed()
-
-        self.grain_fed_milk = extracted_results.grain_fed_milk.in_units_percent_fed()
-
-        self.immediate_outdoor_crops = (
-            extracted_results.immediate_outdoor_crops.in_units_percent_fed()
-        )
-
-        self.new_stored_outdoor_crops = (
-            extracted_results.new_stored_outdoor_crops.in_units_percent_fed()
-        )
-
-    def assign_kcals_equivalent_from_extractor(self, extracted_results):
-        self.stored_food_kcals_equivalent = self.stored_food.in_units_kcals_equivalent()
-
-        self.outdoor_crops_kcals_equivalent = (
-            self.outdoor_crops.in_units_kcals_equivalent()
-        )
-
-        self.seaweed_kcals_equivalent = (
-            extracted_results.seaweed.in_units_kcals_equivalent()
-        )
-        self.cell_sugar_kcals_equivalent = (
-            extracted_results.cell_sugar.in_units_kcals_equivalent()
-        )
-
-        self.scp_kcals_equivalent = extracted_results.scp.in_units_kcals_equivalent()
-
-        self.greenhouse_kcals_equivalent = (
-            extracted_results.greenhouse.in_units_kcals_equivalent()
+    def get_kcals_equivalent_streams(self):
+        """
+        Returns the kcals equivalent of each food source each month, as a dictionary
+        of arrays (milk and meat each combine their grazing and grain fed sources)
+        """
+        return {
+            "fish": np.array(self.fish_kcals_equivalent.kcals),
+            "cell_sugar": np.array(self.cell_sugar_kcals_equivalent.kcals),
+            "scp": np.array(self.scp_kcals_equivalent.kcals),
+            "greenhouse": np.array(self.greenhouse_kcals_equivalent.kcals),
+            "seaweed": np.array(self.seaweed_kcals_equivalent.kcals),
+            "milk": np.array(self.grazing_milk_kcals_equivalent.kcals)
+            + np.array(self.grain_fed_milk_kcals_equivalent.kcals),
+            "meat": np.array(
+                self.culled_meat_plus_grazing_cattle_maintained_kcals_equivalent.kcals
+            )
+            + np.array(self.grain_fed_meat_kcals_equivalent.kcals),
+            "immediate_outdoor_crops": np.array(
+                self.immediate_outdoor_crops_kcals_equivalent.kcals
+            ),
+            "new_stored_outdoor_crops": np.array(
+                self.new_stored_outdoor_crops_kcals_equivalent.kcals
+            ),
+            "stored_food": np.array(self.stored_food_kcals_equivalent.kcals),
+        }
+
+    def assign_nutrients_from_extractor(self, extracted_results):
+        """
+        Stacks the extracted foods into one array, and converts it to percent people
+        fed with a single multiply. The conversion factors are kept, so the kcals
+        equivalent can be computed later even if the nutrition requirements of
+        Food.conversions have been changed by another run.
+        """
+        foods = [getattr(extracted_results, food) for food in self.EXTRACTED_FOODS]
+        units = foods[0].get_units()
+        assert all(food.get_units() == units for food in foods), (
+            "ERROR: the extracted foods must all have the same units"
+        )
+        assert all(food.is_list_monthly() for food in foods)
+
+        system, suffix = foods[0].get_unit_system_and_suffix()
+        assert suffix == " each month", "ERROR: extracted foods must be monthly"
+        conversions = Food.conversions
+        percent_fed = conversions.unit_system_index["percent_people_fed"]
+        kcals_equivalent = conversions.unit_system_index["kcals_equivalent"]
+        extracted = conversions.unit_system_index[system]
+
+        self.percent_fed_factors = conversions.conversion_table[extracted, percent_fed]
+        self.kcals_equivalent_factors = conversions.conversion_table[
+            extracted, kcals_equivalent
+        ]
+        self.kcals_equivalent_from_percent_fed_factors = conversions.conversion_table[
+            percent_fed, kcals_equivalent
+        ]
+        assert not np.isnan(self.percent_fed_factors).any(), (
+            "ERROR: can't convert the extracted foods from " + system
         )
 
-        self.fish_kcals_equivalent = extracted_results.fish.in_units_kcals_equivalent()
-
-        self.culled_meat_plus_grazing_cattle_maintained_kcals_equivalent = (
-            extracted_results.culled_meat_plus_grazing_cattle_maintained.in_units_kcals_equivalent()
+        self.extracted_nutrients = np.array(
+            [food.as_numpy_array() for food in foods], dtype=float
         )
-
-        self.grazing_milk_kcals_equivalent = (
-            extracted_results.grazing_milk.in_units_kcals_equivalent()
+        self.percent_fed_nutrients = (
+            self.extracted_nutrients * self.percent_fed_factors[:, np.newaxis]
         )
 
-        self.grain_fed_meat_kcals_equivalent = (
-            extracted_results.grain_fed_meat.in_units_kcals_equivalent()
-        )
+        # the foods are views of these, so they are read only to avoid changing
+        # another food by changing one in place
+        self.extracted_nutrients.setflags(write=False)
+        self.percent_fed_nutrients.setflags(write=False)
 
-        self.grain_fed_milk_kcals_equivalent = (
-            extracted_results.grain_fed_milk.in_units_kcals_equivalent()
+    @functools.cached_property
+    def kcals_equivalent_nutrients(self):
+        """
+        the kcals equivalent of all the extracted foods, as one array
+        """
+        assert not np.isnan(self.kcals_equivalent_factors).any(), (
+            "ERROR: can't convert the extracted foods to kcals equivalent"
         )
-
-        self.immediate_outdoor_crops_kcals_equivalent = (
-            self.immediate_outdoor_crops.in_units_kcals_equivalent()
+        kcals_equivalent = (
+            self.extracted_nutrients * self.kcals_equivalent_factors[:, np.newaxis]
         )
-
-        self.new_stored_outdoor_crops_kcals_equivalent = (
-            self.new_stored_outdoor_crops.in_units_kcals_equivalent()
+        from_percent_fed = self.KCALS_EQUIVALENT_FROM_PERCENT_FED
+        kcals_equivalent[from_percent_fed] = (
+            self.percent_fed_nutrients[from_percent_fed]
+            * self.kcals_equivalent_from_percent_fed_factors[:, np.newaxis]
         )
+        kcals_equivalent.setflags(write=False)
+        return kcals_equivalent
 
     def assign_time_months_middle(self, NMONTHS):
         self.time_months_middle = []
@@ -207,13 +310,7 @@ class Interpreter:
         # ... at least the ones that we can identify.
         # We also round everything to within 0.1% of its value,
         # in terms of % people fed.
-        (
-            self.stored_food,
-            self.outdoor_crops,
-            self.immediate_outdoor_crops,
-            self.new_stored_outdoor_crops,
-            self.seaweed_rounded,
-        ) = self.correct_and_validate_rounding_errors()
+        self.rounded_nutrients = self.correct_and_validate_rounding_errors()
 
         self.excess_feed = extracted_results.excess_feed
 
@@ -246,22 +343,17 @@ class Interpreter:
         sum the resulting nutrients from the extracted_results
 
         """
-
-        to_humans_fed_sum = (
-            self.stored_food
-            + self.outdoor_crops
-            + self.seaweed
-            + self.cell_sugar
-            + self.scp
-            + self.greenhouse
-            + self.fish
-            + self.culled_meat_plus_grazing_cattle_maintained
-            + self.grazing_milk
-            + self.grain_fed_meat
-            + self.grain_fed_milk
+        # summed over the rows in order, like adding up the foods one by one
+        to_humans_fed_sum = self.percent_fed_nutrients[: self.N_FOODS_TO_HUMANS].sum(
+            axis=0
         )
 
-        return to_humans_fed_sum
+        return Food.from_numpy_array(
+            to_humans_fed_sum,
+            self.PERCENT_FED_UNITS,
+            self.PERCENT_FED_UNITS,
+            self.PERCENT_FED_UNITS,
+        )
 
     def print_kcals_per_capita_per_day(self, interpreted_results):
         """
@@ -300,49 +392,27 @@ class Interpreter:
 
         Note: outdoor_crops_to_humans, stored_food, and seaweed are the only actual outputs of
               the optimizer!
-        """
-        assert (
-            self.stored_food.NMONTHS
-            == self.outdoor_crops.NMONTHS
-            == self.immediate_outdoor_crops.NMONTHS
-            == self.new_stored_outdoor_crops.NMONTHS
-            == self.seaweed.NMONTHS
-        )
-
-        assert self.stored_food.is_units_percent()
-        assert self.outdoor_crops.is_units_percent()
-        assert self.immediate_outdoor_crops.is_units_percent()
-        assert self.new_stored_outdoor_crops.is_units_percent()
-        assert self.seaweed.is_units_percent()
-
-        stored_food_rounded = self.stored_food.get_rounded_to_decimal(3)
-        outdoor_crops_rounded = self.outdoor_crops.get_rounded_to_decimal(3)
-        seaweed_rounded = self.seaweed.get_rounded_to_decimal(3)
 
-        immediate_outdoor_crops_rounded = (
-            self.immediate_outdoor_crops.get_rounded_to_decimal(3)
-        )
-        new_stored_outdoor_crops_rounded = (
-            self.new_stored_outdoor_crops.get_rounded_to_decimal(3)
-        )
+        returns: the percent people fed of stored food, outdoor crops, immediate
+        outdoor crops, new stored outdoor crops and seaweed, rounded to 0.001
+        """
+        rounded = np.round(self.percent_fed_nutrients[self.ROUNDED_FOODS], decimals=3)
 
         # if the value was a little less than zero, when rounded it would no longer be
         # less than zero.
-
-        assert stored_food_rounded.all_greater_than_or_equal_to_zero()
-        assert seaweed_rounded.all_greater_than_or_equal_to_zero()
-        assert outdoor_crops_rounded.all_greater_than_or_equal_to_zero()
-        assert immediate_outdoor_crops_rounded.all_greater_than_or_equal_to_zero()
-        assert new_stored_outdoor_crops_rounded.all_greater_than_or_equal_to_zero()
-
-        return (
-            stored_food_rounded,
-            outdoor_crops_rounded,
-            immediate_outdoor_crops_rounded,
-            new_stored_outdoor_crops_rounded,
-            seaweed_rounded,
+        checked = [True, self.include_fat, self.include_protein]
+        assert (rounded[:, checked] >= 0).all(), (
+            "ERROR: negative results after rounding for "
+            + ", ".join(
+                np.array(self.EXTRACTED_FOODS)[self.ROUNDED_FOODS][
+                    (rounded[:, checked] < 0).any(axis=(1, 2))
+                ]
+            )
         )
 
+        rounded.setflags(write=False)
+        return rounded
+
     def get_increased_excess_to_feed(
         self,
         feed_delay,
@@ -414,286 +484,444 @@ class Interpreter:
         returns: the interpreter object with the summed results divided by the
         population in question
         """
+        stacked = Interpreter.stack_many_results(many_results)
+        return Interpreter.sum_stacked_results(stacked, cap_at_100_percent)
 
-        i = 0
-        net_pop = 0
-        previous_interpreter = []
-        for country, interpreter in many_results.items():
-            # record some useful values for plotting from the interpreter
-            # will check later that these are consistent
-            include_fat = interpreter.include_fat
-            include_protein = interpreter.include_protein
-            time_months_middle = interpreter.time_months_middle
-
-            ADD_FISH = interpreter.constants["ADD_FISH"]
-            ADD_CELLULOSIC_SUGAR = interpreter.constants["ADD_CELLULOSIC_SUGAR"]
-            ADD_METHANE_SCP = interpreter.constants["ADD_METHANE_SCP"]
-            ADD_GREENHOUSES = interpreter.constants["ADD_GREENHOUSES"]
-            ADD_SEAWEED = interpreter.constants["ADD_SEAWEED"]
-            ADD_MILK = interpreter.constants["ADD_MILK"]
-            ADD_CULLED_MEAT = interpreter.constants["ADD_CULLED_MEAT"]
-            ADD_MAINTAINED_MEAT = interpreter.constants["ADD_MAINTAINED_MEAT"]
-            ADD_OUTDOOR_GROWING = interpreter.constants["ADD_OUTDOOR_GROWING"]
-            ADD_STORED_FOOD = interpreter.constants["ADD_STORED_FOOD"]
-
-            # print(interpreter.constants)
-            net_pop += interpreter.constants["POP"]
-            kcals_daily = interpreter.constants["inputs"]["NUTRITION"]["KCALS_DAILY"]
-            # needed to do unit conversions properly
-            Food.conversions.set_nutrition_requirements(
-                kcals_daily=kcals_daily,
-                fat_daily=interpreter.constants["inputs"]["NUTRITION"]["FAT_DAILY"],
-                protein_daily=interpreter.constants["inputs"]["NUTRITION"][
-                    "PROTEIN_DAILY"
-                ],
-                include_fat=include_fat,
-                include_protein=include_protein,
-                population=interpreter.constants["POP"],
+    def stack_many_results(many_results):
+        """
+        Stacks the foods of many results (such as one per country) into arrays to be
+        summed by sum_stacked_results, checking that all the results were run with
+        the same options. The stacked results only hold numpy arrays and plain
+        values, so they can be sent to (and summed in) other processes.
+
+        returns: a dictionary of
+            nutrients: (results, foods, 3, NMONTHS) percent people fed of each of
+                the SUMMED_FOODS
+            population, kcals_daily, fat_daily, protein_daily, percent_people_fed:
+                (results,) arrays of the values of each result
+            include_fat, include_protein, time_months_middle, constants: the values
+                which are the same for every result (constants has the ADD_* flags)
+        """
+        assert len(many_results) > 0, "ERROR: there are no results to sum"
+
+        nutrients = []
+        population = []
+        kcals_daily = []
+        fat_daily = []
+        protein_daily = []
+        percent_people_fed = []
+        for interpreter in many_results.values():
+            nutrients.append(
+                np.concatenate(
+                    [
+                        interpreter.percent_fed_nutrients[
+                            Interpreter.SUMMED_FROM_PERCENT_FED
+                        ],
+                        interpreter.rounded_nutrients[Interpreter.SUMMED_FROM_ROUNDED],
+                    ]
+                )
             )
+            population.append(interpreter.constants["POP"])
+            nutrition = interpreter.constants["inputs"]["NUTRITION"]
+            kcals_daily.append(nutrition["KCALS_DAILY"])
+            fat_daily.append(nutrition["FAT_DAILY"])
+            protein_daily.append(nutrition["PROTEIN_DAILY"])
+            percent_people_fed.append(interpreter.percent_people_fed)
+
+        # make sure all the interpreters have the same sets of constants
+        first = next(iter(many_results.values()))
+        constants = {flag: first.constants[flag] for flag in Interpreter.SUMMED_FLAGS}
+        for interpreter in many_results.values():
+            assert interpreter.include_fat == first.include_fat
+            assert interpreter.include_protein == first.include_protein
+            assert interpreter.time_months_middle == first.time_months_middle
+            for flag, value in constants.items():
+                assert interpreter.constants[flag] == value, (
+                    "ERROR: can't sum results with different values of " + flag
+                )
 
-            fish = interpreter.fish.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            cell_sugar = (
-                interpreter.cell_sugar.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            scp = interpreter.scp.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            greenhouse = (
-                interpreter.greenhouse.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            seaweed = (
-                interpreter.seaweed.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            grazing_milk = (
-                interpreter.grazing_milk.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            grain_fed_milk = (
-                interpreter.grain_fed_milk.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            cmpgcm = interpreter.culled_meat_plus_grazing_cattle_maintained
-            culled_meat_plus_grazing_cattle_maintained = (
-                cmpgcm.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            grain_fed_meat = (
-                interpreter.grain_fed_meat.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
+        return {
+            "nutrients": np.stack(nutrients),
+            "population": np.array(population, dtype=float),
+            "kcals_daily": np.array(kcals_daily, dtype=float),
+            "fat_daily": np.array(fat_daily, dtype=float),
+            "protein_daily": np.array(protein_daily, dtype=float),
+            "percent_people_fed": np.array(percent_people_fed, dtype=float),
+            "include_fat": first.include_fat,
+            "include_protein": first.include_protein,
+            "time_months_middle": first.time_months_middle,
+            "constants": constants,
+        }
+
+    def sum_stacked_results(stacked, cap_at_100_percent):
+        """
+        Sums the results stacked by stack_many_results, converting each result from
+        percent of its own population fed to billion kcals (and thousand tons of fat
+        and protein), and the sums to percent of the total population fed.
 
-            immediate_outdoor_crops = (
-                interpreter.immediate_outdoor_crops.in_units_bil_kcals_thou_tons_thou_tons_per_month()
-            )
-            new_stored_outdoor_crops = (
-                interpreter.new_stored_outdoor_crops.in_units_bil_kcals_thou_tons_thou_tons_per_month()
+        If cap_at_100_percent, the foods of each result which fed more than 100
+        percent are scaled down so they would feed exactly 100 percent.
+
+        This doesn't use or change the nutrition requirements of the Food class
+        conversions, so it can be called from other processes.
+
+        returns: the interpreter object with the summed results divided by the
+        population in question
+        """
+        billion_kcals = Interpreter.get_stacked_billion_kcals(
+            stacked, cap_at_100_percent
+        )
+
+        # summed in the same order as adding up each result in turn
+        return Interpreter.create_summed_results(
+            np.sum(billion_kcals, axis=0),
+            sum(stacked["population"].tolist()),
+            stacked,
+        )
+
+    def get_stacked_billion_kcals(stacked, cap_at_100_percent):
+        """
+        Converts the results stacked by stack_many_results from percent of their own
+        population fed to billion kcals, thousand tons fat and thousand tons protein,
+        capping each at 100 percent fed if cap_at_100_percent
+
+        returns: (results, foods, 3, NMONTHS) array
+        """
+        population = stacked["population"]
+
+        # the factors from percent people fed to billion kcals, thousand tons fat and
+        # thousand tons protein of each result, as in set_nutrition_requirements
+        days_in_month = 30
+        kcals_monthly = stacked["kcals_daily"] * days_in_month
+        fat_monthly = stacked["fat_daily"] / 1e6 * days_in_month / 1000
+        protein_monthly = stacked["protein_daily"] / 1e6 * days_in_month / 1000
+        to_billion_kcals = np.stack(
+            [
+                kcals_monthly * population / 1e9 / 100,
+                fat_monthly * population / 100,
+                protein_monthly * population / 100,
+            ],
+            axis=1,
+        )
+
+        billion_kcals = (
+            stacked["nutrients"] * to_billion_kcals[:, np.newaxis, :, np.newaxis]
+        )
+
+        if cap_at_100_percent:
+            # this is always less than 1 where more than 100 percent were fed. The
+            # value is the amount so percent people fed would be 100 if all the
+            # components are added up
+            percent_people_fed = stacked["percent_people_fed"]
+            ratio_so_adds_to_100_percent = np.where(
+                percent_people_fed <= 100, 1, 100 / percent_people_fed
             )
-            stored_food = (
-                interpreter.stored_food.in_units_bil_kcals_thou_tons_thou_tons_per_month()
+            billion_kcals = (
+                billion_kcals
+                * ratio_so_adds_to_100_percent[:, np.newaxis, np.newaxis, np.newaxis]
             )
 
-            if interpreter.percent_people_fed <= 100:
-                ratio_so_adds_to_100_percent = 1
-            else:
-                # this is always less than 1. The value is the amount so percent people
-                # fed would be 100 if all the components are added up
-                ratio_so_adds_to_100_percent = 100 / interpreter.percent_people_fed
-                assert 0 < ratio_so_adds_to_100_percent < 1
-
-            if cap_at_100_percent:
-                fish = fish * ratio_so_adds_to_100_percent
-                cell_sugar = cell_sugar * ratio_so_adds_to_100_percent
-                scp = scp * ratio_so_adds_to_100_percent
-                greenhouse = greenhouse * ratio_so_adds_to_100_percent
-                seaweed = seaweed * ratio_so_adds_to_100_percent
-                grazing_milk = grazing_milk * ratio_so_adds_to_100_percent
-                grain_fed_milk = grain_fed_milk * ratio_so_adds_to_100_percent
-                culled_meat_plus_grazing_cattle_maintained = (
-                    culled_meat_plus_grazing_cattle_maintained
-                    * ratio_so_adds_to_100_percent
-                )
-                grain_fed_meat = grain_fed_meat * ratio_so_adds_to_100_percent
-                immediate_outdoor_crops = (
-                    immediate_outdoor_crops * ratio_so_adds_to_100_percent
-                )
-                new_stored_outdoor_crops = (
-                    new_stored_outdoor_crops * ratio_so_adds_to_100_percent
-                )
-                stored_food = stored_food * ratio_so_adds_to_100_percent
-
-            if i == 0:
-                fish_cumulative = fish
-                cell_sugar_cumulative = cell_sugar
-                scp_cumulative = scp
-                greenhouse_cumulative = greenhouse
-                seaweed_cumulative = seaweed
-                grazing_milk_cumulative = grazing_milk
-                grain_fed_milk_cumulative = grain_fed_milk
-                culled_meat_plus_grazing_cattle_maintained_cumulative = (
-                    culled_meat_plus_grazing_cattle_maintained
-                )
-                grain_fed_meat_cumulative = grain_fed_meat
-                immediate_outdoor_crops_cumulative = immediate_outdoor_crops
-                new_stored_outdoor_crops_cumulative = new_stored_outdoor_crops
-                stored_food_cumulative = stored_food
-            else:
-                # make sure all the interpreters have the same sets of constants
-                assert previous_interpreter.include_fat == include_fat
-                assert previous_interpreter.include_protein == include_protein
-                assert previous_interpreter.time_months_middle == time_months_middle
-
-                assert ADD_FISH == previous_interpreter.constants["ADD_FISH"]
-
-                assert (
-                    ADD_CELLULOSIC_SUGAR
-                    == previous_interpreter.constants["ADD_CELLULOSIC_SUGAR"]
-                )
+        return billion_kcals
 
-                assert (
-                    ADD_METHANE_SCP == previous_interpreter.constants["ADD_METHANE_SCP"]
-                )
+    def create_summed_results(billion_kcals_sum, population, options):
+        """
+        Creates the interpreter of results summed in billion kcals, thousand tons
+        fat and thousand tons protein (a (foods, 3, NMONTHS) array, in the order of
+        SUMMED_FOODS), which fed the total population.
 
-                assert (
-                    ADD_GREENHOUSES == previous_interpreter.constants["ADD_GREENHOUSES"]
-                )
+        options has the include_fat, include_protein, time_months_middle and
+        constants of the summed results (as stacked by stack_many_results).
 
-                assert ADD_SEAWEED == previous_interpreter.constants["ADD_SEAWEED"]
+        returns: the interpreter object with the summed results divided by the
+        population in question
+        """
+        # the conversions for the total population, kept separate from the
+        # conversions of the Food class
+        world_conversions = UnitConversions()
+        world_conversions.set_nutrition_requirements(
+            kcals_daily=Interpreter.WORLD_KCALS_DAILY,
+            fat_daily=Interpreter.WORLD_FAT_DAILY,
+            protein_daily=Interpreter.WORLD_PROTEIN_DAILY,
+            include_fat=options["include_fat"],
+            include_protein=options["include_protein"],
+            population=population,
+        )
+        index = world_conversions.unit_system_index
+        table = world_conversions.conversion_table
+        to_percent_fed = table[index["billion_kcals"], index["percent_people_fed"]]
+        to_kcals_equivalent = table[
+            index["percent_people_fed"], index["kcals_equivalent"]
+        ]
 
-                assert ADD_MILK == previous_interpreter.constants["ADD_MILK"]
+        # (foods, 3, NMONTHS)
+        percent_fed = billion_kcals_sum * to_percent_fed[:, np.newaxis]
+        kcals_equivalent = percent_fed * to_kcals_equivalent[:, np.newaxis]
+        humans_fed_sum = np.sum(percent_fed, axis=0)
 
-                assert (
-                    ADD_CULLED_MEAT == previous_interpreter.constants["ADD_CULLED_MEAT"]
-                )
+        global_results = Interpreter()
+        global_results.time_months_middle = options["time_months_middle"]
+        global_results.include_fat = options["include_fat"]
+        global_results.include_protein = options["include_protein"]
+        global_results.kcals_fed = humans_fed_sum[0]
+        global_results.fat_fed = humans_fed_sum[1]
+        global_results.protein_fed = humans_fed_sum[2]
+        global_results.constants = dict(options["constants"])
+
+        for food, food_kcals_equivalent in zip(
+            Interpreter.SUMMED_FOODS, kcals_equivalent
+        ):
+            setattr(
+                global_results,
+                food + "_kcals_equivalent",
+                Food.from_numpy_array(
+                    food_kcals_equivalent, *Interpreter.KCALS_EQUIVALENT_UNITS
+                ),
+            )
+        return global_results
 
-                assert (
-                    ADD_MAINTAINED_MEAT
-                    == previous_interpreter.constants["ADD_MAINTAINED_MEAT"]
-                )
+    # saving and loading results
 
-                assert (
-                    ADD_OUTDOOR_GROWING
-                    == previous_interpreter.constants["ADD_OUTDOOR_GROWING"]
-                )
+    def save_results(self, path, dtype=np.float64):
+        """
+        Saves the interpreted results to a compact .npz file (see
+        save_many_results), which can be reopened with Interpreter.load_results
+        """
+        Interpreter.save_many_results({"results": self}, path, dtype)
 
-                assert (
-                    ADD_OUTDOOR_GROWING
-                    == previous_interpreter.constants["ADD_OUTDOOR_GROWING"]
-                )
+    def load_results(path, memory_map=False):
+        """
+        Loads interpreted results saved by save_results
+        """
+        return Interpreter.load_many_results(path, memory_map)["results"]
 
-                assert (
-                    ADD_STORED_FOOD == previous_interpreter.constants["ADD_STORED_FOOD"]
-                )
+    def save_many_results(many_results, path, dtype=np.float64):
+        """
+        Saves a dictionary of interpreted results (for example, one per country) to a
+        single uncompressed .npz file, rather than pickling the whole objects.
+
+        Each food is stored as one (3, NMONTHS) block of kcals, fat and protein, in
+        float64 or float32 depending on dtype. The units are stored once for the
+        whole file, and each food refers to them by index. Numbers, strings and
+        arrays are stored as arrays, and the constants are stored as json (leaving
+        out anything which can't be stored as json).
+
+        arguments:
+            many_results (dict): the interpreters, keyed by name (such as country)
+            path (str or Path): where to save the file (".npz" is added if path
+                doesn't already end with it, as np.savez does)
+            dtype: np.float64, or np.float32 for half the size on disk
+        """
+        units_index = {}
+        columns = {}
+        for name, interpreter in many_results.items():
+            assert "/" not in name, "result names can't contain '/'"
 
-                fish_cumulative = fish_cumulative + fish
-                cell_sugar_cumulative = cell_sugar_cumulative + cell_sugar
-                scp_cumulative = scp_cumulative + scp
-                greenhouse_cumulative = greenhouse_cumulative + greenhouse
-                seaweed_cumulative = seaweed_cumulative + seaweed
-                grazing_milk_cumulative = grazing_milk_cumulative + grazing_milk
-                grain_fed_milk_cumulative = grain_fed_milk_cumulative + grain_fed_milk
-                culled_meat_plus_grazing_cattle_maintained_cumulative = (
-                    culled_meat_plus_grazing_cattle_maintained_cumulative
-                    + culled_meat_plus_grazing_cattle_maintained
-                )
-                grain_fed_meat_cumulative = grain_fed_meat_cumulative + grain_fed_meat
-                immediate_outdoor_crops_cumulative = (
-                    immediate_outdoor_crops_cumulative + immediate_outdoor_crops
+            Interpreter.add_object_columns(
+                interpreter, name + "/", units_index, dtype, columns
+            )
+            if hasattr(interpreter, "feed_and_biofuels"):
+                Interpreter.add_object_columns(
+                    interpreter.feed_and_biofuels,
+                    name + "/feed_and_biofuels.",
+                    units_index,
+                    dtype,
+                    columns,
                 )
-                new_stored_outdoor_crops_cumulative = (
-                    new_stored_outdoor_crops_cumulative + new_stored_outdoor_crops
+            if hasattr(interpreter, "constants"):
+                columns[name + "/constants"] = np.array(
+                    json.dumps(Interpreter.get_json_safe(interpreter.constants))
                 )
-                stored_food_cumulative = stored_food_cumulative + stored_food
 
-            previous_interpreter = interpreter
-            i += 1
+        columns["units"] = np.array(list(units_index.keys()), dtype=str)
+        columns["names"] = np.array(list(many_results.keys()), dtype=str)
 
-        # kcals per person per day
-        KCALS_DAILY = 2100
+        np.savez(Interpreter.get_npz_path(path), **columns)
 
-        # grams per person per day
-        FAT_DAILY = 47
+    def get_npz_path(path):
+        """
+        Returns path with ".npz" added if it doesn't already end with it, which is the
+        file np.savez writes to, so results are loaded from the same path they were
+        saved to
+        """
+        if str(path).endswith(".npz"):
+            return Path(path)
+        return Path(str(path) + ".npz")
 
-        # grams per person per day
-        PROTEIN_DAILY = 51
+    def add_object_columns(obj, prefix, units_index, dtype, columns):
+        """
+        Adds the foods, numbers, strings, arrays and lists which are attributes of obj
+        to columns, with keys starting with prefix
+        """
+        for attribute, value in vars(obj).items():
+            if isinstance(value, Food):
+                for unit in value.get_units():
+                    units_index.setdefault(unit, len(units_index))
+                columns[prefix + "food." + attribute] = value.as_numpy_array().astype(
+                    dtype
+                )
+                columns[prefix + "food_units." + attribute] = np.array(
+                    [units_index[unit] for unit in value.get_units()], dtype=np.int32
+                )
+            elif isinstance(value, (bool, int, float, str, np.generic)):
+                columns[prefix + "value." + attribute] = np.array(value)
+            elif isinstance(value, np.ndarray) and value.dtype != object:
+                if np.issubdtype(value.dtype, np.floating):
+                    value = value.astype(dtype)
+                columns[prefix + "value." + attribute] = value
+            elif isinstance(value, list) and all(
+                isinstance(element, (int, float)) for element in value
+            ):
+                columns[prefix + "list." + attribute] = np.array(value)
+
+    def get_json_safe(value):
+        """
+        Returns a copy of value which can be saved as json, converting numpy arrays
+        and numbers to lists and numbers, and leaving out anything else which isn't a
+        dictionary, list, string, number, bool or None. Returns None if value itself
+        can't be saved.
+        """
+        if isinstance(value, dict):
+            safe = {}
+            for key, item in value.items():
+                safe_item = Interpreter.get_json_safe(item)
+                if safe_item is not None or item is None:
+                    safe[str(key)] = safe_item
+            return safe
+        if isinstance(value, (list, tuple)):
+            return [Interpreter.get_json_safe(item) for item in value]
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, (bool, int, float, str)):
+            return value
+        return None
+
+    def load_many_results(path, memory_map=False):
+        """
+        Loads a dictionary of interpreted results saved by save_many_results.
 
-        Food.conversions.set_nutrition_requirements(
-            kcals_daily=KCALS_DAILY,
-            fat_daily=FAT_DAILY,
-            protein_daily=PROTEIN_DAILY,
-            include_fat=include_fat,
-            include_protein=include_protein,
-            population=net_pop,
-        )
+        If memory_map is True, the arrays are memory mapped from the file rather
+        than read into memory, so reopening many results is fast and only the values
+        which are used are read. Memory mapped foods are read only, and are copied if
+        they are changed in place (see Food.make_sure_writeable).
 
-        global_results = Interpreter()
+        returns: dictionary of interpreters keyed by name
+        """
+        columns = Interpreter.load_npz(path, memory_map)
+        units = columns["units"].tolist()
+
+        # the columns of each result, keyed by what follows the "name/" prefix, so
+        # each column is only looked at once however many results there are
+        columns_by_name = {}
+        for key, values in columns.items():
+            if "/" not in key:
+                continue
+            name, attribute_key = key.split("/", 1)
+            columns_by_name.setdefault(name, {})[attribute_key] = values
+
+        many_results = {}
+        for name in columns["names"].tolist():
+            interpreter = Interpreter()
+            feed_and_biofuels = None
+
+            name_columns = columns_by_name.get(name, {})
+            for attribute_key, values in name_columns.items():
+                if attribute_key == "constants":
+                    interpreter.constants = json.loads(values.item())
+                    continue
+
+                target = interpreter
+                target_prefix = ""
+                if attribute_key.startswith("feed_and_biofuels."):
+                    if feed_and_biofuels is None:
+                        # the values are filled in below rather than recomputed
+                        feed_and_biofuels = FeedAndBiofuels.__new__(FeedAndBiofuels)
+                    target = feed_and_biofuels
+                    target_prefix = "feed_and_biofuels."
+                    attribute_key = attribute_key[len(target_prefix) :]
+
+                kind, attribute = attribute_key.split(".", 1)
+                if kind == "food":
+                    unit_indices = name_columns[
+                        target_prefix + "food_units." + attribute
+                    ]
+                    [kcals_units, fat_units, protein_units] = [
+                        units[i] for i in unit_indices
+                    ]
+                    value = Food.from_numpy_array(
+                        values, kcals_units, fat_units, protein_units
+                    )
+                elif kind == "value":
+                    value = values.item() if values.ndim == 0 else values
+                elif kind == "list":
+                    value = values.tolist()
+                else:
+                    # food_units are read along with their food
+                    continue
+
+                setattr(target, attribute, value)
+
+            if feed_and_biofuels is not None:
+                interpreter.feed_and_biofuels = feed_and_biofuels
+
+            many_results[name] = interpreter
+
+        return many_results
+
+    def load_npz(path, memory_map=False):
+        """
+        Loads all the arrays in a .npz file into a dictionary.
 
-        humans_fed_sum = (
-            fish_cumulative.in_units_percent_fed()
-            + cell_sugar_cumulative.in_units_percent_fed()
-            + scp_cumulative.in_units_percent_fed()
-            + greenhouse_cumulative.in_units_percent_fed()
-            + seaweed_cumulative.in_units_percent_fed()
-            + grazing_milk_cumulative.in_units_percent_fed()
-            + grain_fed_milk_cumulative.in_units_percent_fed()
-            + culled_meat_plus_grazing_cattle_maintained_cumulative.in_units_percent_fed()
-            + grain_fed_meat_cumulative.in_units_percent_fed()
-            + immediate_outdoor_crops_cumulative.in_units_percent_fed()
-            + new_stored_outdoor_crops_cumulative.in_units_percent_fed()
-            + stored_food_cumulative.in_units_percent_fed()
-        )
+        numpy can't memory map the arrays inside a .npz file, but as save_many_results
+        doesn't compress them, each array is stored as a plain .npy file within the
+        zip file. So if memory_map is True, each array is memory mapped from where its
+        data starts in the zip file.
 
-        global_results.time_months_middle = time_months_middle
-        global_results.include_fat = include_fat
-        global_results.include_protein = include_protein
-        global_results.kcals_fed = humans_fed_sum.kcals
-        global_results.fat_fed = humans_fed_sum.fat
-        global_results.protein_fed = humans_fed_sum.protein
-
-        global_results.constants = {}
-        global_results.constants["ADD_FISH"] = ADD_FISH
-        global_results.constants["ADD_CELLULOSIC_SUGAR"] = ADD_CELLULOSIC_SUGAR
-        global_results.constants["ADD_METHANE_SCP"] = ADD_METHANE_SCP
-        global_results.constants["ADD_GREENHOUSES"] = ADD_GREENHOUSES
-        global_results.constants["ADD_SEAWEED"] = ADD_SEAWEED
-        global_results.constants["ADD_MILK"] = ADD_MILK
-        global_results.constants["ADD_CULLED_MEAT"] = ADD_CULLED_MEAT
-        global_results.constants["ADD_MAINTAINED_MEAT"] = ADD_MAINTAINED_MEAT
-        global_results.constants["ADD_OUTDOOR_GROWING"] = ADD_OUTDOOR_GROWING
-        global_results.constants["ADD_OUTDOOR_GROWING"] = ADD_OUTDOOR_GROWING
-        global_results.constants["ADD_STORED_FOOD"] = ADD_STORED_FOOD
-
-        global_results.kcals_fed = humans_fed_sum.kcals
-        global_results.fat_fed = humans_fed_sum.fat
-        global_results.protein_fed = humans_fed_sum.protein
-
-        global_results.fish_kcals_equivalent = (
-            fish_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.cell_sugar_kcals_equivalent = (
-            cell_sugar_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.scp_kcals_equivalent = (
-            scp_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.greenhouse_kcals_equivalent = (
-            greenhouse_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.seaweed_kcals_equivalent = (
-            seaweed_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.grazing_milk_kcals_equivalent = (
-            grazing_milk_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.grain_fed_milk_kcals_equivalent = (
-            grain_fed_milk_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.culled_meat_plus_grazing_cattle_maintained_kcals_equivalent = (
-            culled_meat_plus_grazing_cattle_maintained_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.grain_fed_meat_kcals_equivalent = (
-            grain_fed_meat_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.immediate_outdoor_crops_kcals_equivalent = (
-            immediate_outdoor_crops_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.new_stored_outdoor_crops_kcals_equivalent = (
-            new_stored_outdoor_crops_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        global_results.stored_food_kcals_equivalent = (
-            stored_food_cumulative.in_units_percent_fed().in_units_kcals_equivalent()
-        )
-        return global_results
+        As with np.savez, ".npz" is added to path if it doesn't already end with it.
+        """
+        path = Interpreter.get_npz_path(path)
+        if not memory_map:
+            with np.load(path) as npz:
+                return {key: npz[key] for key in npz.files}
+
+        arrays = {}
+        with zipfile.ZipFile(path) as archive, open(path, "rb") as file:
+            for info in archive.infolist():
+                key = info.filename[: -len(".npy")]
+
+                # the local header is 30 bytes, then the file name and extra field
+                file.seek(info.header_offset)
+                local_header = file.read(30)
+                name_length = int.from_bytes(local_header[26:28], "little")
+                extra_length = int.from_bytes(local_header[28:30], "little")
+                file.seek(info.header_offset + 30 + name_length + extra_length)
+
+                version = np.lib.format.read_magic(file)
+                if version == (1, 0):
+                    header = np.lib.format.read_array_header_1_0(file)
+                else:
+                    header = np.lib.format.read_array_header_2_0(file)
+                shape, fortran_order, dtype = header
+
+                if (
+                    info.compress_type != zipfile.ZIP_STORED
+                    or len(shape) == 0
+                    or 0 in shape
+                    or dtype.hasobject
+                ):
+                    # can't be memory mapped (and too small to need to be)
+                    with archive.open(info) as member:
+                        arrays[key] = np.lib.format.read_array(member)
+                    continue
+
+                arrays[key] = np.memmap(
+                    path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=file.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+
+        return arrays
@@ -5,13 +5,23 @@ over time including models for traditional and resilient foods.
 """
 import pulp
 from pulp import LpMaximize, LpMinimize, LpProblem, LpVariable
+from src.optimizer.solution import Solution
+from src.optimizer.sensitivity_report import SensitivityReport
 
 
 class Optimizer:
     def __init__(self):
         pass
 
-    def optimize(self, single_valued_constants, time_consts):
+    def optimize(self, single_valued_constants, time_consts, smooth=True):
+        """
+        Builds and solves the model. If smooth is False, the second optimization,
+        which smooths the food eaten over time without changing the least people
+        fed, is skipped.
+
+        The duals and reduced costs of the first solve are kept in the solution's
+        sensitivity_report (see SensitivityReport).
+        """
         maximize_constraints = []  # used only for validation
 
         # Create the model to optimize
@@ -88,7 +98,20 @@ class Optimizer:
         if ASSERT_SUCCESSFUL_OPTIMIZATION:
             assert status == 1, "ERROR: OPTIMIZATION FAILED!"
 
-        if status == 1 and self.single_valued_constants["STORE_FOOD_BETWEEN_YEARS"]:
+        # read before the second optimization changes the objective
+        COLLECT_SENSITIVITY = True
+        if COLLECT_SENSITIVITY and status == 1:
+            sensitivity_report = SensitivityReport(
+                model, NMONTHS, single_valued_constants["MAXIMUM_DENSITY"]
+            )
+        else:
+            sensitivity_report = None
+
+        if (
+            status == 1
+            and smooth
+            and self.single_valued_constants["STORE_FOOD_BETWEEN_YEARS"]
+        ):
             model, variables = self.second_optimization_smoothing(
                 model,
                 variables,
@@ -96,12 +119,17 @@ class Optimizer:
                 ASSERT_SUCCESSFUL_OPTIMIZATION,
                 single_valued_constants,
             )
+
+        # the values of all the variables, read once for the extractor
+        solution = Solution(variables, sensitivity_report)
+
         return (
             model,
             variables,
             maximize_constraints,
             single_valued_constants,
             time_consts,
+            solution,
         )
 
     def second_optimization_smoothing(
@@ -611,62 +611,57 @@ class Parameters:
         stored_food,
         feed_and_biofuels,
     ):
-        (
-            outdoor_crops_remaining_after_biofuel,
-            remaining_biofuel_needed_from_stored_food,
-            outdoor_crops_used_for_biofuel,
-            methane_scp_used_for_biofuel,
-            cellulosic_sugar_used_for_biofuel,
-        ) = self.calculate_biofuel_components_without_stored_food(
-            constants_inputs["INCLUDE_FAT"] or constants_inputs["INCLUDE_PROTEIN"],
-            biofuels_before_cap_prewaste,
-            seaweed,
-            cellulosic_sugar,
-            methane_scp,
-            outdoor_crops,
+        include_fat_or_protein = (
+            constants_inputs["INCLUDE_FAT"] or constants_inputs["INCLUDE_PROTEIN"]
         )
+        assert not include_fat_or_protein, """ERROR: feed and biofuel calculations
+        are not working yet for scenarios including fat or protein"""
 
-        cellulosic_sugar_remaining_after_biofuel = np.subtract(
+        # biofuels are allocated first, then feed from what remains
+        (
+            biofuel_allocation,
+            remaining_biofuel_needed_from_stored_food,
+        ) = self.allocate_usage_without_stored_food(
+            biofuels_before_cap_prewaste.kcals,
+            cellulosic_sugar.MAX_FRACTION_BIOFUEL_CONSUMED_AS_CELLULOSIC_SUGAR,
             cellulosic_sugar.production.kcals,
-            cellulosic_sugar_used_for_biofuel,
-        )
-        methane_scp_remaining_after_biofuel = np.subtract(
+            methane_scp.MAX_FRACTION_BIOFUEL_CONSUMED_AS_SCP,
             methane_scp.production.kcals,
-            methane_scp_used_for_biofuel,
+            outdoor_crops.production.kcals,
         )
         (
-            outdoor_crops_remaining_after_feed_and_biofuel,
+            feed_allocation,
             remaining_feed_needed_from_stored_food,
-            outdoor_crops_used_for_feed,
-            methane_scp_used_for_feed,
-            cellulosic_sugar_used_for_feed,
-        ) = self.calculate_feed_components_without_stored_food(
-            constants_inputs["INCLUDE_FAT"] or constants_inputs["INCLUDE_PROTEIN"],
-            feed_before_cap_prewaste,
+        ) = self.allocate_usage_without_stored_food(
+            feed_before_cap_prewaste.kcals,
             cellulosic_sugar.MAX_FRACTION_FEED_CONSUMED_AS_CELLULOSIC_SUGAR,
+            biofuel_allocation["cellulosic_sugar_remaining"],
             methane_scp.MAX_FRACTION_FEED_CONSUMED_AS_SCP,
-            cellulosic_sugar_remaining_after_biofuel,
-            methane_scp_remaining_after_biofuel,
-            outdoor_crops_remaining_after_biofuel,
+            biofuel_allocation["methane_scp_remaining"],
+            biofuel_allocation["outdoor_crops_remaining"],
         )
 
         feed_and_biofuels.set_feed_and_biofuels(
-            outdoor_crops_used_for_biofuel,
-            methane_scp_used_for_biofuel,
-            cellulosic_sugar_used_for_biofuel,
+            biofuel_allocation["outdoor_crops_used"],
+            biofuel_allocation["methane_scp_used"],
+            biofuel_allocation["cellulosic_sugar_used"],
             remaining_biofuel_needed_from_stored_food,
-            outdoor_crops_used_for_feed,
-            methane_scp_used_for_feed,
-            cellulosic_sugar_used_for_feed,
+            feed_allocation["outdoor_crops_used"],
+            feed_allocation["methane_scp_used"],
+            feed_allocation["cellulosic_sugar_used"],
             remaining_feed_needed_from_stored_food,
         )
+        feed_and_biofuels.set_allocation(biofuel_allocation, feed_allocation)
 
-        methane_scp_remaining_after_feed_and_biofuel = (
-            methane_scp_remaining_after_biofuel - methane_scp_used_for_feed
-        )
-        cellulosic_sugar_remaining_after_feed_and_biofuel = (
-            cellulosic_sugar_remaining_after_biofuel - cellulosic_sugar_used_for_feed
-        )
+        outdoor_crops_remaining_after_feed_and_biofuel = feed_allocation[
+            "outdoor_crops_remaining"
+        ]
+        methane_scp_remaining_after_feed_and_biofuel = feed_allocation[
+            "methane_scp_remaining"
+        ]
+        cellulosic_sugar_remaining_after_feed_and_biofuel = feed_allocation[
+            "cellulosic_sugar_remaining"
+        ]
 
         # TODO: INCLUDE FAT AND PROTEIN HERE RATHER THAN JUST MAKING THEM ZERO!!!
         outdoor_crops.for_humans = Food(
@@ -779,239 +774,94 @@ class Parameters:
 
         return (time_consts, constants_out, feed_and_biofuels)
 
-    def calculate_biofuel_components_without_stored_food(
+    def allocate_usage_without_stored_food(
         self,
-        include_fat_or_protein,
-        biofuels_before_cap_prewaste,
-        seaweed,
-        cellulosic_sugar,
-        methane_scp,
-        outdoor_crops,
+        usage_kcals,
+        max_fraction_from_cellulosic_sugar,
+        cellulosic_sugar_available,
+        max_fraction_from_methane_scp,
+        methane_scp_available,
+        outdoor_crops_available,
     ):
-        assert not include_fat_or_protein, """ERROR:" biofuel calculations are not 
-        working  yet for scenarios including fat or protein"""
-
-        # first, preference seaweed, then cellulosic_sugar, then methane_scp
-
-        # TODO: ADD SEAWEED
-        # cell sugar
-
-        cell_sugar_for_biofuel = (
-            cellulosic_sugar.MAX_FRACTION_BIOFUEL_CONSUMED_AS_CELLULOSIC_SUGAR
-            * biofuels_before_cap_prewaste.kcals
-        )
-
-        # minimum between elements of two 1d arrays
-        cell_sugar_for_biofuel_after_limit = np.min(
-            [cell_sugar_for_biofuel, cellulosic_sugar.production.kcals], axis=0
-        )
-
-        cellulosic_sugar_used_for_biofuel = np.min(
-            [cell_sugar_for_biofuel_after_limit, biofuels_before_cap_prewaste.kcals],
-            axis=0,
-        )
-
-        remaining_biofuel_needed = np.subtract(
-            biofuels_before_cap_prewaste.kcals, cellulosic_sugar_used_for_biofuel
-        )
-
-        # methanescp
-
-        methane_scp_for_biofuel = (
-            methane_scp.MAX_FRACTION_BIOFUEL_CONSUMED_AS_SCP * remaining_biofuel_needed
-        )
-
-        methane_scp_for_biofuel_after_limit = np.min(
-            [methane_scp_for_biofuel, methane_scp.production.kcals], axis=0
-        )
-
-        methane_scp_used_for_biofuel = np.min(
-            [methane_scp_for_biofuel_after_limit, remaining_biofuel_needed], axis=0
-        )
-
-        remaining_biofuel_needed = np.subtract(
-            biofuels_before_cap_prewaste.kcals, methane_scp_used_for_biofuel
-        )
-
-        # outdoor growing
-
-        outdoor_crops_used_for_biofuel_before_shift = np.min(
-            [outdoor_crops.production.kcals, remaining_biofuel_needed], axis=0
-        )
-
-        remaining_biofuel_needed_kcals_before_shift = np.subtract(
-            biofuels_before_cap_prewaste.kcals,
-            outdoor_crops_used_for_biofuel_before_shift,
-        )
-
-        outdoor_crops_remaining_after_biofuel_before_shift = (
-            outdoor_crops.production.kcals - outdoor_crops_used_for_biofuel_before_shift
-        )
-
-        # THE SHIFT AND SUBTRACT (ALLOWING STORED FOOD FROM OUTDOOR GROWING TO BE USED) IS BELOW
-
-        (
-            outdoor_crops_remaining_after_biofuel,
-            remaining_biofuel_needed_from_stored_food,
-            outdoor_crops_used_for_biofuel_stored_6months,
-        ) = self.subtract_off_usage_iteratively(
-            remaining_biofuel_needed_kcals_before_shift,
-            outdoor_crops_remaining_after_biofuel_before_shift,
-        )
-
-        outdoor_crops_used_for_biofuel = (
-            outdoor_crops_used_for_biofuel_stored_6months
-            + outdoor_crops_used_for_biofuel_before_shift
-        )
-
-        outdoor_crops_remaining_after_biofuel = np.subtract(
-            outdoor_crops.production.kcals,
-            outdoor_crops_used_for_biofuel,
-        )
-
-        return (
-            outdoor_crops_remaining_after_biofuel,
-            remaining_biofuel_needed_from_stored_food,
-            outdoor_crops_used_for_biofuel,
-            methane_scp_used_for_biofuel,
-            cellulosic_sugar_used_for_biofuel,
-        )
+        """
+        Allocates the usage of biofuels or feed each month to the cellulosic sugar,
+        methane scp and outdoor crops available, computing the whole allocation once
+        as arrays (billion kcals each month).
 
-    def calculate_feed_components_without_stored_food(
-        self,
-        include_fat_or_protein,
-        feeds_before_cap_prewaste,
-        max_fraction_feed_consumed_as_cellulosic_sugar,
-        max_fraction_feed_consumed_as_methane_scp,
-        cellulosic_sugar_remaining_after_biofuel,
-        methane_scp_remaining_after_biofuel,
-        outdoor_crops_remaining_after_biofuel,
-    ):
-        assert not include_fat_or_protein, """ERROR: feed calculations are not 
-        working  yet for scenarios including fat or protein"""
+        The outdoor crops of earlier months are stored to meet usage they can't meet
+        in the month it's needed (see subtract_off_usage_iteratively), and whatever
+        is left has to come from stored food.
 
+        Returns a dict of arrays of the amount of each source used, the amount of
+        each source remaining, and whether each month is supply constrained (needing
+        stored food), as well as the usage needed from stored food as a Food.
+        """
         # first, preference seaweed, then cellulosic_sugar, then methane_scp
-        # this is used to reduce these food sources by the amount the feed
+        # this is used to reduce these food sources by the amount the usage
         # is used in each month
         # TODO: MAKE WORK WITH FAT AND PROTEIN
         # TODO: ADD SEAWEED
-        # cell sugar
-
-        cell_sugar_for_feed = (
-            max_fraction_feed_consumed_as_cellulosic_sugar
-            * feeds_before_cap_prewaste.kcals
-        )
 
-        cell_sugar_for_feed_after_limit = np.min(
-            [cell_sugar_for_feed, cellulosic_sugar_remaining_after_biofuel], axis=0
-        )
-
-        cellulosic_sugar_used_for_feed = np.min(
-            [cell_sugar_for_feed_after_limit, feeds_before_cap_prewaste.kcals], axis=0
-        )
-
-        remaining_feed_needed = np.subtract(
-            feeds_before_cap_prewaste.kcals, cellulosic_sugar_used_for_feed
+        # cell sugar
+        cellulosic_sugar_used = np.minimum(
+            np.minimum(
+                max_fraction_from_cellulosic_sugar * usage_kcals,
+                cellulosic_sugar_available,
+            ),
+            usage_kcals,
         )
+        remaining_usage_needed = np.subtract(usage_kcals, cellulosic_sugar_used)
 
         # methanescp
-
-        methane_scp_for_feed = (
-            max_fraction_feed_consumed_as_methane_scp * remaining_feed_needed
-        )
-
-        methane_scp_for_feed_after_limit = np.min(
-            [methane_scp_for_feed, methane_scp_remaining_after_biofuel], axis=0
-        )
-
-        methane_scp_used_for_feed = np.min(
-            [methane_scp_for_feed_after_limit, remaining_feed_needed], axis=0
-        )
-
-        remaining_feed_needed = np.subtract(
-            feeds_before_cap_prewaste.kcals, methane_scp_used_for_feed
+        methane_scp_used = np.minimum(
+            np.minimum(
+                max_fraction_from_methane_scp * remaining_usage_needed,
+                methane_scp_available,
+            ),
+            remaining_usage_needed,
         )
+        remaining_usage_needed = np.subtract(remaining_usage_needed, methane_scp_used)
 
         # outdoor growing
-        outdoor_crops_used_for_feed_before_shift = np.min(
-            [outdoor_crops_remaining_after_biofuel, remaining_feed_needed], axis=0
+        outdoor_crops_used_before_shift = np.minimum(
+            outdoor_crops_available, remaining_usage_needed
         )
 
         # this is the amount of kcals that all the combined sources could not fulfill
         # in each month
-        # TODO: deal with nutrients...
-        remaining_feed_needed_kcals_before_shift = np.subtract(
-            feeds_before_cap_prewaste.kcals,
-            outdoor_crops_used_for_feed_before_shift,
+        remaining_usage_needed_before_shift = np.subtract(
+            remaining_usage_needed, outdoor_crops_used_before_shift
         )
-
-        # now that we have outdoor crops bottomed out in the winter seasons, let's also subtract off some of the outdoor
-        # crops in the high production seasons, if there is any remaining feed needed
-        # (because sometimes theres not enough stored food initial at start of the simulation to make up for all the
-        # lacking food needed for feed)
-
-        # there will be a bit of an offset here: the outdoor crops from months 12+ will be reduced by the amount of
-        # remaining feed needed. So we introduce a 6 month shift,
-        # so that the outdoor crops are moved forward in time by 6 months, and the feed is subtracted off.
-
-        outdoor_crops_remaining_after_feed_and_biofuel_before_shift = (
-            outdoor_crops_remaining_after_biofuel
-            - outdoor_crops_used_for_feed_before_shift
+        outdoor_crops_remaining_before_shift = (
+            outdoor_crops_available - outdoor_crops_used_before_shift
         )
 
-        # THE SHIFT AND SUBTRACT (ALLOWING STORED FOOD FROM OUTDOOR GROWING TO BE USED) IS BELOW
-
+        # THE SHIFT AND SUBTRACT (ALLOWING STORED FOOD FROM OUTDOOR GROWING TO BE USED)
         (
-            outdoor_crops_remaining_after_feed_and_biofuel,
-            remaining_feed_needed_from_stored_food,
-            outdoor_crops_used_for_feed_stored_6months,
+            outdoor_crops_remaining,
+            usage_needed_from_stored_food,
+            outdoor_crops_used_stored,
         ) = self.subtract_off_usage_iteratively(
-            remaining_feed_needed_kcals_before_shift,
-            outdoor_crops_remaining_after_feed_and_biofuel_before_shift,
-        )
-
-        outdoor_crops_used_for_feed = (
-            outdoor_crops_used_for_feed_stored_6months
-            + outdoor_crops_used_for_feed_before_shift
-        )
-
-        # TO NOT DO THE SHIFT (may fail to have enough stored food...:
-
-        # # (
-        # #     outdoor_crops_remaining_after_feed_and_biofuel,
-        # #     remaining_feed_needed_kcals,
-        # #     outdoor_crops_used_for_feed_stored_6months,
-        # # ) = self.subtract_off_feed_from_6mo_previous_outdoor_growing(
-        # #     remaining_feed_needed_kcals_before_shift,
-        # #     outdoor_crops_remaining_after_feed_and_biofuel_before_shift,
-        # # )
-
-        # outdoor_crops_remaining_after_feed_and_biofuel = (
-        #     outdoor_crops_remaining_after_feed_and_biofuel_before_shift
-        # )
-        # remaining_feed_needed_kcals = remaining_feed_needed_kcals_before_shift
+            remaining_usage_needed_before_shift,
+            outdoor_crops_remaining_before_shift,
+        )
+
+        allocation = {
+            "cellulosic_sugar_used": cellulosic_sugar_used,
+            "methane_scp_used": methane_scp_used,
+            "outdoor_crops_used_before_shift": outdoor_crops_used_before_shift,
+            "outdoor_crops_used_stored": outdoor_crops_used_stored,
+            "outdoor_crops_used": outdoor_crops_used_stored
+            + outdoor_crops_used_before_shift,
+            "cellulosic_sugar_remaining": cellulosic_sugar_available
+            - cellulosic_sugar_used,
+            "methane_scp_remaining": methane_scp_available - methane_scp_used,
+            "outdoor_crops_remaining": outdoor_crops_remaining,
+            "needed_from_stored_food": usage_needed_from_stored_food.kcals,
+            "supply_constrained": usage_needed_from_stored_food.kcals > 0,
+        }
 
-        # outdoor_crops_used_for_feed = (
-        #     # outdoor_crops_used_for_feed_stored_6months
-        #     +outdoor_crops_used_for_feed_before_shift
-        # )
-
-        # remaining_feed_needed_from_stored_food = Food(
-        #     kcals=np.array(remaining_feed_needed_kcals),
-        #     fat=np.zeros(len(remaining_feed_needed_kcals)),
-        #     protein=np.zeros(len(remaining_feed_needed_kcals)),
-        #     kcals_units="billion kcals each month",
-        #     fat_units="thousand tons each month",
-        #     protein_units="thousand tons each month",
-        # )
-
-        return (
-            outdoor_crops_remaining_after_feed_and_biofuel,
-            remaining_feed_needed_from_stored_food,
-            outdoor_crops_used_for_feed,
-            methane_scp_used_for_feed,
-            cellulosic_sugar_used_for_feed,
-        )
+        return allocation, usage_needed_from_stored_food
 
     def subtract_off_usage_iteratively(
         self,
@@ -1019,23 +869,54 @@ class Parameters:
         outdoor_crops_remaining,
         max_shift=12,
     ):
+        """
+        Now that we have outdoor crops bottomed out in the winter seasons, let's also
+        subtract off some of the outdoor crops in the high production seasons, if there
+        is any remaining usage needed (because sometimes theres not enough stored food
+        initial at start of the simulation to make up for all the lacking food needed
+        for usage).
+
+        The outdoor crops of each month are stored to meet the usage of the following
+        months, first the usage 1 month later, then 2 months later, and so on up to
+        max_shift - 1 months later. Each shift only reads and writes slices of the
+        arrays in place, and the shifts stop once no usage is left to meet, so long
+        shifts cost little more than short ones.
+        """
+        # copies, so the arrays passed in aren't changed
+        remaining_usage_needed_kcals = np.array(
+            remaining_usage_needed_kcals, dtype=float
+        )
+        outdoor_crops_remaining = np.array(outdoor_crops_remaining, dtype=float)
+
         total_calories_init = np.sum(outdoor_crops_remaining) - np.sum(
             remaining_usage_needed_kcals
         )
 
         total_outdoor_crops_used = np.zeros_like(remaining_usage_needed_kcals)
-
-        for shift in range(1, max_shift):
-            (
-                outdoor_crops_remaining,
-                remaining_usage_needed_kcals,
-                outdoor_crops_used_for_this_shift,
-            ) = self.subtract_off_usage_by_storing_outdoor_growing(
-                remaining_usage_needed_kcals,
-                outdoor_crops_remaining,
-                shift,
+        outdoor_crops_used_for_this_shift = np.empty_like(remaining_usage_needed_kcals)
+
+        NMONTHS = len(remaining_usage_needed_kcals)
+        for shift in range(1, min(max_shift, NMONTHS)):
+            # the usage each month which could be met by the crops grown shift months
+            # before (there are no crops from before the first month)
+            usage_needed_later = remaining_usage_needed_kcals[shift:]
+            if not np.any(usage_needed_later > 0):
+                break
+            crops_which_can_be_used_later = outdoor_crops_remaining[:-shift]
+
+            # get the amount which could be used for usage. Only use the amount that
+            # is needed, but not more than can be supplied.
+            used = np.minimum(
+                crops_which_can_be_used_later,
+                usage_needed_later,
+                out=outdoor_crops_used_for_this_shift[:-shift],
             )
-            total_outdoor_crops_used += outdoor_crops_used_for_this_shift
+
+            # the remaining usage needed is reduced for the months they are used, and
+            # the outdoor crops for the months they are grown (shift months before)
+            usage_needed_later -= used
+            crops_which_can_be_used_later -= used
+            total_outdoor_crops_used[:-shift] += used
 
         total_calories_final = np.sum(outdoor_crops_remaining) - np.sum(
             remaining_usage_needed_kcals
@@ -1058,69 +939,6 @@ class Parameters:
             total_outdoor_crops_used,
         )
 
-    def subtract_off_usage_by_storing_outdoor_growing(
-        self,
-        remaining_usage_needed_kcals_before_shift,
-        outdoor_crops_remaining_before_shift,
-        MONTH_SHIFT,
-    ):
-        # now that we have outdoor crops bottomed out in the winter seasons, let's also subtract off some of the
-        # outdoor crops in the high production seasons, if there is any remaining usage needed
-        # (because sometimes theres not enough stored food initial at start of the simulation to make up for all the
-        # lacking food needed for usage)
-
-        # there will be a bit of an offset here: the outdoor crops from months 12+ will be reduced by the amount of
-        # remaining usage needed. So we introduce a 6 month shift, so that the outdoor
-        # crops are moved forward in time by 6 months, and the usage is subtracted off.
-
-        # mask off stored food we don't want to use to zero (if available food at a given month is zero, it won't
-        # be used)
-        masked_remaining_food = np.concatenate(
-            [
-                outdoor_crops_remaining_before_shift[:-MONTH_SHIFT],
-                np.zeros(MONTH_SHIFT),
-            ]
-        )
-
-        # move the available food 6 months into the future
-        outdoor_crops_which_can_be_used_later = np.roll(
-            masked_remaining_food, MONTH_SHIFT
-        )
-
-        assert len(masked_remaining_food) == len(outdoor_crops_which_can_be_used_later)
-
-        # get the amount which could be used for usage. Only use the amount that is needed, but not more than can
-        # be supplied.
-        outdoor_crops_used_for_usage_stored_shifted = np.min(
-            [
-                outdoor_crops_which_can_be_used_later,
-                remaining_usage_needed_kcals_before_shift,
-            ],
-            axis=0,
-        )
-
-        # the remaining usage needed is reduced for the months they are used (6 months after production)
-        remaining_usage_needed_kcals = np.subtract(
-            remaining_usage_needed_kcals_before_shift,
-            outdoor_crops_used_for_usage_stored_shifted,
-        )
-
-        # the amount of outdoor crops used is applied 6 months prior. Because first 12 months were masked out,this
-        # can't subtract from food at the end of the period
-        outdoor_crops_used_for_usage_stored_shifted = np.roll(
-            outdoor_crops_used_for_usage_stored_shifted, -MONTH_SHIFT
-        )
-        outdoor_crops_remaining = (
-            outdoor_crops_remaining_before_shift
-            - outdoor_crops_used_for_usage_stored_shifted
-        )
-
-        return (
-            outdoor_crops_remaining,
-            remaining_usage_needed_kcals,
-            outdoor_crops_used_for_usage_stored_shifted,
-        )
-
     def init_meat_and_dairy_and_feed_from_breeding(
         self,
         constants_inputs,
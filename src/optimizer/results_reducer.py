@@ -0,0 +1,157 @@
+"""
+############################## Results Reducer ################################
+##                                                                            #
+##       Folds the results of each country into running world totals as       #
+##       soon as the country has run, so the results of every country         #
+##       don't need to be kept in memory until the end of the run             #
+##                                                                            #
+###############################################################################
+
+The reducer keeps the foods of all the countries summed so far (in billion kcals,
+thousand tons fat and thousand tons protein, with and without capping each country at
+100 percent fed), the population and population fed, and the lowest percent fed of any
+country in each month. So memory stays the same however many countries are run.
+
+    >>> reducer = ResultsReducer()
+    >>> scenario_runner.run_model_no_trade(..., results_reducer=reducer)
+    >>> global_results = reducer.get_world_results(cap_at_100_percent=False)
+
+The world results are the same as Interpreter.sum_many_results_together of all the
+countries' results. If a spill_directory is given, the full results of each country
+are also saved there (see Interpreter.save_results), and can be reopened with
+load_spilled_results.
+"""
+from pathlib import Path
+
+import numpy as np
+
+from src.optimizer.interpret_results import Interpreter
+
+
+class ResultsReducer:
+    """
+    Sums the interpreted results of each country into world totals, one at a time
+    """
+
+    # the values stacked by Interpreter.stack_many_results which must be the same for
+    # every result
+    OPTIONS = ["include_fat", "include_protein", "time_months_middle", "constants"]
+
+    def __init__(self, spill_directory=None, spill_dtype=np.float64):
+        """
+        If spill_directory is given, the full results of each country are saved there
+        as they are added, in float64 or float32 depending on spill_dtype.
+        """
+        self.spill_directory = spill_directory
+        if spill_directory is not None:
+            self.spill_directory = Path(spill_directory)
+            self.spill_directory.mkdir(parents=True, exist_ok=True)
+        self.spill_dtype = spill_dtype
+        self.spilled_paths = {}
+
+        self.names = []
+        # the options of the first result, which the others are checked against
+        self.options = None
+
+        # (foods, 3, NMONTHS) sums of the foods, in the order of
+        # Interpreter.SUMMED_FOODS
+        self.billion_kcals_sum = None
+        self.billion_kcals_capped_sum = None
+
+        self.population = 0
+        self.population_fed = 0
+
+        # (3, NMONTHS) lowest percent of kcals, fat and protein needs met of any
+        # result in each month, and the name of that result
+        self.min_percent_fed = None
+        self.min_percent_fed_names = None
+
+    def add_results(self, name, interpreted_results):
+        """
+        Adds the interpreted results of one country (or any other population) to the
+        running totals, and spills them to disk if there is a spill_directory. The
+        reducer doesn't keep any reference to interpreted_results.
+        """
+        assert name not in self.names, "ERROR: " + name + " was already added"
+
+        stacked = Interpreter.stack_many_results({name: interpreted_results})
+        options = {option: stacked[option] for option in self.OPTIONS}
+        if self.options is None:
+            self.options = options
+        for option, value in options.items():
+            assert value == self.options[option], (
+                "ERROR: can't sum results with different " + option
+            )
+
+        billion_kcals = Interpreter.get_stacked_billion_kcals(stacked, False)[0]
+        billion_kcals_capped = Interpreter.get_stacked_billion_kcals(stacked, True)[0]
+
+        percent_fed = np.array(
+            [
+                interpreted_results.kcals_fed,
+                interpreted_results.fat_fed,
+                interpreted_results.protein_fed,
+            ],
+            dtype=float,
+        )
+
+        if self.billion_kcals_sum is None:
+            self.billion_kcals_sum = billion_kcals
+            self.billion_kcals_capped_sum = billion_kcals_capped
+            self.min_percent_fed = percent_fed
+            self.min_percent_fed_names = np.full(percent_fed.shape, name, dtype=object)
+        else:
+            self.billion_kcals_sum = self.billion_kcals_sum + billion_kcals
+            self.billion_kcals_capped_sum = (
+                self.billion_kcals_capped_sum + billion_kcals_capped
+            )
+            lower = percent_fed < self.min_percent_fed
+            self.min_percent_fed = np.where(lower, percent_fed, self.min_percent_fed)
+            self.min_percent_fed_names[lower] = name
+
+        population = stacked["population"][0]
+        capped_ratio = min(stacked["percent_people_fed"][0], 100) / 100
+        self.population += population
+        self.population_fed += capped_ratio * population
+
+        if self.spill_directory is not None:
+            path = self.spill_directory / (name + ".npz")
+            interpreted_results.save_results(path, self.spill_dtype)
+            self.spilled_paths[name] = path
+
+        self.names.append(name)
+
+    def get_world_results(self, cap_at_100_percent):
+        """
+        Returns the interpreter with the sum of all the results added, as percent of
+        the total population fed (see Interpreter.sum_many_results_together)
+        """
+        assert self.options is not None, "ERROR: no results have been added"
+
+        if cap_at_100_percent:
+            billion_kcals_sum = self.billion_kcals_capped_sum
+        else:
+            billion_kcals_sum = self.billion_kcals_sum
+        return Interpreter.create_summed_results(
+            billion_kcals_sum, self.population, self.options
+        )
+
+    def get_fraction_fed(self):
+        """
+        Returns the fraction of the total population fed, where each result feeds at
+        most all of its own population
+        """
+        if self.population == 0:
+            return np.nan
+        return self.population_fed / self.population
+
+    def load_spilled_results(self, memory_map=True):
+        """
+        Loads the full results spilled to disk, keyed by name. By default, they are
+        memory mapped, so only the values which are used are read.
+        """
+        assert self.spill_directory is not None, "ERROR: no spill_directory was given"
+        return {
+            name: Interpreter.load_results(path, memory_map)
+            for name, path in self.spilled_paths.items()
+        }
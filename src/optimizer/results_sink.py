@@ -0,0 +1,183 @@
+"""
+############################### Results Sink ##################################
+##                                                                            #
+##       Appends the kcals equivalent of each food source, for every          #
+##       scenario run, to a single columnar results file                      #
+##                                                                            #
+###############################################################################
+
+Each run adds one row per month, keyed by a hash of the scenario description and the
+country code, with a column for each food source (see
+Interpreter.get_kcals_equivalent_streams). Rows are kept in memory and written in
+batches, so a sweep over many countries and scenarios produces one file rather than
+one small file per run.
+
+    >>> sink = ResultsSink("results/no_trade.parquet")
+    >>> scenario_runner = ScenarioRunnerNoTrade(results_sink=sink)
+    >>> ...
+    >>> sink.close()
+
+The ScenarioRunner only flushes the sink, so whoever creates the sink must close it
+(or use it as a context manager).
+
+Parquet (.parquet) and Arrow IPC (.arrow or .feather) files need pyarrow, HDF5 (.h5)
+files need pytables, and csv (.csv) files need nothing beyond pandas. To run without
+writing any results, don't pass a sink to the ScenarioRunner.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class ResultsSink:
+    """
+    Buffers the kcals equivalent streams of each run, and appends them to one file
+    """
+
+    # the file format used for each file extension
+    FORMATS = {
+        ".parquet": "parquet",
+        ".arrow": "arrow",
+        ".feather": "arrow",
+        ".h5": "hdf5",
+        ".hdf5": "hdf5",
+        ".csv": "csv",
+    }
+
+    def __init__(self, path, file_format=None, batch_size=100):
+        """
+        path is the results file, and file_format is one of "parquet", "arrow",
+        "hdf5" or "csv" (by default, it is chosen from the extension of path).
+        The buffered runs are written whenever batch_size runs have been added.
+
+        Parquet and Arrow files are written for the lifetime of the sink, so the sink
+        must be closed for them to be readable. HDF5 and csv files are appended to, so
+        results from several sinks (or several sweeps) can share one file.
+        """
+        self.path = Path(path)
+        if file_format is None:
+            assert self.path.suffix in self.FORMATS, (
+                "ERROR: can't tell the results file format from "
+                + str(self.path)
+                + ", set file_format to one of "
+                + ", ".join(sorted(set(self.FORMATS.values())))
+            )
+            file_format = self.FORMATS[self.path.suffix]
+        assert file_format in self.FORMATS.values(), (
+            "ERROR: unknown results file format " + str(file_format)
+        )
+        if file_format in ["parquet", "arrow"]:
+            assert pyarrow is not None, (
+                "ERROR: pyarrow must be installed to write " + file_format + " files"
+            )
+
+        self.file_format = file_format
+        self.batch_size = batch_size
+
+        self.buffered_runs = []
+        self.n_runs_written = 0
+        # the open parquet or arrow writer, created with the first batch
+        self.writer = None
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_results(self, interpreted_results, scenario_description, country_code):
+        """
+        Buffers the kcals equivalent streams of one run, keyed by the hash of the
+        scenario description (see Scenarios) and by the country code
+        """
+        assert not self.closed, (
+            "ERROR: can't add results to the closed results file " + str(self.path)
+        )
+        streams = interpreted_results.get_kcals_equivalent_streams()
+        n_months = len(next(iter(streams.values())))
+
+        run = {
+            "scenario_hash": np.full(
+                n_months, ResultsSink.get_scenario_hash(scenario_description)
+            ),
+            "country": np.full(n_months, country_code),
+            "month": np.arange(n_months),
+        }
+        run.update(streams)
+        self.buffered_runs.append(run)
+
+        if len(self.buffered_runs) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered runs to the results file as one batch. HDF5 and csv
+        files are complete after a flush, but Parquet and Arrow files are only
+        readable once the sink is closed.
+        """
+        if len(self.buffered_runs) == 0:
+            return
+
+        columns = {
+            column: np.concatenate([run[column] for run in self.buffered_runs])
+            for column in self.buffered_runs[0]
+        }
+        df = pd.DataFrame(columns)
+
+        if self.file_format == "parquet":
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        elif self.file_format == "arrow":
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pyarrow.ipc.new_file(str(self.path), table.schema)
+            self.writer.write_table(table)
+        elif self.file_format == "hdf5":
+            df.to_hdf(
+                self.path,
+                key="results",
+                format="table",
+                append=True,
+                min_itemsize={"scenario_hash": 16, "country": 8},
+            )
+        else:
+            df.to_csv(
+                self.path, mode="a", index=False, header=not os.path.exists(self.path)
+            )
+
+        self.n_runs_written += len(self.buffered_runs)
+        self.buffered_runs = []
+
+    def close(self):
+        """
+        Writes any buffered runs and closes the results file. Closing twice does
+        nothing, but no more results can be added once it is closed, as reopening a
+        Parquet or Arrow file would overwrite it.
+        """
+        if self.closed:
+            return
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        self.closed = True
+
+    def get_scenario_hash(scenario_description):
+        """
+        Returns a short hash of the description of the scenario's options, which is
+        the same for every country run with those options
+        """
+        return hashlib.sha1(scenario_description.encode()).hexdigest()[:16]
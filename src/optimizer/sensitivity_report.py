@@ -0,0 +1,269 @@
+"""
+############################# Sensitivity Report ##############################
+##                                                                            #
+##       The duals of the constraints and the reduced costs of the            #
+##       variables from the optimizer's solve, as an array for each family    #
+##                                                                            #
+###############################################################################
+
+The duals and reduced costs are the change in the objective (the least percent people
+fed in any month) for a unit change in the right hand side of a constraint, or in the
+bound of a variable which is at its bound. They are read after the first solve, which
+maximizes the least people fed, rather than after the second solve which smooths the
+food eaten over time.
+
+For example, the months where kcals limit the people fed are
+
+    >>> report.get_binding_months("Kcals_Fed_Month_#_Objective_Constraint")
+
+and the percent people fed gained for each extra billion kcals of stored food is
+
+    >>> report.get_marginal_value("stored_food")
+"""
+import re
+
+import numpy as np
+
+
+class SensitivityReport:
+    """
+    Reads the duals and reduced costs of a solved model into an array for each family
+    of constraints or variables (such as "Stored_Food_Start_Month_#_Constraint"), with
+    the value of each month, or nan in months where the family has no constraint or
+    variable.
+    """
+
+    # the month is the number between underscores, or at the end of the name
+    MONTH_PATTERN = re.compile(r"_(\d+)(?=_|$)")
+
+    # the constraint family (and its month) whose right hand side is the initial
+    # amount of each resource, and the variable families whose upper bound is the
+    # initial amount in every month. All of them are relaxed together by an extra
+    # unit of the resource.
+    MARGINAL_VALUES = {
+        "stored_food": (
+            "Stored_Food_Start_Month_#_Constraint",
+            0,
+            [
+                "Stored_Food_Start_Month_#_Variable",
+                "Stored_Food_End_Month_#_Variable",
+                "Stored_Food_Eaten_During_Month_#_Variable",
+            ],
+        ),
+        "culled_meat": (
+            "Culled_Meat_Start_Month_#_Constraint",
+            0,
+            [
+                "Culled_Meat_Start_Month_#_Variable",
+                "Culled_Meat_End_Month_#_Variable",
+            ],
+        ),
+    }
+
+    def __init__(self, model, n_months, maximum_seaweed_density=None):
+        """
+        model is a solved PuLP model, and n_months is the number of months modeled.
+        Constraints and variables without a month in their name (such as the
+        objective) are kept by name in other_duals and other_reduced_costs.
+
+        maximum_seaweed_density is the seaweed on the farm per unit of used area,
+        which is needed for the marginal value of the seaweed area (see
+        get_seaweed_area_marginal_values).
+        """
+        self.n_months = n_months
+        self.maximum_seaweed_density = maximum_seaweed_density
+
+        self.duals = {}
+        self.slacks = {}
+        self.other_duals = {}
+        for name, constraint in model.constraints.items():
+            family, month = SensitivityReport.get_family_and_month(name)
+            if month is None:
+                self.other_duals[name] = SensitivityReport.as_float(constraint.pi)
+                continue
+            self.add_value(self.duals, family, month, constraint.pi)
+            self.add_value(self.slacks, family, month, constraint.slack)
+
+        self.reduced_costs = {}
+        self.upper_bound_reduced_costs = {}
+        # 1 in the months where the variable's lower and upper bounds are equal
+        self.fixed_variables = {}
+        self.other_reduced_costs = {}
+        for variable in model.variables():
+            family, month = SensitivityReport.get_family_and_month(variable.name)
+            if month is None:
+                self.other_reduced_costs[variable.name] = SensitivityReport.as_float(
+                    variable.dj
+                )
+                continue
+            self.add_value(self.reduced_costs, family, month, variable.dj)
+            self.add_value(
+                self.upper_bound_reduced_costs,
+                family,
+                month,
+                SensitivityReport.get_upper_bound_reduced_cost(variable),
+            )
+            self.add_value(
+                self.fixed_variables,
+                family,
+                month,
+                SensitivityReport.is_fixed(variable),
+            )
+
+        for values in [
+            self.duals,
+            self.slacks,
+            self.reduced_costs,
+            self.upper_bound_reduced_costs,
+            self.fixed_variables,
+        ]:
+            for array in values.values():
+                array.setflags(write=False)
+
+    def get_family_and_month(name):
+        """
+        Returns the family of a constraint or variable name (the name with each number
+        replaced by "#") and its month, or None if the name has no month
+        """
+        family = re.sub(r"\d+", "#", name)
+        match = SensitivityReport.MONTH_PATTERN.search(name)
+        if match is None:
+            return family, None
+        return family, int(match.group(1))
+
+    def get_upper_bound_reduced_cost(variable):
+        """
+        Returns the reduced cost of the variable if it is held at its upper bound, so
+        raising the bound would change the objective, or 0 otherwise. A variable
+        whose bounds are equal is only held by its upper bound if the reduced cost is
+        positive.
+        """
+        reduced_cost = SensitivityReport.as_float(variable.dj)
+        if (
+            variable.upBound is None
+            or variable.varValue is None
+            or not np.isclose(variable.varValue, variable.upBound)
+        ):
+            return 0
+        if SensitivityReport.is_fixed(variable):
+            return max(reduced_cost, 0)
+        return reduced_cost
+
+    def is_fixed(variable):
+        """
+        Returns whether the lower and upper bounds of the variable are equal
+        """
+        return (
+            variable.lowBound is not None
+            and variable.upBound is not None
+            and np.isclose(variable.lowBound, variable.upBound)
+        )
+
+    def as_float(value):
+        """
+        Returns value as a float, or nan if the solver didn't report it
+        """
+        return np.nan if value is None else float(value)
+
+    def add_value(self, values, family, month, value):
+        """
+        Sets the value of the family in month, creating the family's array of nan
+        the first time it is seen
+        """
+        if family not in values:
+            values[family] = np.full(self.n_months, np.nan)
+        values[family][month] = SensitivityReport.as_float(value)
+
+    def get_duals(self, family):
+        """
+        Returns the dual of the constraint family each month
+        """
+        assert family in self.duals, "ERROR: no constraints in the family " + family
+        return self.duals[family]
+
+    def get_reduced_costs(self, family):
+        """
+        Returns the reduced cost of the variable family each month
+        """
+        assert family in self.reduced_costs, (
+            "ERROR: no variables in the family " + family
+        )
+        return self.reduced_costs[family]
+
+    def get_binding_months(self, family, tolerance=1e-9):
+        """
+        Returns the months where the constraint family binds, meaning that relaxing it
+        would change the least people fed
+        """
+        return np.flatnonzero(np.abs(np.nan_to_num(self.get_duals(family))) > tolerance)
+
+    def get_binding_families(self, tolerance=1e-9):
+        """
+        Returns a dictionary of the months each constraint family binds, for the
+        families which bind in any month
+        """
+        binding_families = {}
+        for family in self.duals:
+            months = self.get_binding_months(family, tolerance)
+            if len(months) > 0:
+                binding_families[family] = months
+        return binding_families
+
+    def get_marginal_value(self, resource):
+        """
+        Returns the percent people fed gained for each extra unit of a resource in
+        MARGINAL_VALUES (billion kcals of stored food or culled meat), or 0 if the
+        resource wasn't modeled. This is the dual of the constraint setting the
+        initial amount, plus the reduced costs of every variable held at its upper
+        bound of the initial amount.
+
+        If there is none of the resource, the variables are all fixed at 0, and each
+        can have the value of the extra unit as its reduced cost although the unit
+        can only be used once. So only the largest reduced cost of the fixed
+        variables is added.
+        """
+        constraint_family, month, variable_families = self.MARGINAL_VALUES[resource]
+        if constraint_family not in self.duals:
+            return 0
+        marginal_value = self.duals[constraint_family][month]
+        largest_fixed_reduced_cost = 0
+        for variable_family in variable_families:
+            if variable_family not in self.upper_bound_reduced_costs:
+                continue
+            reduced_costs = self.upper_bound_reduced_costs[variable_family]
+            fixed = self.fixed_variables[variable_family] == 1
+            marginal_value += np.nansum(reduced_costs[~fixed])
+            if np.any(fixed):
+                largest_fixed_reduced_cost = max(
+                    largest_fixed_reduced_cost, np.max(reduced_costs[fixed])
+                )
+        return marginal_value + largest_fixed_reduced_cost
+
+    def get_seaweed_area_marginal_values(self):
+        """
+        Returns the percent people fed gained for each extra unit of area built for
+        seaweed each month, or zeros if seaweed wasn't modeled. The built area is the
+        upper bound of the used area, and times the maximum density it is the upper
+        bound of the seaweed on the farm, so both reduced costs are added.
+
+        The value is nan in month 0, where the used area is set to the initial built
+        area, and in months where either variable's bounds are equal, as both bounds
+        hold the variable and the solve doesn't tell which one has the value.
+        """
+        if "Used_Area_#_Variable" not in self.reduced_costs:
+            return np.zeros(self.n_months)
+        assert (
+            self.maximum_seaweed_density is not None
+        ), "ERROR: maximum_seaweed_density is needed for the seaweed area"
+        used_area = "Used_Area_#_Variable"
+        seaweed = "Seaweed_Wet_On_Farm_#_Variable"
+        marginal_values = (
+            self.upper_bound_reduced_costs[used_area]
+            + self.maximum_seaweed_density * self.upper_bound_reduced_costs[seaweed]
+        )
+        fixed = (self.fixed_variables[used_area] == 1) | (
+            self.fixed_variables[seaweed] == 1
+        )
+        marginal_values[fixed] = np.nan
+        marginal_values[0] = np.nan
+        return marginal_values
@@ -0,0 +1,66 @@
+"""
+################################# Solution ####################################
+##                                                                            #
+##       The values of all the optimizer variables as one numpy array,        #
+##       so results can be read for all the months at once                   #
+##                                                                            #
+###############################################################################
+"""
+import numpy as np
+
+
+class Solution:
+    """
+    Reads the values of all the variables of a solved model into one flat array, with
+    a slice of the array for each variable family (such as "stored_food_eaten"), so
+    each family's monthly values are read without a python loop over the months.
+    """
+
+    def __init__(self, variables, sensitivity_report=None):
+        """
+        variables is the dictionary of variables made by the optimizer. Each family is
+        a list with an LpVariable for each month, or with 0 for each month if the
+        family wasn't modeled. Other entries (such as the objective function) are
+        ignored.
+
+        sensitivity_report is the SensitivityReport of the solve, if it was collected.
+        """
+        self.sensitivity_report = sensitivity_report
+        self.slices = {}
+        self.n_months = {}
+        modeled_variables = []
+
+        for family, family_variables in variables.items():
+            if not isinstance(family_variables, list):
+                continue
+
+            self.n_months[family] = len(family_variables)
+            modeled = [not isinstance(v, int) for v in family_variables]
+            if not any(modeled):
+                continue
+            assert all(modeled), (
+                "ERROR: " + family + " was only modeled for some of the months"
+            )
+
+            start = len(modeled_variables)
+            modeled_variables.extend(family_variables)
+            self.slices[family] = slice(start, len(modeled_variables))
+
+        # the only loop over the variables, reading each value once
+        self.values = np.array([v.varValue for v in modeled_variables], dtype=float)
+
+    def is_modeled(self, family):
+        """
+        Returns whether the family was modeled by the optimizer
+        """
+        return family in self.slices
+
+    def get_monthly_values(self, family, conversion=1):
+        """
+        Returns the value of the family each month multiplied by conversion, or zeros
+        if the family wasn't modeled
+        """
+        if not self.is_modeled(family):
+            return np.zeros(self.n_months[family])
+
+        return self.values[self.slices[family]] * conversion
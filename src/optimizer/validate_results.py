@@ -7,14 +7,74 @@
 ##                                                                            #
 ###############################################################################
 """
+import re
+
 import numpy as np
 
 
 class Validator:
-    def __init__(self):
-        pass
+    # the levels of validation of the interpreted results of each run:
+    #   "cheap": only the vectorized checks of all the foods at once
+    #   "sampled": the cheap checks, and the full checks for a random sample of runs
+    #   "exhaustive": the cheap and the full checks for every run (used by the tests)
+    VALIDATION_LEVELS = ["cheap", "sampled", "exhaustive"]
+
+    # the foods of the interpreted results which are checked to never be nan
+    RESULT_FOODS = [
+        "stored_food",
+        "outdoor_crops",
+        "seaweed",
+        "cell_sugar",
+        "scp",
+        "greenhouse",
+        "fish",
+        "culled_meat_plus_grazing_cattle_maintained",
+        "grazing_milk",
+        "grain_fed_meat",
+        "grain_fed_milk",
+        "immediate_outdoor_crops",
+        "new_stored_outdoor_crops",
+    ]
+
+    # the foods which are checked to never be negative (all but the first three)
+    NONNEGATIVE_FOODS = RESULT_FOODS[3:]
+
+    def __init__(self, validation_level="exhaustive", sample_fraction=0.1, seed=None):
+        """
+        validation_level is one of VALIDATION_LEVELS. For the "sampled" level,
+        sample_fraction is the fraction of runs (such as the countries of a
+        scenario) which get the full checks, chosen at random with the given seed.
+
+        The same validator can be used for many runs, so the fraction of runs fully
+        checked holds over the whole batch.
+        """
+        assert validation_level in self.VALIDATION_LEVELS, (
+            "ERROR: validation_level must be one of "
+            + ", ".join(self.VALIDATION_LEVELS)
+        )
+        assert 0 <= sample_fraction <= 1, "ERROR: sample_fraction must be in [0, 1]"
+
+        self.validation_level = validation_level
+        self.sample_fraction = sample_fraction
+        self.random_generator = np.random.default_rng(seed)
+
+        # the number of runs validated, and how many of those were fully checked
+        self.n_runs_validated = 0
+        self.n_runs_fully_validated = 0
 
     def validate_results(self, model, extracted_results, interpreted_results):
+        """
+        runs the cheap checks of the interpreted results, and the full checks if
+        the validation level calls for them on this run
+        """
+        self.ensure_cheap_invariants(interpreted_results)
+        self.n_runs_validated += 1
+
+        if not self.should_run_full_checks():
+            return
+
+        self.n_runs_fully_validated += 1
+
         self.ensure_optimizer_returns_same_as_sum_nutrients(
             model,
             interpreted_results,
@@ -26,83 +86,153 @@ class Validator:
         self.ensure_never_nan(interpreted_results)
         self.ensure_all_greater_than_or_equal_to_zero(interpreted_results)
 
+    def should_run_full_checks(self):
+        """
+        returns whether the full checks are run on the next run
+        """
+        if self.validation_level == "exhaustive":
+            return True
+        if self.validation_level == "cheap":
+            return False
+        return self.random_generator.random() < self.sample_fraction
+
+    def ensure_cheap_invariants(self, interpreted_results):
+        """
+        checks all the foods of the results at once, as one array, that they are
+        never nan, and that their kcals (and fat and protein, if included) are
+        never negative beyond the rounding the full checks allow
+        """
+        nutrients = np.array(
+            [
+                getattr(interpreted_results, food).as_numpy_array()
+                for food in self.RESULT_FOODS
+            ],
+            dtype=float,
+        )
+        assert not np.isnan(nutrients).any(), (
+            "ERROR: nan in the results for "
+            + ", ".join(
+                np.array(self.RESULT_FOODS)[np.isnan(nutrients).any(axis=(1, 2))]
+            )
+        )
+
+        included = [
+            True,
+            interpreted_results.include_fat,
+            interpreted_results.include_protein,
+        ]
+        nonnegative = nutrients[-len(self.NONNEGATIVE_FOODS) :][:, included]
+        # the full checks round some of the foods to 6 decimals first
+        negative = (nonnegative < -0.5e-6).any(axis=(1, 2))
+        assert not negative.any(), (
+            "ERROR: negative results for "
+            + ", ".join(np.array(self.NONNEGATIVE_FOODS)[negative])
+        )
+
     def check_constraints_satisfied(self, model, maximize_constraints, variables):
         """
         passing in the variables explicitly to the constraint checker here
         ensures that the final values that are used in reports are explicitly
         validated against all the constraints.
 
-        NOTE: THIS FUNCTION TAKES A REALLY, REALLY LONG TIME SO IT'S RUN INFREQUENTLY
+        The residuals A*x - b of all the constraints are computed at once from the
+        coefficients of the model, and every constraint must be satisfied to within
+        1 (in the units of the constraint). The constraints used to find the
+        maximum of the objective are not checked.
+
+        returns: the largest violation of each family of constraints (the
+        constraint name, with the month numbers replaced by "#")
         """
+        names, violations = self.get_constraint_violations(
+            model, maximize_constraints, variables
+        )
+        max_violations = self.get_max_violation_per_family(names, violations)
+
         SHOW_CONSTRAINT_CHECK = False
-        constraints_dict = {}
-        for c in variables:
-            if SHOW_CONSTRAINT_CHECK:
-                print(c)
-            if isinstance(c, list):
-                print("list")
-                continue
-            if c.name in maximize_constraints:
+        if SHOW_CONSTRAINT_CHECK:
+            for family, max_violation in max_violations.items():
+                print("biggest violation of " + family + ": " + str(max_violation))
+
+        if len(violations) > 0:
+            worst = np.argmax(violations)
+            assert violations[worst] < 1, (
+                "ERROR: constraint "
+                + names[worst]
+                + " is not satisfied, by "
+                + str(violations[worst])
+                + "\n"
+                + str(model.constraints[names[worst]])
+            )
+
+        return max_violations
+
+    def get_constraint_violations(self, model, maximize_constraints, variables):
+        """
+        Computes how much each constraint of the model is violated by the values of
+        the variables (zero where it is satisfied).
+
+        The coefficients of all the constraints are gathered into one sparse matrix
+        A (as rows, columns and coefficients), so the residuals A*x - b are computed
+        with a single numpy sum rather than evaluating each constraint.
+
+        returns: the names of the constraints, and the violation of each
+        """
+        variable_index = {}
+        values = []
+        for variable in variables:
+            if isinstance(variable, list):
                 continue
-            constraints_dict[c.name] = c.varValue
-        differences = []
-        constraintlist = list(model.constraints.items())
-        for constraint in constraintlist:
-            if constraint[0] in maximize_constraints:
-                differences.append(0)
+            variable_index[variable.name] = len(values)
+            values.append(variable.varValue)
+        values = np.array(values, dtype=float)
+
+        skipped = set(maximize_constraints)
+        names = []
+        senses = []
+        constants = []
+        rows = []
+        columns = []
+        coefficients = []
+        for name, constraint in model.constraints.items():
+            if name in skipped:
                 continue
-            compare_type = 0
-
-            splitted = str(constraint[1]).split(" = ")
-            if len(splitted) < 2:
-                compare_type = 1
-                splitted = str(constraint[1]).split(" <= ")
-                if len(splitted) < 2:
-                    compare_type = 2
-                    splitted = str(constraint[1]).split(" >= ")
-                    if len(splitted) < 2:
-                        print("Error! Assignment is not ==, <=, or >=")
-                        quit()
-                # splitted=str(constraint[1]).split(' >= ')
-            variable_string = splitted[0]
-            equation_string = splitted[1]
-
-            for var in model.variables():
-                equation_string = equation_string.replace(
-                    var.name, str(constraints_dict[var.name])
-                )
-                variable_string = variable_string.replace(
-                    var.name, str(constraints_dict[var.name])
-                )
-            eq_val = eval(equation_string)
-            var_val = eval(variable_string)
-
-            if SHOW_CONSTRAINT_CHECK:
-                print(
-                    "checking constraint "
-                    + str(constraint[0])
-                    + " has "
-                    + str(constraint[1])
-                )
-            if compare_type == 0:
-                if SHOW_CONSTRAINT_CHECK:
-                    print("difference" + str(abs(eq_val - var_val)))
-
-                assert abs(eq_val - var_val) < 1
-                differences.append(abs(eq_val - var_val))
-            if compare_type == 1:
-                assert var_val - eq_val <= 1
-                differences.append(var_val - eq_val)
-            if compare_type == 2:
-                assert eq_val - var_val <= 1
-                differences.append(eq_val - var_val)
-
-        print("all constraints satisfied")
-        m = max(differences)
-        print("biggest difference:" + str(m))
-        max_index = np.where(np.array(differences) == m)[0][0]
-        print("for constraint:")
-        print(constraintlist[max_index])
+            row = len(names)
+            names.append(name)
+            senses.append(constraint.sense)
+            constants.append(constraint.constant)
+            for variable, coefficient in constraint.items():
+                rows.append(row)
+                columns.append(variable_index[variable.name])
+                coefficients.append(coefficient)
+
+        # each constraint is (terms + constant) compared to zero
+        residuals = np.bincount(
+            np.array(rows, dtype=int),
+            weights=np.array(coefficients, dtype=float)
+            * values[np.array(columns, dtype=int)],
+            minlength=len(names),
+        ) + np.array(constants, dtype=float)
+
+        # sense is 0 for ==, -1 for <= and 1 for >=
+        senses = np.array(senses)
+        violations = np.where(senses == 0, np.abs(residuals), -senses * residuals)
+
+        return names, np.maximum(violations, 0)
+
+    def get_max_violation_per_family(self, names, violations):
+        """
+        returns the largest violation of each family of constraints, where the
+        family is the constraint name with the month numbers replaced by "#"
+        """
+        families = [re.sub(r"[0-9]+", "#", name) for name in names]
+        if len(families) == 0:
+            return {}
+
+        unique_families, family_index = np.unique(families, return_inverse=True)
+        max_violations = np.zeros(len(unique_families))
+        np.maximum.at(max_violations, family_index, violations)
+
+        return dict(zip(unique_families.tolist(), max_violations.tolist()))
 
     def ensure_optimizer_returns_same_as_sum_nutrients(
         self, model, interpreted_results, INCLUDE_FAT, INCLUDE_PROTEIN
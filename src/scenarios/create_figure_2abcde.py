@@ -8,7 +8,7 @@ Created on Wed Jul 15
 """
 from src.scenarios.run_model_no_trade import ScenarioRunnerNoTrade
 from src.utilities.plotter import Plotter
-from src.optimizer.interpret_results import Interpreter
+from src.optimizer.results_reducer import ResultsReducer
 import git
 import numpy as np
 from pathlib import Path
@@ -46,6 +46,8 @@ def call_scenario_runner_whole_world_combined(this_simulation, title):
 
     scenario_runner = ScenarioRunnerNoTrade()
 
+    # each country is added to the world totals as soon as it has run
+    results_reducer = ResultsReducer()
     [world, pop_total, pop_fed, results] = scenario_runner.run_model_no_trade(
         title=title,
         create_pptx_with_all_countries=False,
@@ -54,11 +56,11 @@ def call_scenario_runner_whole_world_combined(this_simulation, title):
         add_map_slide_to_pptx=False,
         scenario_option=this_simulation,
         figure_save_postfix="_" + title,
-        return_results=True,
+        results_reducer=results_reducer,
     )
 
-    global_result_no_trade = Interpreter.sum_many_results_together(
-        results, cap_at_100_percent=False
+    global_result_no_trade = results_reducer.get_world_results(
+        cap_at_100_percent=False
     )
 
     return [world, pop_total, pop_fed, global_result_no_trade]
@@ -32,8 +32,8 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
     This function runs the model for all countries in the world, no trade.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, results_sink=None, validator=None):
+        super().__init__(results_sink, validator)
 
     def run_model_defaults_no_trade(
         self,
@@ -121,7 +121,17 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
         create_pptx_with_all_countries,
         show_country_figures,
         figure_save_postfix="",
+        summary_only=False,
     ):
+        """
+        Runs the scenario for one country, and plots the results if asked to.
+
+        If summary_only, only the percent people fed is computed (see
+        ScenarioRunner.run_and_analyze_scenario), and nothing is plotted.
+
+        returns: the fraction of people fed, the scenario description and the
+        results
+        """
         country_name = country_data["country"]
         constants_for_params, scenario_loader = self.set_depending_on_option(
             country_data, scenario_option
@@ -154,9 +164,9 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
         if USE_TRY_CATCH:
             try:
                 print("running scenario")
-                scenario_runner = ScenarioRunner()
+                scenario_runner = ScenarioRunner(self.results_sink, self.validator)
                 interpreted_results = scenario_runner.run_and_analyze_scenario(
-                    constants_for_params, scenario_loader
+                    constants_for_params, scenario_loader, summary_only
                 )
                 percent_people_fed = interpreted_results.percent_people_fed
             except Exception as e:
@@ -164,14 +174,14 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
                 print(e)
                 percent_people_fed = np.nan
         else:
-            scenario_runner = ScenarioRunner()
+            scenario_runner = ScenarioRunner(self.results_sink, self.validator)
             interpreted_results = scenario_runner.run_and_analyze_scenario(
-                constants_for_params, scenario_loader
+                constants_for_params, scenario_loader, summary_only
             )
             percent_people_fed = interpreted_results.percent_people_fed
         print("percent_people_fed")
         print(percent_people_fed)
-        if not np.isnan(percent_people_fed):
+        if not np.isnan(percent_people_fed) and not summary_only:
             Plotter.plot_feed(
                 interpreted_results,
                 84,  # constants_for_params["NMONTHS"],
@@ -226,6 +236,8 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
         countries_list=[],  # runs all the countries if empty
         figure_save_postfix="",
         return_results=False,
+        summary_only=False,
+        results_reducer=None,
     ):
         """
         This function runs the model for all countries in the world, no trade.
@@ -233,6 +245,20 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
         there's an "!" in the list, you skip that one.
         If you leave it blank, it runs all the countries
 
+        If summary_only, only the percent people fed of each country is computed,
+        which is all the map needs (see ScenarioRunner.run_and_analyze_scenario).
+        It can't be used with return_results, country figures, a results sink or a
+        results reducer.
+
+        If a results_reducer is given, the results of each country are added to it as
+        soon as the country has run (see ResultsReducer), rather than all being kept
+        until the end as with return_results.
+
+        If the runner has a results sink, its buffered runs are flushed at the end,
+        but the sink is left open so later calls (such as each scenario in
+        run_many_options) add to the same file. The caller must close the sink once
+        it is done, as Parquet and Arrow files can't be read until they are closed.
+
         You can generate a powerpoint as an option here too
 
         """
@@ -285,6 +311,15 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
 
         results = {}
 
+        if summary_only:
+            assert not (
+                return_results
+                or show_country_figures
+                or create_pptx_with_all_countries
+                or self.results_sink is not None
+                or results_reducer is not None
+            ), "ERROR: summary_only runs only compute the percent people fed"
+
         for index, country_data in no_trade_table.iterrows():
             country_code = country_data["iso3"]
 
@@ -311,6 +346,7 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
                 create_pptx_with_all_countries,
                 show_country_figures,
                 figure_save_postfix,
+                summary_only,
             )
             country_name = country_data["country"]
             if np.isnan(needs_ratio):
@@ -332,6 +368,9 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
             if return_results:
                 results[country_name] = interpreted_results
 
+            if results_reducer is not None:
+                results_reducer.add_results(country_name, interpreted_results)
+
         if net_pop > 0:
             ratio_fed = str(round(float(net_pop_fed) / float(net_pop), 4))
         else:
@@ -377,6 +416,10 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
                 + minute
                 + ".pptx"
             )
+        if self.results_sink is not None:
+            # the caller closes the sink, which may be shared with later calls
+            self.results_sink.flush()
+
         # @li return a dataframe with each country and the world needs ratio
         return [world, net_pop, net_pop_fed, results]
 
@@ -416,7 +459,14 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
         show_map_figures=False,
         countries_list=[],
         return_results=False,
+        summary_only=True,
     ):
+        """
+        Runs the model for all countries with each of the scenario options, adding
+        a map of each to the powerpoint. As only the maps are made, by default only
+        the percent people fed of each country is computed (see summary_only in
+        run_model_no_trade), unless the results are written to a results sink.
+        """
         print("Number of scenarios:")
         print(len(scenario_options))
         print("")
@@ -438,6 +488,8 @@ class ScenarioRunnerNoTrade(ScenarioRunner):
                 scenario_option=scenario_option,
                 countries_list=countries_list,
                 return_results=False,
+                # the results of each country are needed to add them to a sink
+                summary_only=summary_only and self.results_sink is None,
             )
 
         if add_map_slide_to_pptx:
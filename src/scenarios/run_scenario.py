@@ -17,10 +17,23 @@ from src.optimizer.parameters import Parameters
 
 
 class ScenarioRunner:
-    def __init__(self):
-        pass
+    def __init__(self, results_sink=None, validator=None):
+        """
+        results_sink is an optional ResultsSink, which each run's kcals equivalent
+        streams are added to. If it is None, the results are not written anywhere.
+        The runner never closes the sink, so whoever creates it must close it.
 
-    def run_and_analyze_scenario(self, constants_for_params, scenarios_loader):
+        validator is the Validator which checks the results of each run (by default,
+        one which fully checks every run).
+        """
+        self.results_sink = results_sink
+        if validator is None:
+            validator = Validator()
+        self.validator = validator
+
+    def run_and_analyze_scenario(
+        self, constants_for_params, scenarios_loader, summary_only=False
+    ):
         """
         computes params, Runs the optimizer, extracts data from optimizer, interprets
         the results, validates the results, and optionally prints an output with people
@@ -28,12 +41,19 @@ class ScenarioRunner:
 
         arguments: constants from the scenario, scenario loader (to print the aspects
         of the scenario and check no scenario parameter has been set twice or left
-        unset)
+        unset), and whether only the percent people fed is needed (summary_only).
+
+        A summary only run reads the least people fed from the optimizer's first
+        solve, skipping the second optimization (which only smooths the food eaten
+        over time) and extracting, interpreting and validating each food. It isn't
+        added to the results sink.
 
-        returns: the interpreted results
+        Either way, the result has the sensitivity_report of the optimizer's solve,
+        with the duals and reduced costs explaining what limits the people fed.
+
+        returns: the interpreted results, or a SummaryResults if summary_only
         """
         interpreter = Interpreter()
-        validator = Validator()
         # take the variables defining the scenario and compute the resulting needed
         # values as inputs to the optimizer
         (
@@ -51,22 +71,39 @@ class ScenarioRunner:
             variables,
             single_valued_constants,
             time_consts,
-        ) = self.run_optimizer(single_valued_constants, time_consts)
+            solution,
+        ) = self.run_optimizer(
+            single_valued_constants, time_consts, smooth=not summary_only
+        )
 
         extractor = Extractor(single_valued_constants)
+
+        if summary_only:
+            return extractor.extract_summary(solution)
+
         #  get values from all the optimizer in list and integer formats
-        extracted_results = extractor.extract_results(model, variables, time_consts)
+        extracted_results = extractor.extract_results(
+            model, variables, time_consts, solution
+        )
 
         # TODO: eventually all the values not directly solved by the optimizer should
         # be removed from extracted_results
 
         #  interpret the results, nicer for plotting, reporting, and printing results
         interpreted_results = interpreter.interpret_results(extracted_results)
+        interpreted_results.sensitivity_report = solution.sensitivity_report
 
         # ensure no errors were made in the extraction and interpretation, or if the
         # optimizer did not correctly satisfy constraints within a reasonable margin
         # of error
-        validator.validate_results(model, extracted_results, interpreted_results)
+        self.validator.validate_results(model, extracted_results, interpreted_results)
+
+        if self.results_sink is not None:
+            self.results_sink.add_results(
+                interpreted_results,
+                scenarios_loader.scenario_description,
+                constants_for_params["COUNTRY_CODE"],
+            )
 
         PRINT_NEEDS_RATIO = False
         if PRINT_NEEDS_RATIO:
@@ -90,9 +127,11 @@ class ScenarioRunner:
 
         return (single_valued_constants, time_consts, feed_and_biofuels)
 
-    def run_optimizer(self, single_valued_constants, time_consts):
+    def run_optimizer(self, single_valued_constants, time_consts, smooth=True):
         """
-        Runs the optimizer and returns the model, variables, and constants
+        Runs the optimizer and returns the model, variables, constants and the
+        solution (the values of the variables). smooth is passed to
+        Optimizer.optimize.
         """
         optimizer = Optimizer()
         validator = Validator()
@@ -103,14 +142,11 @@ class ScenarioRunner:
             maximize_constraints,
             single_valued_constants,
             time_consts,
-        ) = optimizer.optimize(single_valued_constants, time_consts)
+            solution,
+        ) = optimizer.optimize(single_valued_constants, time_consts, smooth)
 
-        CHECK_CONSTRAINTS = False
+        CHECK_CONSTRAINTS = True
         if CHECK_CONSTRAINTS:
-            print("")
-            print("VALIDATION")
-            print("")
-            print("")
             # check all the mathematically defined constraints in the optimizer are
             # satisfied within reasonable rounding errors
             validator.check_constraints_satisfied(
@@ -119,7 +155,7 @@ class ScenarioRunner:
                 model.variables(),
             )
 
-        return (model, variables, single_valued_constants, time_consts)
+        return (model, variables, single_valued_constants, time_consts, solution)
 
     def set_depending_on_option(self, country_data, scenario_option):
         scenario_loader = Scenarios()
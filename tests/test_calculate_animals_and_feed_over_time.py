@@ -0,0 +1,310 @@
+"""
+Tests for the animal population and feed calculations.
+"""
+from collections import OrderedDict
+
+import numpy as np
+from pytest import raises
+
+from src.food_system import calculate_animals_and_feed_over_time
+from src.food_system.calculate_animals_and_feed_over_time import (
+    AnimalFeedData,
+    CalculateAnimalOutputs,
+)
+
+
+def create_data(country_code="USA", months=24):
+    """
+    creates the inputs of a breeding reduction scenario and returns them
+    """
+    return {
+        "country_code": country_code,
+        "reduction_in_beef_calves": 90,
+        "reduction_in_dairy_calves": 0,
+        "increase_in_slaughter": 110,
+        "reduction_in_pig_breeding": 90,
+        "reduction_in_poultry_breeding": 90,
+        "months": months,
+        "discount_rate": 30,
+        "mother_slaughter": 0,
+        "use_grass_and_residues_for_dairy": False,
+        "keep_dairy": True,
+        "feed_ratio": 1,
+    }
+
+
+def test_calculate_animal_populations_all_countries():
+    """
+    Tests that simulating all countries at once gives the same populations as
+    simulating each country on its own
+    """
+    cao = CalculateAnimalOutputs()
+    populations = cao.calculate_animal_populations_all_countries(
+        create_data(), ["USA", "ARG", "IND"]
+    )
+    assert populations.country_codes == ["USA", "ARG", "IND"]
+    assert populations.simulated.shape == (
+        3,
+        24,
+        len(populations.simulated_fields),
+    )
+
+    for i, country_code in enumerate(populations.country_codes):
+        country_populations = cao.calculate_animal_populations(
+            create_data(country_code)
+        )
+        for field in populations.fields:
+            assert np.array_equal(
+                country_populations[field], populations[field][i], equal_nan=True
+            )
+
+
+def test_calculate_animal_populations_default_countries():
+    """
+    Tests that all the countries with animal data are simulated by default
+    """
+    cao = CalculateAnimalOutputs()
+    populations = cao.calculate_animal_populations_all_countries(
+        create_data(months=3)
+    )
+    assert len(populations.country_codes) > 100
+    assert populations["Beef Pop"].shape == (len(populations.country_codes), 3)
+    assert (populations["Beef Pop"] >= 0).all()
+
+
+def test_animal_populations_fields():
+    """
+    Tests that the derived fields are calculated from the simulated ones, and that
+    the populations can be viewed as a DataFrame
+    """
+    cao = CalculateAnimalOutputs()
+    populations = cao.calculate_animal_populations(create_data())
+
+    assert np.array_equal(populations["Month"], np.arange(24))
+    assert np.array_equal(
+        populations["Pig Slaughtered Hours"], populations["Pig Slaughtered"] * 4
+    )
+    assert populations["Dairy Milk Ready Pop"][0] < populations["Dairy Pop"][0]
+
+    df = populations.to_dataframe()
+    assert list(df.columns) == populations.fields
+    assert len(df) == 24
+
+
+def test_calculate_feed_and_animals():
+    """
+    Tests that the feed of each species is stored with the populations, and adds up
+    to the total feed
+    """
+    cao = CalculateAnimalOutputs()
+    populations, feed = cao.calculate_feed_and_animals(create_data())
+
+    assert feed.NMONTHS == 24
+    total = populations["Poultry Feed"] + populations["Pig Feed"]
+    total += populations["Beef Feed"]
+    total += populations["Dairy Feed"]
+    assert total == feed
+    assert "Poultry Feed" not in populations.to_dataframe().columns
+
+
+def test_calculate_feed_and_animals_cached(monkeypatch):
+    """
+    Tests that repeated calls are served from the cache as read only results, and
+    that changing the returned results doesn't change the cached ones
+    """
+    monkeypatch.setattr(CalculateAnimalOutputs, "feed_and_animals_cache", OrderedDict())
+    cao = CalculateAnimalOutputs()
+    populations, feed = cao.calculate_feed_and_animals(create_data())
+    assert len(CalculateAnimalOutputs.feed_and_animals_cache) == 1
+    beef_pop = populations["Beef Pop"].copy()
+
+    with raises(ValueError):
+        feed.kcals[:] = 0
+    with raises(ValueError):
+        populations["Beef Pop"][:] = 0
+
+    # changing the food in place copies it first
+    feed *= 0
+    assert (feed.kcals == 0).all()
+    populations["Beef Pop"] = np.zeros(24)
+
+    populations_again, feed_again = cao.calculate_feed_and_animals(create_data())
+    assert len(CalculateAnimalOutputs.feed_and_animals_cache) == 1
+    assert (feed_again.kcals > 0).any()
+    assert np.array_equal(populations_again["Beef Pop"], beef_pop)
+
+    cao.calculate_feed_and_animals(create_data(months=12))
+    assert len(CalculateAnimalOutputs.feed_and_animals_cache) == 2
+
+
+def test_calculate_feed_and_animals_cache_size(monkeypatch):
+    """
+    Tests that the least recently used results are dropped from the cache once it is
+    full, and that clear_cache empties it
+    """
+    monkeypatch.setattr(CalculateAnimalOutputs, "feed_and_animals_cache", OrderedDict())
+    monkeypatch.setattr(CalculateAnimalOutputs, "FEED_AND_ANIMALS_CACHE_SIZE", 2)
+    cao = CalculateAnimalOutputs()
+    cache = CalculateAnimalOutputs.feed_and_animals_cache
+
+    for months in [12, 24, 12, 36]:
+        cao.calculate_feed_and_animals(create_data(months=months))
+    # 24 months was used least recently, so it was dropped when 36 was added
+    assert [dict(key[1][1:])["months"] for key in cache] == [12, 36]
+
+    CalculateAnimalOutputs.clear_cache()
+    assert len(cache) == 0
+
+
+def test_calculate_feed_and_animals_disk_cache(monkeypatch, tmp_path):
+    """
+    Tests that results saved to the cache directory are loaded in a new run
+    """
+    monkeypatch.setattr(CalculateAnimalOutputs, "CACHE_DIRECTORY", tmp_path)
+    monkeypatch.setattr(CalculateAnimalOutputs, "feed_and_animals_cache", OrderedDict())
+    cao = CalculateAnimalOutputs()
+    populations, feed = cao.calculate_feed_and_animals(create_data())
+    assert len(list(tmp_path.iterdir())) == 1
+
+    monkeypatch.setattr(CalculateAnimalOutputs, "feed_and_animals_cache", OrderedDict())
+    populations_again, feed_again = cao.calculate_feed_and_animals(create_data())
+    assert feed_again == feed
+    assert np.array_equal(populations_again["Beef Pop"], populations["Beef Pop"])
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_animal_feed_data_read_on_first_use(tmp_path):
+    """
+    Tests that the tables are only read when they are first used, from the data
+    directory set
+    """
+    animal_feed_data = AnimalFeedData()
+    assert animal_feed_data.tables == {}
+
+    assert "ARG" in animal_feed_data.df_fao_animals.index
+    assert list(animal_feed_data.tables) == ["df_fao_animals"]
+
+    head_counts = animal_feed_data.df_fao_animals.loc[["ARG"]]
+    head_counts.to_csv(tmp_path / "head_count_csv.csv")
+    animal_feed_data.set_data_dir(tmp_path)
+    assert list(animal_feed_data.df_fao_animals.index) == ["ARG"]
+
+
+def test_animal_feed_data_set_table(monkeypatch):
+    """
+    Tests that replacing a table changes the results, rather than reusing the results
+    from the old table
+    """
+    animal_feed_data = AnimalFeedData()
+    monkeypatch.setattr(
+        calculate_animals_and_feed_over_time, "animal_feed_data", animal_feed_data
+    )
+    cao = CalculateAnimalOutputs()
+    populations, feed = cao.calculate_feed_and_animals(create_data())
+
+    head_counts = animal_feed_data.df_fao_animals.copy()
+    head_counts.loc["USA", "large_animals"] *= 2
+    animal_feed_data.set_table("df_fao_animals", head_counts)
+    populations_again, feed_again = cao.calculate_feed_and_animals(create_data())
+
+    assert populations_again["Beef Pop"][0] == 2 * populations["Beef Pop"][0]
+    assert calculate_animals_and_feed_over_time.df_fao_animals is head_counts
+
+
+def test_feed_per_head_table():
+    """
+    Tests that the feed per head of all the species adds up to the feed of the
+    country, and that feed_ratio scales it
+    """
+    cao = CalculateAnimalOutputs()
+    country_index, feed_per_head = cao.get_feed_per_head_table()
+    assert feed_per_head.shape == (len(country_index), 4, 3)
+    assert cao.get_feed_per_head_table()[1] is feed_per_head
+
+    animal_feed_data = calculate_animals_and_feed_over_time.animal_feed_data
+    head_counts = animal_feed_data.df_fao_animals.loc["ARG", cao.feed_species]
+    feed_annual = animal_feed_data.df_feed_country.at[
+        "ARG", "Animal feed caloric consumption in 2020 (million dry caloric tons)"
+    ]
+    feed_per_head_kcals = feed_per_head[country_index["ARG"], :, 0]
+    assert np.isclose((feed_per_head_kcals * head_counts).sum(), feed_annual / 12)
+
+    feed_dict = cao.calculate_country_specific_per_species_feed_consumption("ARG", 0.5)
+    assert list(feed_dict) == cao.feed_species
+    assert feed_dict["large_animals"].kcals == feed_per_head_kcals[2] * 0.5
+    assert feed_dict["large_animals"].kcals_units == "million dry caloric tons"
+
+
+def test_calculate_animal_populations_other_species():
+    """
+    Tests that species can be added to the species table, and that the species
+    already there are simulated the same way
+    """
+    goats = {
+        "name": "Goat",
+        "population_name": "Goats",
+        "head_count_column": "medium_animals",
+        "slaughter_pool": "goat",
+        "gestation": 5,
+        "offspring_per_mother": 1.5,
+        "other_death": 8,
+        "breeding_reduction": "reduction_in_goat_breeding",
+        "feed_pm_per_animal": 20,
+    }
+    goat_pool = {
+        "name": "goat",
+        "slaughter_column": "medium_animal_slaughter",
+        "slaughter_hours": 2,
+    }
+    cao = CalculateAnimalOutputs(
+        species=CalculateAnimalOutputs.SPECIES + [goats],
+        slaughter_pools=CalculateAnimalOutputs.SLAUGHTER_POOLS + [goat_pool],
+    )
+    data = create_data()
+    data["reduction_in_goat_breeding"] = 50
+    populations = cao.calculate_animal_populations(data)
+
+    assert "Goats Pop" in populations
+    assert populations["Goat Slaughtered Hours"].shape == (24,)
+    assert populations["Goats Pop"][0] == populations["Pigs Pop"][0]
+
+    default_populations = CalculateAnimalOutputs().calculate_animal_populations(
+        create_data()
+    )
+    for field in ["Beef Pop", "Dairy Slaughtered", "Poultry Born"]:
+        assert np.array_equal(populations[field], default_populations[field])
+
+
+def test_explore_policy_grid():
+    """
+    Tests that exploring a grid of policies gives the same feed and slaughter as
+    calculating each policy for each country on its own
+    """
+    cao = CalculateAnimalOutputs()
+    data = create_data()
+    data["feed_ratio"] = 0.5
+    grid = {"reduction_in_beef_calves": [0, 90], "increase_in_slaughter": [100, 130]}
+    culled_meat_per_animal = np.arange(1, 10).reshape(3, 3)
+    results = cao.explore_policy_grid(
+        grid, data, culled_meat_per_animal, ["USA", "ARG"], max_columns=3
+    )
+    assert len(results["scenarios"]) == 4
+    assert results["feed"].shape == (4, 2, 24, 3)
+    assert results["culled_meat"].shape == (4, 2, 24, 3)
+
+    for s, scenario in enumerate(results["scenarios"]):
+        for c, country_code in enumerate(results["country_codes"]):
+            scenario_data = dict(data, country_code=country_code, **scenario)
+            populations, feed = cao.calculate_feed_and_animals_uncached(scenario_data)
+            assert np.array_equal(results["feed"][s, c, :, 0], feed.kcals)
+            assert np.array_equal(results["feed"][s, c, :, 2], feed.protein)
+            assert np.array_equal(
+                results["populations"][s, c, :, 2], populations["Beef Pop"]
+            )
+
+            culled_meat_fat = (
+                populations["Poultry Slaughtered"] * 2
+                + populations["Pig Slaughtered"] * 5
+                + populations["Beef Slaughtered"] * 8
+            )
+            assert np.allclose(results["culled_meat"][s, c, :, 1], culled_meat_fat)
@@ -0,0 +1,154 @@
+"""
+Tests for the feed and biofuel calculations.
+"""
+import numpy as np
+import pytest
+
+from src.food_system import lazy_food
+from src.food_system.feed_and_biofuels import FeedAndBiofuels
+from src.food_system.food import Food
+
+
+def create_monthly_food(values, months=10):
+    """
+    creates a food with the same value each month and returns it
+    """
+    return Food(
+        kcals=np.full(months, values[0], dtype=float),
+        fat=np.full(months, values[1], dtype=float),
+        protein=np.full(months, values[2], dtype=float),
+        kcals_units="billion kcals each month",
+        fat_units="thousand tons each month",
+        protein_units="thousand tons each month",
+    )
+
+
+def test_determine_reduction_in_nonhuman_consumption():
+    """
+    Tests that the feed and biofuels are reduced to the largest ratio the stored food
+    can make up for, less the safety margin
+    """
+    Food.conversions.set_nutrition_requirements(
+        kcals_daily=2100,
+        fat_daily=47,
+        protein_daily=51,
+        include_fat=True,
+        include_protein=True,
+        population=1e9,
+    )
+    feed_and_biofuels = FeedAndBiofuels(
+        {"NMONTHS": 10, "BIOFUEL_KCALS": 0, "BIOFUEL_FAT": 0, "BIOFUEL_PROTEIN": 0}
+    )
+    biofuels = create_monthly_food([1, 1, 1])
+    feed = create_monthly_food([1, 1, 2])
+    no_outdoor_crops = create_monthly_food([0, 0, 0])
+    # enough stored food for a quarter of the protein demand, and half the rest
+    stored_food = Food(
+        kcals=10,
+        fat=10,
+        protein=7.5,
+        kcals_units="billion kcals",
+        fat_units="thousand tons",
+        protein_units="thousand tons",
+    )
+
+    ratio = (
+        feed_and_biofuels.iteratively_determine_reduction_in_nonhuman_consumption_postwaste(
+            True, stored_food, no_outdoor_crops, biofuels, feed
+        )
+    )
+
+    step = feed_and_biofuels.AMOUNT_TO_REDUCE_RATIO_EACH_ITERATION
+    margin = feed_and_biofuels.SAFETY_MARGIN
+    assert 0.25 - step - margin <= ratio <= 0.25 - margin + 1e-9
+
+    # no stored food to make up the demand
+    ratio = (
+        feed_and_biofuels.iteratively_determine_reduction_in_nonhuman_consumption_postwaste(
+            True, stored_food * 0, no_outdoor_crops, biofuels, feed
+        )
+    )
+    assert ratio == 0
+
+
+def test_determine_reduction_with_numexpr_matches_numpy(monkeypatch):
+    """
+    Tests that the bisection of the feed and biofuel ratio compares the same max
+    running net demand with the stored food, and finds the same ratio, whether the
+    lazy foods are evaluated with numexpr or numpy
+    """
+    pytest.importorskip("numexpr")
+    Food.conversions.set_nutrition_requirements(
+        kcals_daily=2100,
+        fat_daily=47,
+        protein_daily=51,
+        include_fat=True,
+        include_protein=True,
+        population=1e9,
+    )
+    feed_and_biofuels = FeedAndBiofuels(
+        {"NMONTHS": 10, "BIOFUEL_KCALS": 0, "BIOFUEL_FAT": 0, "BIOFUEL_PROTEIN": 0}
+    )
+    biofuels = create_monthly_food([1, 0.3, 1])
+    feed = create_monthly_food([1.7, 1, 2])
+    outdoor_crops = create_monthly_food([0.5, 0.1, 0.2])
+    stored_food = Food(
+        kcals=10,
+        fat=10,
+        protein=7.5,
+        kcals_units="billion kcals",
+        fat_units="thousand tons",
+        protein_units="thousand tons",
+    )
+
+    def bisect():
+        calculate_demand = feed_and_biofuels.calculate_max_running_net_demand_postwaste
+        comparisons = []
+        for ratio in np.linspace(0, 1, 41):
+            max_net_demand = calculate_demand(
+                True, outdoor_crops, biofuels.lazy() * ratio, feed.lazy() * ratio
+            )[0]
+            comparisons.append(
+                (
+                    max_net_demand.kcals,
+                    max_net_demand.fat,
+                    max_net_demand.protein,
+                    max_net_demand.any_greater_than(stored_food),
+                )
+            )
+        ratio = (
+            feed_and_biofuels.iteratively_determine_reduction_in_nonhuman_consumption_postwaste(
+                True, stored_food, outdoor_crops, biofuels, feed
+            )
+        )
+        return comparisons, ratio
+
+    comparisons_numexpr, ratio_numexpr = bisect()
+    monkeypatch.setattr(lazy_food, "numexpr", None)
+    comparisons_numpy, ratio_numpy = bisect()
+
+    assert comparisons_numexpr == comparisons_numpy
+    # the stored food makes up the demand at some of the ratios but not others
+    assert {comparison[3] for comparison in comparisons_numpy} == {True, False}
+    assert ratio_numexpr == ratio_numpy
+
+
+def test_get_supply_constrained_months():
+    """
+    Tests that the allocation is kept, and the months needing stored food are found
+    """
+    feed_and_biofuels = FeedAndBiofuels(
+        {"NMONTHS": 3, "BIOFUEL_KCALS": 0, "BIOFUEL_FAT": 0, "BIOFUEL_PROTEIN": 0}
+    )
+    feed_and_biofuels.set_allocation(
+        {"supply_constrained": np.array([False, False, False])},
+        {
+            "supply_constrained": np.array([True, False, True]),
+            "needed_from_stored_food": np.array([1.0, 0, 2]),
+        },
+    )
+
+    assert np.array_equal(feed_and_biofuels.feed_needed_from_stored_food, [1, 0, 2])
+    months = feed_and_biofuels.get_supply_constrained_months()
+    assert np.array_equal(months["biofuels"], [])
+    assert np.array_equal(months["feed"], [0, 2])
@@ -193,6 +193,41 @@ def test_failed_addition():
         food1 + food2
 
 
+def test_in_place_addition_monthly_food():
+    """
+    Tests if a monthly food can be added to in place without new arrays
+    """
+    food1 = create_food_monthly(kcals=[1.0, 2.0, 1.0])
+    food2 = create_food_monthly()
+    kcals_before = food1.kcals
+    food1 += food2
+    assert food1.kcals is kcals_before
+    assert (food1.kcals == np.array([2, 4, 2])).all()
+    assert (food1.fat == np.array([2, 4, 4])).all()
+    assert food1.kcals_units == "kcals each month"
+
+    food3 = Food(
+        kcals=1, fat=1, protein=1, kcals_units="g", fat_units="g", protein_units="g"
+    )
+    with pytest.raises(AssertionError):
+        food1 += food3
+
+
+def test_in_place_subtraction_and_multiplication():
+    """
+    Tests in place subtraction and multiplication of scalar and monthly foods
+    """
+    food1 = Food(kcals=3, fat=2, protein=2)
+    food1 -= Food(kcals=1, fat=1, protein=1)
+    food1 *= 2
+    assert food1 == Food(kcals=4, fat=2, protein=2)
+
+    food2 = create_food_monthly(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[1, 2, 3])
+    food2 *= 0.5
+    assert (food2.kcals == np.array([0.5, 1, 1.5])).all()
+    assert food2.kcals_units == "kcals each month"
+
+
 def test_subtraction_scalar_food():
     """
     Tests if two instances of the Food class can be subtracted
@@ -318,6 +353,34 @@ def test_getitem():
     assert food2[0].kcals == 1
 
 
+def test_getitem_slice_is_view():
+    """
+    Tests that slicing a monthly food shares the arrays instead of copying them
+    """
+    food = create_food_monthly(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[1, 2, 3])
+    food_slice = food[0:2]
+    assert (food_slice.kcals == [1, 2]).all()
+    assert food_slice.NMONTHS == 2
+    assert food_slice.kcals_units == "kcals each month"
+    assert np.shares_memory(food_slice.kcals, food.kcals)
+    # the view is read only, so it can't change the food it came from
+    with pytest.raises(ValueError):
+        food_slice.kcals[0] = 5
+
+
+def test_set_to_zero_after_month_copies_view():
+    """
+    Tests that changing a view in place doesn't change the food it came from
+    """
+    food = create_food_monthly(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[1, 2, 3])
+    food_slice = food[0:3]
+    food_slice.set_to_zero_after_month(1)
+    assert (food_slice.kcals == [1, 0, 0]).all()
+    assert (food_slice.protein == [1, 0, 0]).all()
+    assert (food.kcals == [1, 2, 3]).all()
+    assert (food.protein == [1, 2, 3]).all()
+
+
 def test_multiplication_scalar():
     """
     Tests if an instance of the Food class can be multiplied by a scalar
@@ -1161,3 +1224,105 @@ def test_negative_values_to_zero_monthly_food():
     assert food.kcals_units == "kcals each month"
     assert food.protein_units == "kcals each month"
     assert food.fat_units == "kcals each month"
+
+
+def test_lazy_matches_eager():
+    """
+    Tests that a lazily evaluated expression gives the same food as computing it
+    one operation at a time
+    """
+    food1 = create_food_monthly(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[1, 2, 3])
+    food2 = create_food_monthly(kcals=[3, 2, 1], fat=[3, 2, 1], protein=[3, 2, 1])
+
+    eager = (food1 * 0.5 + food2 * 0.5) - food1
+    lazy = ((food1.lazy() * 0.5 + food2.lazy() * 0.5) - food1).evaluate()
+
+    assert lazy == eager
+    assert lazy.kcals_units == "kcals each month"
+    # the original foods are unchanged
+    assert (food1.kcals == [1, 2, 3]).all()
+    assert (food2.kcals == [3, 2, 1]).all()
+
+
+def test_lazy_numpy_fallback(monkeypatch):
+    """
+    Tests that lazy evaluation works without numexpr installed
+    """
+    from src.food_system import lazy_food
+
+    monkeypatch.setattr(lazy_food, "numexpr", None)
+    food = create_food_monthly(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[1, 2, 3])
+    lazy = (food.lazy() + food) * 2 / 4
+    assert (lazy.kcals == [1, 2, 3]).all()
+    assert (food.kcals == [1, 2, 3]).all()
+
+
+def test_lazy_numexpr_matches_numpy(monkeypatch):
+    """
+    Tests that evaluating lazy expressions with numexpr gives the same values and
+    types as evaluating them with numpy
+    """
+    pytest.importorskip("numexpr")
+    from src.food_system import lazy_food
+
+    food1 = create_food_monthly(kcals=[1, 2, 3], fat=[4, 5, 6], protein=[7, 8, 9])
+    food2 = create_food_monthly(
+        kcals=[0.1, 0.2, 0.3], fat=[1.5, 2.5, 3.5], protein=[3.0, 2.0, 1.0]
+    )
+
+    def evaluate_expressions():
+        return [
+            ((food1.lazy() * 0.5 + food2.lazy() * 0.5) - food1).evaluate(),
+            # integers divided give floats
+            (food1.lazy() / 2).evaluate(),
+            (-food1.lazy() + 3 * food2.lazy() * 0.7).evaluate(),
+            (food1.lazy() * 2 + food1).evaluate(),
+        ]
+
+    with_numexpr = evaluate_expressions()
+    monkeypatch.setattr(lazy_food, "numexpr", None)
+    with_numpy = evaluate_expressions()
+
+    for food_numexpr, food_numpy in zip(with_numexpr, with_numpy):
+        assert food_numexpr.get_units() == food_numpy.get_units()
+        for nutrient in ["kcals", "fat", "protein"]:
+            values_numexpr = getattr(food_numexpr, nutrient)
+            values_numpy = getattr(food_numpy, nutrient)
+            assert values_numexpr.dtype == values_numpy.dtype
+            assert np.array_equal(values_numexpr, values_numpy)
+
+
+def test_lazy_checks_units():
+    """
+    Tests that units are checked while the lazy expression is built
+    """
+    food1 = create_food_monthly()
+    food2 = Food(
+        kcals=[1, 2, 1],
+        fat=[1, 2, 1],
+        protein=[1, 2, 1],
+        kcals_units="g each month",
+        fat_units="g each month",
+        protein_units="g each month",
+    )
+    with pytest.raises(AssertionError):
+        food1.lazy() + food2
+    with pytest.raises(AssertionError):
+        food1.lazy() * food2
+
+
+def test_from_numpy_array():
+    """
+    Tests that a food can be recreated from its numpy array
+    """
+    food = create_food_monthly(kcals=[1, 2, 3], fat=[1, 2, 3], protein=[3, 2, 1])
+    nutrients = food.as_numpy_array()
+    food_again = Food.from_numpy_array(nutrients, *food.get_units())
+    assert food_again == food
+    assert food_again.NMONTHS == 3
+    assert np.shares_memory(food_again.kcals, nutrients)
+
+    scalar_food = Food.from_numpy_array(
+        np.array([1.0, 2.0, 3.0]), "billion kcals", "thousand tons", "thousand tons"
+    )
+    assert scalar_food == Food(kcals=1, fat=2, protein=3)
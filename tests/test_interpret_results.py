@@ -0,0 +1,205 @@
+"""
+Tests for interpreting results, and for saving and loading interpreted results.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+from pytest import raises
+
+from src.food_system.food import Food
+from src.optimizer.interpret_results import Interpreter
+
+
+def create_interpreter():
+    """
+    creates an interpreter with a few results filled in and returns it
+    """
+    interpreter = Interpreter()
+    interpreter.fish_kcals_equivalent = Food(
+        kcals=[1.5, 2.5, 3.5],
+        fat=[1, 2, 3],
+        protein=[3, 2, 1],
+        kcals_units="kcals per capita per day each month",
+        fat_units="effective kcals per capita per day each month",
+        protein_units="effective kcals per capita per day each month",
+    )
+    interpreter.percent_people_fed = 95.5
+    interpreter.constraining_nutrient = "kcals"
+    interpreter.include_fat = False
+    interpreter.time_months_middle = [0.5, 1.5, 2.5]
+    interpreter.kcals_fed = np.array([90.0, 95.5, 100.0])
+    interpreter.constants = {"NMONTHS": 3, "ADD_FISH": True, "inputs": {"POP": 1e6}}
+    return interpreter
+
+
+def test_save_and_load_results(tmp_path):
+    """
+    Tests that results are the same after saving and loading them
+    """
+    interpreter = create_interpreter()
+    path = tmp_path / "results.npz"
+    interpreter.save_results(path)
+
+    for memory_map in [False, True]:
+        loaded = Interpreter.load_results(path, memory_map=memory_map)
+        assert loaded.fish_kcals_equivalent == interpreter.fish_kcals_equivalent
+        assert (
+            loaded.fish_kcals_equivalent.get_units()
+            == interpreter.fish_kcals_equivalent.get_units()
+        )
+        assert loaded.percent_people_fed == 95.5
+        assert loaded.constraining_nutrient == "kcals"
+        assert loaded.include_fat is False
+        assert loaded.time_months_middle == [0.5, 1.5, 2.5]
+        assert (loaded.kcals_fed == interpreter.kcals_fed).all()
+        assert loaded.constants == interpreter.constants
+
+
+def test_save_many_results_float32(tmp_path):
+    """
+    Tests saving several results in one file with float32 values
+    """
+    many_results = {"ARG": create_interpreter(), "AUS": create_interpreter()}
+    many_results["AUS"].percent_people_fed = 50.0
+    path = tmp_path / "many_results.npz"
+    Interpreter.save_many_results(many_results, path, dtype=np.float32)
+
+    loaded = Interpreter.load_many_results(path, memory_map=True)
+    assert list(loaded.keys()) == ["ARG", "AUS"]
+    assert loaded["AUS"].percent_people_fed == 50.0
+    assert loaded["ARG"].fish_kcals_equivalent.kcals.dtype == np.float32
+    assert np.allclose(loaded["ARG"].fish_kcals_equivalent.kcals, [1.5, 2.5, 3.5])
+
+
+def test_save_and_load_results_without_suffix(tmp_path):
+    """
+    Tests that results saved to a path without ".npz" are loaded from the same path,
+    although np.savez adds the suffix to the file it writes
+    """
+    path = tmp_path / "results"
+    create_interpreter().save_results(str(path))
+    assert (tmp_path / "results.npz").exists()
+
+    for memory_map in [False, True]:
+        loaded = Interpreter.load_results(path, memory_map=memory_map)
+        assert loaded.percent_people_fed == 95.5
+
+
+def create_extracted_results():
+    """
+    creates a stand in for the extracted results of 3 months, where each food feeds
+    0.1001234 billion people each month, except fish which feeds 0.2 billion
+    """
+    extracted_results = SimpleNamespace(constants={"NMONTHS": 3})
+    for food in Interpreter.EXTRACTED_FOODS:
+        billion_fed = 0.2 if food == "fish" else 0.1001234
+        setattr(
+            extracted_results,
+            food,
+            Food(
+                kcals=np.full(3, billion_fed),
+                fat=np.full(3, billion_fed),
+                protein=np.full(3, billion_fed),
+                kcals_units="billion people fed each month",
+                fat_units="billion people fed each month",
+                protein_units="billion people fed each month",
+            ),
+        )
+    extracted_results.excess_feed = Food(
+        kcals=np.zeros(3),
+        fat=np.zeros(3),
+        protein=np.zeros(3),
+        kcals_units="percent people fed each month",
+        fat_units="percent people fed each month",
+        protein_units="percent people fed each month",
+    )
+    return extracted_results
+
+
+def test_interpret_results():
+    """
+    Tests the foods are converted to percent people fed and kcals equivalent, and
+    only the outputs of the optimizer are rounded
+    """
+    Food.conversions.set_nutrition_requirements(
+        kcals_daily=2100,
+        fat_daily=47,
+        protein_daily=51,
+        include_fat=False,
+        include_protein=False,
+        population=1e9,
+    )
+    interpreter = Interpreter().interpret_results(create_extracted_results())
+
+    # the foods are only created when they are read
+    assert "fish" not in vars(interpreter)
+    assert np.allclose(interpreter.fish.kcals, 20)
+    assert interpreter.fish.kcals_units == "percent people fed each month"
+    assert np.allclose(interpreter.fish_kcals_equivalent.kcals, 420)
+    assert np.allclose(interpreter.seaweed.kcals, 10.01234)
+    assert np.allclose(interpreter.seaweed_rounded.kcals, 10.012)
+    assert np.allclose(interpreter.stored_food.kcals, 10.012)
+    assert np.allclose(interpreter.stored_food_kcals_equivalent.kcals, 210.25914)
+
+    # the 11 foods fed to humans, one of which is fish
+    assert np.isclose(interpreter.percent_people_fed, 10 * 10.01234 + 20)
+    assert np.allclose(interpreter.kcals_fed, 10 * 10.01234 + 20)
+
+    # the foods are views of the interpreted arrays, so can't be changed in place
+    with raises(ValueError):
+        interpreter.fish.kcals[0] = 1
+
+
+def create_country_results(population):
+    """
+    Creates interpreted results for a country of population people, where each food
+    feeds 0.1001234 billion people each month, except fish which feeds 0.2 billion
+    """
+    Food.conversions.set_nutrition_requirements(
+        kcals_daily=2100,
+        fat_daily=47,
+        protein_daily=51,
+        include_fat=False,
+        include_protein=False,
+        population=population,
+    )
+    extracted_results = create_extracted_results()
+    extracted_results.constants["POP"] = population
+    extracted_results.constants["inputs"] = {
+        "NUTRITION": {"KCALS_DAILY": 2100, "FAT_DAILY": 47, "PROTEIN_DAILY": 51}
+    }
+    for flag in Interpreter.SUMMED_FLAGS:
+        extracted_results.constants[flag] = True
+    return Interpreter().interpret_results(extracted_results)
+
+
+def test_sum_many_results_together():
+    """
+    Tests results are summed as percent of the total population fed, optionally
+    capping each result at 100 percent, without changing the Food conversions
+    """
+    many_results = {"A": create_country_results(1e9), "B": create_country_results(3e9)}
+    assert many_results["A"].percent_people_fed > 100
+    assert many_results["B"].percent_people_fed < 100
+
+    global_results = Interpreter.sum_many_results_together(
+        many_results, cap_at_100_percent=False
+    )
+    # 0.4 billion people of 4 billion are fed fish
+    assert np.allclose(global_results.fish_kcals_equivalent.kcals, 210)
+    # the 12 foods summed, three of which were rounded for each country
+    assert np.allclose(
+        global_results.kcals_fed, (11 * 0.2002468 + 0.4) / 4 * 100, atol=0.01
+    )
+    assert global_results.constants["ADD_FISH"]
+
+    global_results = Interpreter.sum_many_results_together(
+        many_results, cap_at_100_percent=True
+    )
+    ratio = 100 / many_results["A"].percent_people_fed
+    assert np.allclose(
+        global_results.fish_kcals_equivalent.kcals, (0.2 * ratio + 0.2) / 4 * 2100
+    )
+
+    # the conversions are still those of the last country interpreted
+    assert Food.conversions.population == 3e9
@@ -0,0 +1,81 @@
+"""
+Tests for the calculations of the model parameters.
+"""
+import numpy as np
+
+from src.optimizer.parameters import Parameters
+
+
+def test_subtract_off_usage_iteratively():
+    """
+    Tests that outdoor crops are stored to meet the usage of the following months,
+    nearest months first
+    """
+    parameters = Parameters()
+    usage_needed = np.array([0, 2, 0, 5, 0, 0])
+    outdoor_crops = np.array([3, 0, 4, 0, 0, 1])
+
+    (
+        outdoor_crops_remaining,
+        usage_needed_from_stored_food,
+        outdoor_crops_used,
+    ) = parameters.subtract_off_usage_iteratively(
+        usage_needed, outdoor_crops, max_shift=3
+    )
+
+    # month 1 is met from month 0, and month 3 from month 2 (1 month before), but
+    # month 0 is more than 2 months before month 3, so can't make up the rest
+    assert np.array_equal(outdoor_crops_used, [2, 0, 4, 0, 0, 0])
+    assert np.array_equal(outdoor_crops_remaining, [1, 0, 0, 0, 0, 1])
+    assert np.array_equal(usage_needed_from_stored_food.kcals, [0, 0, 0, 1, 0, 0])
+
+    # the inputs aren't changed
+    assert np.array_equal(usage_needed, [0, 2, 0, 5, 0, 0])
+
+
+def test_allocate_usage_without_stored_food():
+    """
+    Tests that usage the outdoor crops can't meet, even from earlier months, is
+    needed from stored food, and those months are marked as supply constrained
+    """
+    parameters = Parameters()
+    no_food = np.zeros(4)
+
+    allocation, usage_needed_from_stored_food = (
+        parameters.allocate_usage_without_stored_food(
+            np.array([0, 3, 0, 3]), 0, no_food, 0, no_food, np.array([4, 1, 0, 0])
+        )
+    )
+
+    assert np.array_equal(allocation["outdoor_crops_used_before_shift"], [0, 1, 0, 0])
+    assert np.array_equal(allocation["outdoor_crops_used"], [4, 1, 0, 0])
+    assert np.array_equal(allocation["outdoor_crops_remaining"], [0, 0, 0, 0])
+    assert np.array_equal(usage_needed_from_stored_food.kcals, [0, 0, 0, 1])
+    assert np.array_equal(
+        allocation["supply_constrained"], [False, False, False, True]
+    )
+
+
+def test_allocate_usage_without_stored_food_subtracts_each_source():
+    """
+    Tests that usage met by cellulosic sugar and methane SCP isn't also taken from
+    the outdoor crops or stored food
+    """
+    parameters = Parameters()
+
+    allocation, usage_needed_from_stored_food = (
+        parameters.allocate_usage_without_stored_food(
+            np.array([10, 10]),
+            0.5,
+            np.array([3, 10]),
+            0.5,
+            np.array([10, 10]),
+            np.array([1, 0]),
+        )
+    )
+
+    # 3 and 5 from cellulosic sugar, then half of the remaining 7 and 5 from SCP
+    assert np.array_equal(allocation["cellulosic_sugar_used"], [3, 5])
+    assert np.array_equal(allocation["methane_scp_used"], [3.5, 2.5])
+    assert np.array_equal(allocation["outdoor_crops_used"], [1, 0])
+    assert np.array_equal(usage_needed_from_stored_food.kcals, [2.5, 2.5])
@@ -0,0 +1,56 @@
+"""
+Tests for summing the results of each country into world totals as they are run.
+"""
+import numpy as np
+from pytest import raises
+
+from src.optimizer.interpret_results import Interpreter
+from src.optimizer.results_reducer import ResultsReducer
+from test_interpret_results import create_country_results
+
+
+def test_results_reducer_matches_sum_many_results_together():
+    """
+    Tests that the running totals give the same world results as summing all the
+    results at the end, with and without capping at 100 percent fed
+    """
+    many_results = {"A": create_country_results(1e9), "B": create_country_results(3e9)}
+
+    reducer = ResultsReducer()
+    for name, interpreted_results in many_results.items():
+        reducer.add_results(name, interpreted_results)
+
+    for cap_at_100_percent in [False, True]:
+        expected = Interpreter.sum_many_results_together(
+            many_results, cap_at_100_percent
+        )
+        world_results = reducer.get_world_results(cap_at_100_percent)
+        assert np.array_equal(world_results.kcals_fed, expected.kcals_fed)
+        assert np.array_equal(
+            world_results.fish_kcals_equivalent.kcals,
+            expected.fish_kcals_equivalent.kcals,
+        )
+
+    # A feeds more than all of its 1 billion people
+    assert np.isclose(
+        reducer.get_fraction_fed(),
+        (1e9 + 3e9 * many_results["B"].percent_people_fed / 100) / 4e9,
+    )
+    assert np.all(reducer.min_percent_fed_names == "B")
+    assert np.allclose(reducer.min_percent_fed[0], many_results["B"].kcals_fed)
+
+    with raises(AssertionError):
+        reducer.add_results("A", many_results["A"])
+
+
+def test_results_reducer_spills_results(tmp_path):
+    """
+    Tests that the full results of each country are saved as they are added, and
+    can be reopened
+    """
+    reducer = ResultsReducer(spill_directory=tmp_path / "countries")
+    reducer.add_results("A", create_country_results(1e9))
+
+    spilled_results = reducer.load_spilled_results()
+    assert list(spilled_results) == ["A"]
+    assert np.allclose(spilled_results["A"].fish.kcals, 20)
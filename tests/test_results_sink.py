@@ -0,0 +1,155 @@
+"""
+Tests for writing the results of many runs to one file.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from pytest import raises
+
+from src.optimizer.results_sink import ResultsSink
+
+
+class InterpretedResults:
+    """
+    stands in for the interpreted results of a run, with a kcals equivalent stream
+    for stored food and fish
+    """
+
+    def __init__(self, stored_food, fish):
+        self.stored_food = stored_food
+        self.fish = fish
+
+    def get_kcals_equivalent_streams(self):
+        return {"stored_food": np.array(self.stored_food), "fish": np.array(self.fish)}
+
+
+def test_results_sink_csv(tmp_path):
+    """
+    Tests that the runs are written in batches to one csv file, keyed by scenario
+    and country
+    """
+    path = tmp_path / "results.csv"
+    sink = ResultsSink(path, batch_size=2)
+
+    sink.add_results(InterpretedResults([1, 2], [3, 4]), "scenario a", "ARG")
+    assert not path.exists()
+    sink.add_results(InterpretedResults([5, 6], [7, 8]), "scenario a", "USA")
+    assert sink.n_runs_written == 2
+    sink.add_results(InterpretedResults([9, 10], [11, 12]), "scenario b", "ARG")
+    sink.close()
+
+    df = pd.read_csv(path)
+    assert len(df) == 6
+    assert list(df.columns) == [
+        "scenario_hash",
+        "country",
+        "month",
+        "stored_food",
+        "fish",
+    ]
+    assert list(df.country) == ["ARG", "ARG", "USA", "USA", "ARG", "ARG"]
+    assert list(df.month) == [0, 1, 0, 1, 0, 1]
+    assert list(df.fish) == [3, 4, 7, 8, 11, 12]
+    assert df.scenario_hash[0] == df.scenario_hash[2] != df.scenario_hash[4]
+
+
+def test_results_sink_appends(tmp_path):
+    """
+    Tests that a second sink appends to an existing csv file without repeating the
+    header
+    """
+    path = tmp_path / "results.csv"
+    for country_code in ["ARG", "USA"]:
+        with ResultsSink(path) as sink:
+            sink.add_results(InterpretedResults([1], [2]), "scenario", country_code)
+
+    df = pd.read_csv(path)
+    assert list(df.country) == ["ARG", "USA"]
+
+
+def test_results_sink_unknown_format(tmp_path):
+    """
+    Tests that a results file with an unknown format is an error
+    """
+    with raises(AssertionError):
+        ResultsSink(tmp_path / "results.txt")
+    with raises(AssertionError):
+        ResultsSink(tmp_path / "results.csv", file_format="xlsx")
+
+
+def write_runs(path):
+    """
+    Writes three runs to the results file in two batches, and returns the sink
+    """
+    sink = ResultsSink(path, batch_size=2)
+    sink.add_results(InterpretedResults([1, 2], [3, 4]), "scenario a", "ARG")
+    sink.add_results(InterpretedResults([5, 6], [7, 8]), "scenario a", "USA")
+    sink.add_results(InterpretedResults([9, 10], [11, 12]), "scenario b", "ARG")
+    sink.close()
+    return sink
+
+
+def check_runs(df):
+    """
+    Checks the results read back from the file have every run written by write_runs
+    """
+    assert list(df.columns) == [
+        "scenario_hash",
+        "country",
+        "month",
+        "stored_food",
+        "fish",
+    ]
+    assert list(df.country) == ["ARG", "ARG", "USA", "USA", "ARG", "ARG"]
+    assert list(df.month) == [0, 1, 0, 1, 0, 1]
+    assert list(df.stored_food) == [1, 2, 5, 6, 9, 10]
+    assert list(df.fish) == [3, 4, 7, 8, 11, 12]
+    assert df.scenario_hash[0] == ResultsSink.get_scenario_hash("scenario a")
+    assert df.scenario_hash[4] == ResultsSink.get_scenario_hash("scenario b")
+
+
+def test_results_sink_parquet(tmp_path):
+    """
+    Tests that the batches written to a parquet file are all read back
+    """
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "results.parquet"
+    write_runs(path)
+    check_runs(pd.read_parquet(path))
+
+
+def test_results_sink_arrow(tmp_path):
+    """
+    Tests that the batches written to an arrow file are all read back
+    """
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    path = tmp_path / "results.arrow"
+    write_runs(path)
+    with pyarrow.ipc.open_file(str(path)) as reader:
+        check_runs(reader.read_all().to_pandas())
+
+
+def test_results_sink_hdf5(tmp_path):
+    """
+    Tests that the batches appended to an hdf5 file are all read back
+    """
+    pytest.importorskip("tables")
+    path = tmp_path / "results.h5"
+    write_runs(path)
+    check_runs(pd.read_hdf(path, "results").reset_index(drop=True))
+
+
+def test_results_sink_closed(tmp_path):
+    """
+    Tests that closing twice does nothing, but adding results once closed is an
+    error
+    """
+    path = tmp_path / "results.csv"
+    sink = write_runs(path)
+    sink.close()
+    check_runs(pd.read_csv(path))
+
+    with raises(AssertionError):
+        sink.add_results(InterpretedResults([1, 2], [3, 4]), "scenario a", "ARG")
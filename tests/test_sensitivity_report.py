@@ -0,0 +1,186 @@
+"""
+Tests for reading the duals and reduced costs of a solve into arrays by family.
+"""
+import copy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pulp
+from pulp import LpMaximize, LpProblem, LpVariable
+
+from src.food_system.food import Food
+from src.optimizer.optimizer import Optimizer
+from src.optimizer.sensitivity_report import SensitivityReport
+from src.scenarios.run_scenario import ScenarioRunner
+
+
+def solve_stored_food_model():
+    """
+    Solves a two month model where 10 stored food can be eaten in either month, on
+    top of 2 and 6 from other foods, maximizing the least fed in any month
+    """
+    model = LpProblem(name="stored_food", sense=LpMaximize)
+    least_fed = LpVariable("Least_Humans_Fed_Any_Month", lowBound=0)
+    stored_food_start = LpVariable("Stored_Food_Start_Month_0_Variable", 0, 10)
+    eaten = [
+        LpVariable("Stored_Food_Eaten_During_Month_" + str(month) + "_Variable", 0)
+        for month in range(2)
+    ]
+    humans_fed = [
+        LpVariable("Humans_Fed_Kcals_" + str(month) + "_Variable", 0)
+        for month in range(2)
+    ]
+
+    model += (stored_food_start == 10, "Stored_Food_Start_Month_0_Constraint")
+    model += (eaten[0] + eaten[1] <= stored_food_start, "Stored_Food_Eaten_Constraint")
+    for month, other_foods in enumerate([2, 6]):
+        model += (
+            humans_fed[month] == eaten[month] + other_foods,
+            "Kcals_Fed_Month_" + str(month) + "_Constraint",
+        )
+        model += (
+            least_fed <= humans_fed[month],
+            "Kcals_Fed_Month_" + str(month) + "_Objective_Constraint",
+        )
+    model += least_fed
+
+    assert model.solve(pulp.PULP_CBC_CMD(msg=False)) == 1
+    return model
+
+
+def test_sensitivity_report():
+    """
+    Tests the duals are read by family and month, and give the months which bind and
+    the marginal value of stored food
+    """
+    report = SensitivityReport(solve_stored_food_model(), 2)
+
+    # both months are fed 9, so both bind, and they share each extra food
+    family = "Kcals_Fed_Month_#_Objective_Constraint"
+    assert list(report.get_binding_months(family)) == [0, 1]
+    assert np.isclose(np.sum(report.get_duals(family)), 1)
+    assert np.isclose(report.get_marginal_value("stored_food"), 0.5)
+    assert report.get_marginal_value("culled_meat") == 0
+
+    # only month 0 has the start of stored food
+    duals = report.get_duals("Stored_Food_Start_Month_#_Constraint")
+    assert duals.shape == (2,)
+    assert np.isnan(duals[1])
+
+    # names without a month are kept by name
+    assert "Stored_Food_Eaten_Constraint" in report.other_duals
+    assert "Least_Humans_Fed_Any_Month" in report.other_reduced_costs
+    assert set(report.get_binding_families()) >= {family}
+
+
+def get_country_constants(country_code, scenario_option):
+    """
+    Computes the constants the optimizer is given for one country, without trade
+    """
+    table = pd.read_csv(
+        Path(__file__).parent.parent
+        / "data"
+        / "no_food_trade"
+        / "computer_readable_combined.csv"
+    )
+    country_data = table[table.iso3 == country_code].iloc[0]
+
+    scenario_runner = ScenarioRunner()
+    constants_for_params, scenario_loader = scenario_runner.set_depending_on_option(
+        country_data, scenario_option
+    )
+    NMONTHS = constants_for_params["NMONTHS"]
+    constants_for_params["EXCESS_FEED"] = Food(
+        kcals=[0] * NMONTHS,
+        fat=[0] * NMONTHS,
+        protein=[0] * NMONTHS,
+        kcals_units="billion kcals each month",
+        fat_units="thousand tons each month",
+        protein_units="thousand tons each month",
+    )
+    single_valued_constants, time_consts, _ = scenario_runner.compute_parameters(
+        constants_for_params, scenario_loader
+    )
+    return single_valued_constants, time_consts
+
+
+def solve_optimizer(single_valued_constants, time_consts):
+    """
+    Returns the least people fed of the optimizer's first solve, and its
+    sensitivity report
+    """
+    model, _, _, _, _, solution = Optimizer().optimize(
+        copy.deepcopy(single_valued_constants), copy.deepcopy(time_consts), False
+    )
+    return pulp.value(model.objective), solution.sensitivity_report
+
+
+def test_marginal_values_match_resolving():
+    """
+    Tests that the marginal values of stored food, culled meat and seaweed area
+    match the change in the least people fed when the optimizer is solved again with
+    a little more of each. Argentina has stored food, and India in a nuclear winter
+    with resilient foods has none, but is limited by its seaweed area in some months.
+    """
+    scenario_option = {
+        "scale": "country",
+        "seasonality": "country",
+        "grasses": "baseline",
+        "crop_disruption": "zero",
+        "scenario": "no_resilient_foods",
+        "fish": "baseline",
+        "waste": "baseline_in_country",
+        "nutrition": "baseline",
+        "buffer": "baseline",
+        "shutoff": "continued",
+        "cull": "do_eat_culled",
+        "fat": "not_required",
+        "protein": "not_required",
+        "meat_strategy": "efficient_meat_strategy",
+    }
+    nuclear_winter_option = dict(
+        scenario_option,
+        grasses="country_nuclear_winter",
+        crop_disruption="country_nuclear_winter",
+        scenario="all_resilient_foods",
+        fish="nuclear_winter",
+    )
+
+    # the solver reports the objective to about 8 significant figures, so the
+    # resources are increased enough to see the change
+    for country_code, option in [
+        ("ARG", scenario_option),
+        ("IND", nuclear_winter_option),
+    ]:
+        single_valued_constants, time_consts = get_country_constants(
+            country_code, option
+        )
+        least_fed, report = solve_optimizer(single_valued_constants, time_consts)
+
+        more_stored_food = copy.deepcopy(single_valued_constants)
+        more_stored_food["stored_food"].initial_available_to_humans.kcals += 10
+        more_culled_meat = copy.deepcopy(single_valued_constants)
+        more_culled_meat["culled_meat"] += 10
+        for resource, constants in [
+            ("stored_food", more_stored_food),
+            ("culled_meat", more_culled_meat),
+        ]:
+            marginal_value = report.get_marginal_value(resource)
+            assert marginal_value > 0
+            change = (solve_optimizer(constants, time_consts)[0] - least_fed) / 10
+            assert np.isclose(change, marginal_value, rtol=0.01)
+
+    # the first months the seaweed area limits India's people fed
+    seaweed_area_marginal_values = report.get_seaweed_area_marginal_values()
+    assert np.isnan(seaweed_area_marginal_values[0])
+    months = np.flatnonzero(np.nan_to_num(seaweed_area_marginal_values) > 0)[:2]
+    assert len(months) == 2
+    for month in months:
+        more_built_area = copy.deepcopy(time_consts)
+        more_built_area["built_area"] = np.array(more_built_area["built_area"])
+        more_built_area["built_area"][month] += 0.01
+        change = (
+            solve_optimizer(single_valued_constants, more_built_area)[0] - least_fed
+        ) / 0.01
+        assert np.isclose(change, seaweed_area_marginal_values[month], rtol=0.02)
@@ -0,0 +1,118 @@
+"""
+Tests for reading the values of the optimizer variables.
+"""
+import numpy as np
+from pulp import LpVariable
+from pytest import raises
+
+from src.food_system.food import Food
+from src.optimizer.extract_results import Extractor
+from src.optimizer.solution import Solution
+
+
+def create_variables(name, values):
+    """
+    creates a variable for each month with the given values and returns them
+    """
+    variables = []
+    for month, value in enumerate(values):
+        variable = LpVariable(name + "_" + str(month))
+        variable.varValue = value
+        variables.append(variable)
+    return variables
+
+
+def test_solution_monthly_values():
+    """
+    Tests that each family of variables is read from its slice of the solution, and
+    families which weren't modeled are zero
+    """
+    variables = {
+        "objective_function": LpVariable("Objective"),
+        "stored_food_eaten": create_variables("Stored", [1, 2, 3]),
+        "culled_meat_eaten": [0, 0, 0],
+        "humans_fed_kcals": create_variables("Kcals", [4, 5, 6]),
+    }
+    solution = Solution(variables)
+
+    assert len(solution.values) == 6
+    assert solution.is_modeled("stored_food_eaten")
+    assert not solution.is_modeled("culled_meat_eaten")
+    assert np.array_equal(solution.get_monthly_values("humans_fed_kcals"), [4, 5, 6])
+    assert np.array_equal(
+        solution.get_monthly_values("stored_food_eaten", 0.5), [0.5, 1, 1.5]
+    )
+    assert np.array_equal(solution.get_monthly_values("culled_meat_eaten"), [0, 0, 0])
+
+
+def test_solution_partly_modeled_family():
+    """
+    Tests that a family modeled for only some of the months is an error
+    """
+    variables = {"stored_food_eaten": create_variables("Stored", [1]) + [0]}
+    with raises(AssertionError):
+        Solution(variables)
+
+
+def test_outdoor_crops_immediate_and_new_stored():
+    """
+    Tests that crops eaten beyond what was produced that month are from storage
+    """
+    extractor = Extractor({})
+    immediate, new_stored = extractor.to_monthly_list_outdoor_crops_kcals(
+        np.array([1.0, 5.0, 3.0]), np.array([2.0, 3.0, 3.0]), 2
+    )
+    assert np.array_equal(immediate, [2, 6, 6])
+    assert np.array_equal(new_stored, [0, 4, 0])
+
+
+def test_extract_summary():
+    """
+    Tests the percent people fed is the least fed by any included nutrient in any
+    month
+    """
+    variables = {
+        "humans_fed_kcals": create_variables("Kcals", [5, 3, 4]),
+        "humans_fed_fat": create_variables("Fat", [6, 2.5, 7]),
+        "humans_fed_protein": [0, 0, 0],
+    }
+    solution = Solution(variables)
+
+    constants = {"inputs": {"INCLUDE_FAT": False, "INCLUDE_PROTEIN": False}}
+    summary = Extractor(constants).extract_summary(solution)
+    assert summary.percent_people_fed == 3
+    assert summary.constraining_nutrient == "kcals"
+
+    constants = {"inputs": {"INCLUDE_FAT": True, "INCLUDE_PROTEIN": False}}
+    summary = Extractor(constants).extract_summary(solution)
+    assert summary.percent_people_fed == 2.5
+    assert summary.constraining_nutrient == "fat"
+
+
+def test_zero_food_of_components_not_added():
+    """
+    Tests that only the components which were added are extracted, and the others
+    share read only zeros which are copied before being changed
+    """
+    constants = {"NMONTHS": 3}
+    for food, option in Extractor.COMPONENT_OPTIONS.items():
+        constants[option] = food == "fish"
+    extractor = Extractor(constants)
+    assert extractor.get_active_components() == {"fish"}
+
+    seaweed = extractor.get_zero_food()
+    scp = extractor.get_zero_food()
+    assert np.array_equal(seaweed.kcals, [0, 0, 0])
+    assert seaweed.kcals_units == "billion people fed each month"
+    assert np.shares_memory(seaweed.kcals, scp.kcals)
+
+    seaweed += Food(
+        kcals=np.ones(3),
+        fat=np.ones(3),
+        protein=np.ones(3),
+        kcals_units="billion people fed each month",
+        fat_units="billion people fed each month",
+        protein_units="billion people fed each month",
+    )
+    assert np.array_equal(seaweed.kcals, [1, 1, 1])
+    assert np.array_equal(scp.kcals, [0, 0, 0])
@@ -304,3 +304,64 @@ def test_in_units_billions_fed():
     # so 1 kcal per month is 1/(2100*30) people fed per month
 
     assert abs(food_converted.kcals - 1 * 1e9 / 30 / 2100 / 1e9) < 1e-9
+
+
+def test_conversion_table_matches_nutrition_requirements():
+    """
+    Tests if the precomputed conversion table agrees with the nutrition requirements
+    """
+    Food.conversions.set_nutrition_requirements(
+        kcals_daily=2100,
+        fat_daily=47,
+        protein_daily=51,
+        include_fat=True,
+        include_protein=True,
+        population=1e9,
+    )
+    conversions = Food.conversions
+    index = conversions.unit_system_index
+    factors = conversions.conversion_table[
+        index["billion_kcals"], index["percent_people_fed"]
+    ]
+    assert abs(factors[0] - 100 / conversions.billion_kcals_needed) < 1e-9
+    assert abs(factors[1] - 100 / conversions.thou_tons_fat_needed) < 1e-9
+    assert abs(factors[2] - 100 / conversions.thou_tons_protein_needed) < 1e-9
+
+
+def test_in_units_percent_fed_round_trip():
+    """
+    Tests if converting to percent fed and back gives the original food
+    """
+    Food.conversions.set_nutrition_requirements(
+        kcals_daily=2100,
+        fat_daily=47,
+        protein_daily=51,
+        include_fat=True,
+        include_protein=True,
+        population=1e9,
+    )
+    food = create_food_monthly(
+        kcals_units="billion kcals each month",
+        fat_units="thousand tons each month",
+        protein_units="thousand tons each month",
+    )
+
+    percent_fed = food.in_units_percent_fed()
+    assert percent_fed.kcals_units == "percent people fed each month"
+    assert percent_fed.fat_units == "percent people fed each month"
+
+    food_again = percent_fed.in_units_bil_kcals_thou_tons_thou_tons_per_month()
+    assert food_again.kcals_units == "billion kcals each month"
+    assert food_again.protein_units == "thousand tons each month"
+    assert (abs(food_again.kcals - food.kcals) < 1e-9).all()
+    assert (abs(food_again.fat - food.fat) < 1e-9).all()
+    assert (abs(food_again.protein - food.protein) < 1e-9).all()
+
+
+def test_in_units_percent_fed_unknown_units():
+    """
+    Tests if converting from units not in the conversion table fails
+    """
+    food = create_food_monthly()
+    with raises(AssertionError):
+        food.in_units_percent_fed()
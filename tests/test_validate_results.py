@@ -0,0 +1,129 @@
+"""
+Tests for checking the optimizer constraints are satisfied.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+from pulp import LpMaximize, LpProblem, LpVariable
+from pytest import raises
+
+from src.food_system.food import Food
+from src.optimizer.validate_results import Validator
+
+
+def create_model(x_value, y_value):
+    """
+    creates a small model with monthly constraints, with the variables set to the
+    given values rather than solved
+    """
+    x = LpVariable("X_Variable")
+    y = LpVariable("Y_Variable")
+    model = LpProblem(name="test", sense=LpMaximize)
+    model += x + y
+    model += (x + 2 * y <= 10, "Limit_Month_0_Constraint")
+    model += (x - y >= -3, "Limit_Month_1_Constraint")
+    model += (x == 2, "Fixed_Month_0_Constraint")
+    model += (y <= x, "Objective_Month_0_Objective_Constraint")
+    x.varValue = x_value
+    y.varValue = y_value
+    return model
+
+
+def test_constraint_violations():
+    """
+    Tests the violation of each constraint is computed from its coefficients, and
+    the constraints which find the maximum are skipped
+    """
+    model = create_model(2.5, 4)
+    names, violations = Validator().get_constraint_violations(
+        model, ["Objective_Month_0_Objective_Constraint"], model.variables()
+    )
+    assert names == [
+        "Limit_Month_0_Constraint",
+        "Limit_Month_1_Constraint",
+        "Fixed_Month_0_Constraint",
+    ]
+    assert list(violations) == [0.5, 0, 0.5]
+
+
+def test_check_constraints_satisfied():
+    """
+    Tests the largest violation of each family of constraints is returned, and
+    violations of 1 or more are an error
+    """
+    model = create_model(2.5, 4)
+    max_violations = Validator().check_constraints_satisfied(
+        model, ["Objective_Month_0_Objective_Constraint"], model.variables()
+    )
+    assert max_violations == {
+        "Fixed_Month_#_Constraint": 0.5,
+        "Limit_Month_#_Constraint": 0.5,
+    }
+
+    model = create_model(2, 6)
+    with raises(AssertionError):
+        Validator().check_constraints_satisfied(model, [], model.variables())
+
+
+def create_interpreted_results(kcals):
+    """
+    creates a stand in for interpreted results, where every food has the given kcals
+    each month, and fat and protein are excluded
+    """
+    interpreted_results = SimpleNamespace(include_fat=False, include_protein=False)
+    for food in Validator.RESULT_FOODS:
+        setattr(
+            interpreted_results,
+            food,
+            Food(
+                kcals=np.array(kcals, dtype=float),
+                fat=np.zeros(len(kcals)),
+                protein=np.zeros(len(kcals)),
+                kcals_units="billion kcals each month",
+                fat_units="thousand tons each month",
+                protein_units="thousand tons each month",
+            ),
+        )
+    return interpreted_results
+
+
+def test_ensure_cheap_invariants():
+    """
+    Tests the cheap checks catch nan and negative foods, allowing rounding errors
+    """
+    validator = Validator()
+    validator.ensure_cheap_invariants(create_interpreted_results([1, 0, -1e-7]))
+
+    interpreted_results = create_interpreted_results([1, 2, 3])
+    interpreted_results.fish.kcals[1] = np.nan
+    with raises(AssertionError):
+        validator.ensure_cheap_invariants(interpreted_results)
+
+    interpreted_results = create_interpreted_results([1, 2, 3])
+    interpreted_results.scp.kcals[0] = -1
+    with raises(AssertionError):
+        validator.ensure_cheap_invariants(interpreted_results)
+
+    # stored food can be negative
+    interpreted_results = create_interpreted_results([1, 2, 3])
+    interpreted_results.stored_food.kcals[0] = -1
+    validator.ensure_cheap_invariants(interpreted_results)
+
+
+def test_validation_levels():
+    """
+    Tests the full checks run for every run, none of the runs, or a sample of them,
+    depending on the validation level
+    """
+    exhaustive = Validator("exhaustive")
+    cheap = Validator("cheap")
+    sampled = Validator("sampled", sample_fraction=0.25, seed=0)
+
+    n_runs = 1000
+    assert sum(exhaustive.should_run_full_checks() for _ in range(n_runs)) == n_runs
+    assert sum(cheap.should_run_full_checks() for _ in range(n_runs)) == 0
+    n_sampled = sum(sampled.should_run_full_checks() for _ in range(n_runs))
+    assert 200 < n_sampled < 300
+
+    with raises(AssertionError):
+        Validator("everything")